@@ -1,5 +1,6 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
@@ -7,10 +8,12 @@ class EmailOrUsernameBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         try:
             if '@' in username:
-                user = User.objects.get(email=username)
+                # LOWER(email) matches the auth_user_email_lower_idx index (accounts migration 0001)
+                user = User.objects.alias(email_lower=Lower('email')).get(email_lower=username.strip().lower())
             else:
                 user = User.objects.get(username=username)
-        except User.DoesNotExist:
+        except (User.DoesNotExist, User.MultipleObjectsReturned):
+            # An email shared by several accounts is ambiguous: they sign in with their username
             return None
 
         if user.check_password(password):
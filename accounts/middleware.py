@@ -0,0 +1,46 @@
+# cornelsimba/accounts/middleware.py
+"""
+Coalesced session expiry refresh.
+
+SESSION_SAVE_EVERY_REQUEST would write the session row on every request
+just to push its expiry forward. SessionRefreshMiddleware keeps the same
+sliding 30-minute timeout, but only saves a session whose last refresh is
+more than SESSION_REFRESH_MINUTES old. Between refreshes a request only
+reads the session row. The idle timeout is therefore SESSION_COOKIE_AGE
+minus at most SESSION_REFRESH_MINUTES.
+
+Sessions that are saved anyway (login, messages, a view writing to the
+session) are stamped at no extra cost. Anonymous requests without a session
+are left alone, so they never create one.
+"""
+import time
+
+from django.conf import settings
+
+REFRESH_SECONDS = getattr(settings, 'SESSION_REFRESH_MINUTES', 5) * 60
+
+REFRESHED_AT_KEY = '_refreshed_at'
+
+
+class SessionRefreshMiddleware:
+    """Goes after SessionMiddleware, so it sees the response before the session is saved"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        session = getattr(request, 'session', None)
+        if session is None:
+            return response
+
+        refreshed_at = session.get(REFRESHED_AT_KEY, 0)
+        if session.is_empty():
+            return response
+
+        now = int(time.time())
+        if session.modified or now - refreshed_at >= REFRESH_SECONDS:
+            # Marks the session modified: SessionMiddleware saves it with a new expiry
+            session[REFRESHED_AT_KEY] = now
+        return response
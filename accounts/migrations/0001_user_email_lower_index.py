@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 01:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Case-insensitive email sign-in (EmailOrUsernameBackend) looks users up by LOWER(email)"""
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_email_lower_idx ON auth_user (LOWER(email));',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_lower_idx;',
+        ),
+    ]
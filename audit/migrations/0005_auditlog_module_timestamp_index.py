@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0004_alter_auditlog_module'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['module', '-timestamp'], name='audit_audit_module_4e85d9_idx'),
+        ),
+    ]
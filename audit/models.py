@@ -60,6 +60,10 @@ class AuditLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'Audit Log'
         verbose_name_plural = 'Audit Logs'
+        indexes = [
+            # Per-module log, newest first
+            models.Index(fields=['module', '-timestamp']),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.action} - {self.module} - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
@@ -0,0 +1,51 @@
+# cornelsimba/core/admin.py
+from django.contrib import admin
+from .models import OutboxEvent, OutboxDelivery, DocumentSequence, RequestMetric
+
+
+class OutboxDeliveryInline(admin.TabularInline):
+    model = OutboxDelivery
+    extra = 0
+    readonly_fields = ('handler', 'status', 'attempts', 'last_error', 'available_at', 'delivered_at')
+    can_delete = False
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'created_at')
+    list_filter = ('topic',)
+    readonly_fields = ('topic', 'payload', 'created_at')
+    date_hierarchy = 'created_at'
+    inlines = [OutboxDeliveryInline]
+
+
+@admin.register(OutboxDelivery)
+class OutboxDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('event', 'handler', 'status', 'attempts', 'available_at', 'delivered_at')
+    list_filter = ('status', 'handler')
+    search_fields = ('handler', 'last_error', 'event__topic')
+    raw_id_fields = ('event',)
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        from django.utils import timezone
+        count = queryset.exclude(status='delivered').update(
+            status='pending', attempts=0, available_at=timezone.now(),
+        )
+        self.message_user(request, f'{count} delivery(ies) re-queued.')
+    requeue.short_description = "Re-queue selected deliveries"
+
+
+@admin.register(DocumentSequence)
+class DocumentSequenceAdmin(admin.ModelAdmin):
+    list_display = ('prefix', 'period', 'last_value')
+    list_filter = ('prefix',)
+    search_fields = ('prefix', 'period')
+
+
+@admin.register(RequestMetric)
+class RequestMetricAdmin(admin.ModelAdmin):
+    list_display = ('view_name', 'period_start', 'requests', 'errors', 'budget_exceeded', 'max_ms', 'max_queries')
+    list_filter = ('view_name',)
+    search_fields = ('view_name',)
+    date_hierarchy = 'period_start'
@@ -0,0 +1,13 @@
+# cornelsimba/core/apps.py
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Core'
+
+    def ready(self):
+        # Register event handlers from every app's events.py
+        autodiscover_modules('events')
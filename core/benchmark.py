@@ -0,0 +1,327 @@
+# cornelsimba/core/benchmark.py
+"""
+Repeatable benchmarks of the hot paths.
+
+run_benchmarks() requests the key pages (dashboards, reports, approval
+queues, PDF downloads) through the Django test client as a given user, and
+calls the heavy read-side services directly. Each scenario runs once to warm
+caches and then `repeat` times; the result keeps the min / median / max
+time and the query count of the last run.
+
+A result can be saved as a JSON baseline and later compared with
+compare_results(): a scenario regresses when its median is more than
+`threshold` percent (and at least MIN_DELTA_MS) slower than the baseline,
+or when it runs more queries than it did.
+
+Report views cached with @cached_report (core/cache.py) are measured cold:
+the report cache is cleared before every run, so the timings are those of
+computing the report. The '<name>_cached' scenarios measure the cache hits.
+
+Every scenario only reads (GET requests, report services), but run it
+against a copy of the database seeded with `seed_benchmark_data` rather
+than production: the numbers are only comparable on the same data.
+
+approval_throughput() is the write-side counterpart: worker threads, each
+on its own connection, approve pending stock outs one at a time against a
+few shared items, the way concurrent storekeepers do. It measures approvals
+per second and the approvals lost to lock errors, together with the
+database profile in effect (see DATABASES in settings), so runs with and
+without the SQLite tuning (DB_SQLITE_TUNING=0) can be compared.
+"""
+import platform
+import statistics
+import threading
+import time
+from decimal import Decimal
+
+import django
+from django.core.cache import caches
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+MIN_DELTA_MS = 5.0
+
+# (name, URL name) requested with GET
+VIEW_SCENARIOS = [
+    ('main_dashboard', 'dashboard:main'),
+    ('finance_dashboard', 'finance:dashboard'),
+    ('finance_reports', 'finance:reports'),
+    ('trial_balance', 'finance:trial_balance'),
+    ('balance_sheet', 'finance:balance_sheet'),
+    ('income_statement', 'finance:income_statement'),
+    ('cash_flow', 'finance:cash_flow'),
+    ('trial_balance_pdf', 'finance:download_trial_balance_pdf'),
+    ('general_ledger_pdf', 'finance:download_general_ledger_pdf'),
+    ('hr_dashboard', 'hr:hr_dashboard'),
+    ('employee_list', 'hr:employee_list'),
+    ('leave_approvals', 'hr:leave_approval_list'),
+    ('leaves_pdf', 'hr:export_leaves_pdf'),
+    ('inventory_dashboard', 'inventory:dashboard'),
+    ('stock_report', 'inventory:stock_report'),
+    ('stock_report_pdf', 'inventory:stock_report_pdf'),
+    ('sales_dashboard', 'sales:dashboard'),
+    ('sales_report', 'sales:sales_report'),
+    ('sales_pdf', 'sales:download_sales_pdf'),
+    ('procurement_dashboard', 'procurement:dashboard'),
+    ('audit_logs', 'audit:audit_logs'),
+]
+
+# Views behind @cached_report, also benchmarked warm as '<name>_cached'
+CACHED_VIEW_SCENARIOS = {'finance_reports', 'cash_flow', 'sales_report', 'stock_report'}
+
+
+def _sales_period_totals():
+    from sales.analytics import period_totals
+    today = timezone.localdate()
+    return period_totals({'month': today.replace(day=1), 'year': today.replace(month=1, day=1), 'all': None})
+
+
+def _supplier_performance():
+    from procurement.analytics import supplier_performance
+    return list(supplier_performance())
+
+
+def _reconciliation_report():
+    from finance.reconciliation import reconciliation_report
+    return reconciliation_report()
+
+
+def _reorder_plan():
+    from inventory.planning import build_reorder_plan
+    return build_reorder_plan()
+
+
+def _item_search():
+    from inventory.lookup import search_items
+    return search_items('bench')
+
+
+# (name, callable)
+SERVICE_SCENARIOS = [
+    ('sales_period_totals', _sales_period_totals),
+    ('supplier_performance', _supplier_performance),
+    ('procurement_reconciliation', _reconciliation_report),
+    ('reorder_plan', _reorder_plan),
+    ('item_search', _item_search),
+]
+
+
+def _clear_report_cache():
+    from .cache import REPORT_CACHE_ALIAS
+    caches[REPORT_CACHE_ALIAS].clear()
+
+
+def scenario_names():
+    """Every scenario run_benchmarks() knows, for --only"""
+    names = []
+    for name, _ in VIEW_SCENARIOS:
+        names.append(name)
+        if name in CACHED_VIEW_SCENARIOS:
+            names.append(f'{name}_cached')
+    return names + [name for name, _ in SERVICE_SCENARIOS]
+
+
+def _measure(call, repeat, before=None):
+    """
+    Run call() once to warm up, then `repeat` times; returns timings and query count.
+    `before` runs ahead of every call, outside the timing.
+    """
+    before = before or (lambda: None)
+    before()
+    call()
+    timings = []
+    for _ in range(repeat):
+        before()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            outcome = call()
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': len(queries.captured_queries),
+    }, outcome
+
+
+def run_benchmarks(user, repeat=5, only=None, progress=None):
+    """
+    Benchmark every scenario (or the names in `only`) as `user`.
+    Returns {'meta': {...}, 'results': {name: {...}}}; a scenario that raised,
+    or a view that did not answer 2xx, has an 'error'.
+    """
+    progress = progress or (lambda name, result: None)
+    client = Client(raise_request_exception=False)
+    client.force_login(user)
+    results = {}
+
+    for name, url_name in VIEW_SCENARIOS:
+        url = reverse(url_name)
+        runs = [(name, _clear_report_cache)]
+        if name in CACHED_VIEW_SCENARIOS:
+            runs.append((f'{name}_cached', None))
+        for run_name, before in runs:
+            if only and run_name not in only:
+                continue
+            result, response = _measure(lambda: client.get(url), repeat, before)
+            result.update(kind='view', target=url, status=response.status_code)
+            if not 200 <= response.status_code < 300:
+                # A redirect (e.g. to the login or permission fallback) is not the page
+                result['error'] = f"status {response.status_code} from {url}"
+            results[run_name] = result
+            progress(run_name, result)
+
+    for name, service in SERVICE_SCENARIOS:
+        if only and name not in only:
+            continue
+        try:
+            result, _ = _measure(service, repeat)
+        except Exception as e:
+            result = {'error': str(e)}
+        result.update(kind='service', target=f"{service.__module__}.{service.__name__}")
+        results[name] = result
+        progress(name, result)
+
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'repeat': repeat,
+            'row_counts': table_counts(),
+        },
+        'results': results,
+    }
+
+
+def table_counts():
+    """Row counts of the seeded tables, stored with a baseline for context"""
+    from audit.models import AuditLog
+    from finance.models import Transaction
+    from hr.models import Employee, LeaveRequest
+    from inventory.models import Item, StockHistory
+    from sales.models import Payment, Sale, SaleItem
+
+    return {
+        model._meta.label: model.objects.count()
+        for model in (Item, StockHistory, Sale, SaleItem, Payment, AuditLog, Employee, LeaveRequest, Transaction)
+    }
+
+
+def compare_results(baseline, current, threshold=20):
+    """
+    Scenarios in `current` that got slower or chattier than in `baseline`.
+    Returns [{'name', 'baseline_ms', 'current_ms', 'baseline_queries', 'current_queries', 'reasons'}].
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before or 'median_ms' not in before or 'median_ms' not in result:
+            continue
+        reasons = []
+        slower = result['median_ms'] - before['median_ms']
+        if slower > MIN_DELTA_MS and result['median_ms'] > before['median_ms'] * (1 + threshold / 100):
+            reasons.append(f"median {before['median_ms']}ms -> {result['median_ms']}ms")
+        if result['queries'] > before['queries']:
+            reasons.append(f"queries {before['queries']} -> {result['queries']}")
+        if result.get('status', 200) >= 400 and before.get('status', 200) < 400:
+            reasons.append(f"status {before['status']} -> {result['status']}")
+        if reasons:
+            regressions.append({
+                'name': name,
+                'baseline_ms': before['median_ms'],
+                'current_ms': result['median_ms'],
+                'baseline_queries': before['queries'],
+                'current_queries': result['queries'],
+                'reasons': reasons,
+            })
+    return regressions
+
+
+def database_profile():
+    """Backend settings that matter for throughput, as the connection sees them"""
+    connection.ensure_connection()
+    profile = {
+        'vendor': connection.vendor,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        'options': {
+            key: value for key, value in connection.settings_dict.get('OPTIONS', {}).items()
+            if key != 'init_command'
+        },
+    }
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size'):
+                profile[pragma] = cursor.execute(f'PRAGMA {pragma}').fetchone()[0]
+    return profile
+
+
+def _pending_stock_outs(user, count, items):
+    """`count` pending single-item stock outs spread over `items` bench items"""
+    from core.seed import PREFIX
+    from inventory.models import Item, StockOut
+
+    stock = [
+        Item.objects.update_or_create(
+            sku=f"{PREFIX}-APR-{number}",
+            defaults={'name': f"Bench approval item {number}", 'quantity': Decimal(count * 10)},
+        )[0]
+        for number in range(1, items + 1)
+    ]
+    created = StockOut.objects.bulk_create([
+        StockOut(
+            item=stock[number % items], quantity=Decimal('1'), status='pending',
+            reference=f"{PREFIX}-APR", purpose='INTERNAL_USE', created_by=user,
+        )
+        for number in range(count)
+    ])
+    return [stock_out.pk for stock_out in created]
+
+
+def approval_throughput(user, count=400, workers=4, items=5):
+    """
+    Approve `count` new pending stock outs from `workers` threads.
+    Returns {'approved', 'failed', 'errors', 'seconds', 'per_second', 'profile'}.
+    """
+    from inventory.approvals import approve_stock_outs
+
+    stock_out_ids = _pending_stock_outs(user, count, items)
+    shares = [stock_out_ids[worker::workers] for worker in range(workers)]
+    lock = threading.Lock()
+    outcome = {'approved': 0, 'failed': 0, 'errors': {}}
+
+    def work(ids):
+        try:
+            for pk in ids:
+                try:
+                    approved = len(approve_stock_outs([pk], user)['approved'])
+                except OperationalError as e:
+                    with lock:
+                        outcome['failed'] += 1
+                        outcome['errors'][str(e)] = outcome['errors'].get(str(e), 0) + 1
+                    continue
+                with lock:
+                    outcome['approved'] += approved
+                    outcome['failed'] += 1 - approved
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=work, args=(ids,)) for ids in shares]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    outcome.update(
+        seconds=round(seconds, 3),
+        per_second=round(outcome['approved'] / seconds, 1) if seconds else None,
+        workers=workers,
+        profile=database_profile(),
+    )
+    return outcome
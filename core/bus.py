@@ -0,0 +1,189 @@
+# cornelsimba/core/bus.py
+"""
+Local event bus backed by a transactional outbox.
+
+Publishing writes an OutboxEvent plus one OutboxDelivery per registered
+handler, in the caller's transaction: if the business change rolls back, so
+does the event. The `run_outbox` command (or dispatch_after_commit() for
+work the user should see straight away) then hands each delivery to its
+handler.
+
+Delivery is at-least-once: a delivery is only marked delivered after its
+handler returned, so a crash can replay it. Handlers must be idempotent.
+A failing handler is retried with exponential backoff and parked as
+'failed' after OUTBOX_MAX_ATTEMPTS; other handlers of the same event are
+not affected.
+
+Handlers live in each app's events.py and are registered on startup:
+
+    from core.bus import subscribe
+
+    @subscribe('procurement.purchase_order.delivered')
+    def receive_purchase_order(event):
+        ...
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min, Q
+from django.utils import timezone
+
+from .models import OutboxDelivery, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 8)
+BATCH_SIZE = 100
+
+# topic -> {handler name: callable}
+_handlers = defaultdict(dict)
+
+
+def _handler_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def subscribe(topic):
+    """Decorator registering `func(event)` for `topic`"""
+    def decorator(func):
+        _handlers[topic][_handler_name(func)] = func
+        return func
+    return decorator
+
+
+def handlers_for(topic):
+    return dict(_handlers.get(topic, {}))
+
+
+def publish(topic, payload=None, now=None):
+    """
+    Record an event and its deliveries in the current transaction.
+
+    `payload` must be JSON serialisable (pass ids, not model instances).
+    """
+    now = now or timezone.now()
+    event = OutboxEvent.objects.create(topic=topic, payload=payload or {}, created_at=now)
+    OutboxDelivery.objects.bulk_create([
+        OutboxDelivery(event=event, handler=name, available_at=now)
+        for name in handlers_for(topic)
+    ])
+    return event
+
+
+def dispatch_after_commit(event):
+    """Deliver `event` as soon as the current transaction commits"""
+    transaction.on_commit(lambda: dispatch(event_ids=[event.pk]))
+
+
+def _fail(delivery, error, now):
+    delivery.attempts += 1
+    delivery.last_error = str(error)
+    if delivery.attempts >= MAX_ATTEMPTS:
+        delivery.status = 'failed'
+    else:
+        # 1, 2, 4, 8... minutes
+        delivery.available_at = now + timedelta(minutes=2 ** (delivery.attempts - 1))
+    delivery.save(update_fields=['attempts', 'last_error', 'status', 'available_at'])
+    logger.error(
+        f"Outbox delivery {delivery.pk} ({delivery.event.topic} -> {delivery.handler}) "
+        f"failed (attempt {delivery.attempts}): {error}"
+    )
+
+
+@transaction.atomic
+def _dispatch_batch(queryset, batch_size, now):
+    deliveries = list(
+        queryset.select_for_update(skip_locked=True, of=('self',)).select_related('event')[:batch_size]
+    )
+    if not deliveries:
+        return None
+
+    result = {'delivered': 0, 'failed': 0}
+    delivered = []
+    for delivery in deliveries:
+        handler = handlers_for(delivery.event.topic).get(delivery.handler)
+        if handler is None:
+            _fail(delivery, 'Handler is no longer registered', now)
+            result['failed'] += 1
+            continue
+        try:
+            # Savepoint per delivery: a failing handler only rolls back its own work
+            with transaction.atomic():
+                handler(delivery.event)
+        except Exception as e:
+            _fail(delivery, e, now)
+            result['failed'] += 1
+            continue
+        delivered.append(delivery.pk)
+
+    if delivered:
+        OutboxDelivery.objects.filter(pk__in=delivered).update(
+            status='delivered',
+            attempts=F('attempts') + 1,
+            last_error='',
+            delivered_at=timezone.now(),
+        )
+        result['delivered'] = len(delivered)
+    return result
+
+
+def dispatch(batch_size=BATCH_SIZE, handler=None, event_ids=None, now=None):
+    """
+    Deliver due pending deliveries in batches (optionally for one handler
+    or some events only). Returns {'delivered': int, 'failed': int}.
+    """
+    now = now or timezone.now()
+    queryset = OutboxDelivery.objects.filter(status='pending', available_at__lte=now).order_by('pk')
+    if handler:
+        queryset = queryset.filter(handler=handler)
+    if event_ids is not None:
+        queryset = queryset.filter(event_id__in=list(event_ids))
+
+    totals = {'delivered': 0, 'failed': 0}
+    while True:
+        result = _dispatch_batch(queryset, batch_size, now)
+        if result is None:
+            break
+        totals['delivered'] += result['delivered']
+        totals['failed'] += result['failed']
+    return totals
+
+
+def lag_metrics(now=None, window=timedelta(hours=1)):
+    """
+    Per-handler backlog and latency.
+
+    Returns {handler: {'pending', 'failed', 'oldest_pending_seconds',
+    'delivered_recently', 'avg_latency_seconds', 'last_delivered_at'}}
+    where "recently" means within `window`.
+    """
+    now = now or timezone.now()
+    since = now - window
+    rows = OutboxDelivery.objects.order_by().values('handler').annotate(
+        pending=Count('pk', filter=Q(status='pending')),
+        failed=Count('pk', filter=Q(status='failed')),
+        oldest_pending=Min('event__created_at', filter=Q(status='pending')),
+        delivered_recently=Count('pk', filter=Q(status='delivered', delivered_at__gte=since)),
+        avg_latency=Avg(
+            F('delivered_at') - F('event__created_at'),
+            filter=Q(status='delivered', delivered_at__gte=since),
+        ),
+        last_delivered_at=Max('delivered_at'),
+    )
+
+    metrics = {}
+    for row in rows:
+        oldest = row['oldest_pending']
+        latency = row['avg_latency']
+        metrics[row['handler']] = {
+            'pending': row['pending'],
+            'failed': row['failed'],
+            'oldest_pending_seconds': (now - oldest).total_seconds() if oldest else 0,
+            'delivered_recently': row['delivered_recently'],
+            'avg_latency_seconds': latency.total_seconds() if latency else None,
+            'last_delivered_at': row['last_delivered_at'],
+        }
+    return metrics
@@ -0,0 +1,162 @@
+# cornelsimba/core/cache.py
+"""
+Response caching for read-heavy report views.
+
+@cached_report('finance.Income', 'finance.Expense') on a view that returns a
+TemplateResponse stores the template name and context of a successful GET,
+keyed on:
+
+- the view's dotted name and URL arguments
+- the GET parameters, sorted, blank values dropped
+- the user's role (superuser, or their sorted group names)
+- today's date, as reports default to periods ending today
+- a version counter for every model the report reads
+
+A model's version is bumped by its post_save / post_delete signals, so the
+next request after a change recomputes. bulk_create, bulk_update and
+QuerySet.update() send no signals; services writing tracked models that way
+call bump_versions() themselves, and anything missed is bounded by the TTL.
+
+The context is cached (pickled, querysets evaluated), not the HTML, so each
+hit is still rendered for the requesting user: their own name, CSRF token
+and messages. Entries larger than REPORT_CACHE_MAX_BYTES are not stored.
+The cache is the REPORT_CACHE_ALIAS backend; a file-based cache is shared by
+the worker processes of one host and culls itself at MAX_ENTRIES.
+"""
+import hashlib
+import logging
+import pickle
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_ALIAS = getattr(settings, 'REPORT_CACHE_ALIAS', 'default')
+REPORT_CACHE_SECONDS = getattr(settings, 'REPORT_CACHE_SECONDS', 300)
+REPORT_CACHE_MAX_BYTES = getattr(settings, 'REPORT_CACHE_MAX_BYTES', 2 * 1024 * 1024)
+
+_VERSION_KEY = 'core:model_version:{}'
+
+
+def _cache():
+    return caches[REPORT_CACHE_ALIAS]
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label
+
+
+def model_versions(labels):
+    """Current version of each model label, starting any missing counter"""
+    cache = _cache()
+    keys = {_VERSION_KEY.format(label): label for label in labels}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        # Start from the clock, not 0, so a culled or reset counter never
+        # comes back to a version that old entries were stored under
+        cache.add(key, time.time_ns(), None)
+        found[key] = cache.get(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def _bump(labels):
+    cache = _cache()
+    for label in labels:
+        key = _VERSION_KEY.format(label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_versions(*models):
+    """
+    Mark models (classes or 'app_label.Model' labels) as changed. Deferred
+    until the transaction commits, so a report computed in between cannot be
+    cached under the new version with the old data.
+    """
+    labels = [_label(model) for model in models]
+    transaction.on_commit(lambda: _bump(labels))
+
+
+def _on_change(sender, **kwargs):
+    bump_versions(sender)
+
+
+def _track(label):
+    uid = f'core.cache:{label}'
+    post_save.connect(_on_change, sender=label, weak=False, dispatch_uid=uid)
+    post_delete.connect(_on_change, sender=label, weak=False, dispatch_uid=uid)
+
+
+def _user_role(user):
+    if user.is_superuser:
+        return 'superuser'
+    return ','.join(sorted(user.groups.values_list('name', flat=True)))
+
+
+def _report_key(view_name, request, args, kwargs, labels):
+    params = sorted(
+        (name, sorted(value for value in request.GET.getlist(name) if value))
+        for name in request.GET
+        if any(request.GET.getlist(name))
+    )
+    versions = model_versions(labels)
+    parts = (
+        view_name, args, sorted(kwargs.items()), params, _user_role(request.user),
+        timezone.localdate().isoformat(), sorted(versions.items()),
+    )
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+    return f'report:{view_name}:{digest}'
+
+
+def _store(cache, key, response, timeout, view_name):
+    try:
+        payload = pickle.dumps((response.template_name, response.context_data), pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        logger.warning(f"Could not cache {view_name}: {e}")
+        return
+    if len(payload) <= REPORT_CACHE_MAX_BYTES:
+        cache.set(key, payload, timeout or REPORT_CACHE_SECONDS)
+
+
+def cached_report(*models, timeout=None):
+    """
+    Cache a report view's context until one of `models` changes (or the TTL).
+    Goes beneath the login / group decorators, which still run on every hit.
+    """
+    labels = tuple(_label(model) for model in models)
+    for label in labels:
+        _track(label)
+
+    def decorator(view_func):
+        view_name = f'{view_func.__module__}.{view_func.__qualname__}'
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+
+            cache = _cache()
+            key = _report_key(view_name, request, args, kwargs, labels)
+            payload = cache.get(key)
+            if payload is not None:
+                template_name, context = pickle.loads(payload)
+                return TemplateResponse(request, template_name, context)
+
+            response = view_func(request, *args, **kwargs)
+            if isinstance(response, TemplateResponse) and response.status_code == 200 and not response.is_rendered:
+                # Store once the page rendered, so a failing template is never cached
+                response.add_post_render_callback(
+                    lambda rendered: _store(cache, key, rendered, timeout, view_name)
+                )
+            return response
+        return _wrapped_view
+    return decorator
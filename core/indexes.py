@@ -0,0 +1,157 @@
+# cornelsimba/core/indexes.py
+"""
+Index audit of the hot query paths.
+
+QUERY_CATALOG lists the filters the dashboards, reports and approval queues
+run on every request, as querysets (aggregates are audited through the
+filtered queryset they aggregate). audit_queries() runs EXPLAIN on each and
+reports the tables the planner reads in full:
+
+- SQLite: a "SCAN <table>" step that does not go through an index
+- PostgreSQL: a "Seq Scan on <table>" node
+
+Django filters booleans as `WHERE "is_paid"` / `NOT "is_paid"`, not `= 1`,
+and SQLite can only seek on such a column through an index whose WHERE
+matches the predicate: boolean filters are covered by partial indexes.
+Plans depend on table statistics (planners prefer full scans on small
+tables), so audit a database seeded with `seed_benchmark_data` - it fills
+every table in this catalogue - with --analyze.
+When a view adds a new hot filter, add its query here so
+`manage.py audit_indexes` covers it.
+"""
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def _period():
+    today = timezone.localdate()
+    return today - timedelta(days=30), today
+
+
+def _active_income_in_period():
+    from finance.models import Income
+    return Income.objects.filter(is_active=True, date__range=_period()).order_by()
+
+
+def _cash_inflows():
+    from finance.models import Income
+    return Income.objects.filter(
+        is_paid=True, is_active=True, payment_date__isnull=False, payment_date__range=_period()
+    ).order_by()
+
+
+def _unpaid_income():
+    from finance.models import Income
+    return Income.objects.filter(is_paid=False, is_active=True).order_by()
+
+
+def _unpaid_expenses_in_period():
+    from finance.models import Expense
+    return Expense.objects.filter(is_paid=False, date__range=_period()).order_by()
+
+
+def _cash_outflows():
+    from finance.models import Expense
+    return Expense.objects.filter(is_paid=True, payment_date__range=_period()).order_by()
+
+
+def _payroll_for_month():
+    from finance.models import Payroll
+    today = timezone.localdate()
+    return Payroll.objects.filter(month=today.strftime('%B'), year=today.year).order_by()
+
+
+def _unpaid_payroll():
+    from finance.models import Payroll
+    return Payroll.objects.filter(is_paid=False).order_by()
+
+
+def _sales_by_status_in_period():
+    from sales.models import Sale
+    return Sale.objects.filter(status='COMPLETED', sale_date__range=_period()).order_by('-sale_date')
+
+
+def _pending_sale_stock_outs():
+    from inventory.models import StockOut
+    return StockOut.objects.filter(status='pending', purpose='SALE').order_by('-date')
+
+
+def _item_stock_history():
+    from inventory.models import StockHistory
+    return StockHistory.objects.filter(item_id=1).order_by('-created_at')
+
+
+def _pending_leaves():
+    from hr.models import LeaveRequest
+    return LeaveRequest.objects.filter(status='pending').order_by('-submitted_date')
+
+
+def _employee_approved_leaves():
+    from hr.models import LeaveRequest
+    return LeaveRequest.objects.filter(status='approved', employee_id=1).order_by()
+
+
+def _module_audit_log():
+    from audit.models import AuditLog
+    return AuditLog.objects.filter(module='FINANCE').order_by('-timestamp')
+
+
+# (name, where it runs, queryset factory)
+QUERY_CATALOG = [
+    ('active_income_in_period', 'finance reports / income statement', _active_income_in_period),
+    ('cash_inflows', 'finance cash flow statement', _cash_inflows),
+    ('unpaid_income', 'finance dashboard', _unpaid_income),
+    ('unpaid_expenses_in_period', 'finance reports', _unpaid_expenses_in_period),
+    ('cash_outflows', 'finance cash flow statement', _cash_outflows),
+    ('payroll_for_month', 'finance payroll', _payroll_for_month),
+    ('unpaid_payroll', 'finance dashboard', _unpaid_payroll),
+    ('sales_by_status_in_period', 'sales list / sales report', _sales_by_status_in_period),
+    ('pending_sale_stock_outs', 'inventory sale approvals', _pending_sale_stock_outs),
+    ('item_stock_history', 'inventory item detail', _item_stock_history),
+    ('pending_leaves', 'hr leave approvals', _pending_leaves),
+    ('employee_approved_leaves', 'hr leave balance', _employee_approved_leaves),
+    ('module_audit_log', 'audit log filtered by module', _module_audit_log),
+]
+
+
+def full_scans(plan, vendor=None):
+    """Tables an EXPLAIN output reads in full, in plan order"""
+    vendor = vendor or connection.vendor
+    tables = []
+    for line in plan.splitlines():
+        if vendor == 'sqlite':
+            match = _SQLITE_SCAN.search(line)
+            if match and 'USING' not in match.group(2):
+                tables.append(match.group(1))
+        elif vendor == 'postgresql':
+            match = _POSTGRES_SCAN.search(line)
+            if match:
+                tables.append(match.group(1))
+    return list(dict.fromkeys(tables))
+
+
+def audit_queries(only=None):
+    """
+    EXPLAIN every catalogued query (or the names in `only`).
+    Returns [{'name', 'used_by', 'sql', 'plan', 'full_scans', 'error'}].
+    """
+    results = []
+    for name, used_by, factory in QUERY_CATALOG:
+        if only and name not in only:
+            continue
+        result = {'name': name, 'used_by': used_by, 'sql': '', 'plan': '', 'full_scans': [], 'error': None}
+        try:
+            queryset = factory()
+            result['sql'] = str(queryset.query)
+            result['plan'] = queryset.explain()
+            result['full_scans'] = full_scans(result['plan'])
+        except Exception as e:
+            result['error'] = str(e)
+        results.append(result)
+    return results
@@ -0,0 +1,60 @@
+# cornelsimba/core/management/commands/audit_indexes.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.indexes import QUERY_CATALOG, audit_queries
+
+
+class Command(BaseCommand):
+    help = ('EXPLAIN the catalogue of hot queries (core/indexes.py) and report the ones that '
+            'still read whole tables (run on a seeded database)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', metavar='NAME',
+                            help='Audit only these queries: ' + ', '.join(name for name, _, _ in QUERY_CATALOG))
+        parser.add_argument('--analyze', action='store_true',
+                            help='Refresh the planner statistics (ANALYZE) before explaining')
+        parser.add_argument('--plans', action='store_true', help='Print the SQL and plan of every query')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Exit with an error when any query does a full scan (for CI)')
+
+    def handle(self, *args, **options):
+        known = {name for name, _, _ in QUERY_CATALOG}
+        unknown = set(options['only'] or []) - known
+        if unknown:
+            raise CommandError(f"Unknown queries: {', '.join(sorted(unknown))}")
+
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Full-scan detection covers SQLite and PostgreSQL plans, not {connection.vendor}"
+            ))
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        results = audit_queries(only=options['only'])
+        scanning = errors = 0
+        for result in results:
+            label = f"{result['name']} ({result['used_by']})"
+            if result['error']:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f"✖ {label}: {result['error']}"))
+            elif result['full_scans']:
+                scanning += 1
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️ {label}: full scan of {', '.join(result['full_scans'])}"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✅ {label}"))
+
+            if options['plans'] and not result['error']:
+                self.stdout.write(f"    {result['sql']}")
+                for line in result['plan'].splitlines():
+                    self.stdout.write(f"      {line}")
+
+        self.stdout.write(f"{len(results)} queries on {connection.vendor}: "
+                          f"{scanning} with full scans, {errors} failed")
+
+        if options['fail_on_scan'] and (scanning or errors):
+            raise CommandError(f"{scanning} queries do full scans, {errors} could not be explained")
@@ -0,0 +1,46 @@
+# cornelsimba/core/management/commands/benchmark_approvals.py
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import approval_throughput
+
+
+class Command(BaseCommand):
+    help = ('Measure concurrent stock-out approval throughput on the configured database '
+            '(compare runs with DB_SQLITE_TUNING=0 and =1; never run against production)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=400, help='Stock outs to create and approve')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent approving threads')
+        parser.add_argument('--items', type=int, default=5, help='Items the stock outs share (lower = more contention)')
+        parser.add_argument('--user', help='Approve as this username (default: first active superuser)')
+        parser.add_argument('--save', help='Write the result to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user'], is_active=True).first()
+        else:
+            user = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('No user to approve as; pass --user with an active username')
+
+        result = approval_throughput(user, count=options['count'], workers=options['workers'], items=options['items'])
+
+        profile = result['profile']
+        self.stdout.write(f"Database: {profile['vendor']} "
+                          + ', '.join(f"{key}={value}" for key, value in profile.items() if key != 'vendor'))
+        self.stdout.write(
+            f"Approved {result['approved']} in {result['seconds']}s with {result['workers']} workers "
+            f"({result['per_second']}/s), {result['failed']} failed"
+        )
+        for error, count in result['errors'].items():
+            self.stdout.write(self.style.ERROR(f"✖ {count} x {error}"))
+
+        if options['save']:
+            path = Path(options['save'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(result, indent=2, sort_keys=True, default=str))
+            self.stdout.write(self.style.SUCCESS(f"✅ Saved to {path}"))
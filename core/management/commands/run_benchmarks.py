@@ -0,0 +1,82 @@
+# cornelsimba/core/management/commands/run_benchmarks.py
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmark import compare_results, run_benchmarks, scenario_names
+from core.seed import BENCH_USERNAME
+
+
+class Command(BaseCommand):
+    help = 'Time the key views and services and save or compare a JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help=f'Username to request pages as (default: {BENCH_USERNAME}, '
+                                           'else the first active superuser)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scenario (after one warm-up)')
+        parser.add_argument('--only', nargs='+', choices=scenario_names(), help='Run just these scenarios')
+        parser.add_argument('--save', help='Write the results to this JSON file')
+        parser.add_argument('--compare', help='Compare with a baseline JSON file and fail on regressions')
+        parser.add_argument('--threshold', type=float, default=20,
+                            help='Percent slower than the baseline median that counts as a regression')
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline {options['compare']}: {e}")
+
+        # The test client needs 'testserver' in ALLOWED_HOSTS and a locmem mail backend
+        setup_test_environment()
+        try:
+            results = run_benchmarks(user, repeat=options['repeat'], only=options['only'], progress=self.progress)
+        finally:
+            teardown_test_environment()
+
+        failed = {name: result['error'] for name, result in results['results'].items() if 'error' in result}
+        if failed:
+            # Timings of a redirect or an error page are not the scenario's; never keep them as a baseline
+            raise CommandError(
+                f"{len(failed)} scenario(s) failed, results not saved: "
+                + ', '.join(f"{name} ({error})" for name, error in failed.items())
+            )
+
+        if options['save']:
+            path = Path(options['save'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"✅ Baseline saved to {path}"))
+
+        if baseline is not None:
+            regressions = compare_results(baseline, results, threshold=options['threshold'])
+            if regressions:
+                for row in regressions:
+                    self.stdout.write(self.style.ERROR(f"✖ {row['name']}: {'; '.join(row['reasons'])}"))
+                raise CommandError(f"{len(regressions)} scenario(s) regressed against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS(f"✅ No regressions against {options['compare']}"))
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username, is_active=True).first()
+        else:
+            user = (User.objects.filter(username=BENCH_USERNAME, is_active=True).first()
+                    or User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first())
+        if user is None:
+            raise CommandError('No user to benchmark as; pass --user with an active username')
+        return user
+
+    def progress(self, name, result):
+        if 'error' in result:
+            self.stdout.write(self.style.ERROR(f"✖ {name}: {result['error']}"))
+            return
+        status = f" [{result['status']}]" if 'status' in result else ''
+        self.stdout.write(
+            f"{name:<28} median {result['median_ms']:>9.2f}ms  "
+            f"min {result['min_ms']:>9.2f}ms  {result['queries']:>4} queries{status}"
+        )
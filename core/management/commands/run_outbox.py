@@ -0,0 +1,46 @@
+# cornelsimba/core/management/commands/run_outbox.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.bus import BATCH_SIZE, dispatch, lag_metrics
+
+
+class Command(BaseCommand):
+    help = 'Deliver outbox events to their handlers (run from cron, or with --loop as a worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--handler', help='Only deliver to this handler (dotted name)')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling every --interval seconds')
+        parser.add_argument('--interval', type=float, default=5.0)
+        parser.add_argument('--stats', action='store_true', help='Print per-handler lag metrics and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+
+        while True:
+            result = dispatch(batch_size=options['batch_size'], handler=options['handler'])
+            if result['delivered'] or result['failed'] or not options['loop']:
+                self.stdout.write(f"Delivered {result['delivered']}, failed {result['failed']}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Outbox run complete'))
+
+    def print_stats(self):
+        metrics = lag_metrics()
+        if not metrics:
+            self.stdout.write('No outbox deliveries yet')
+            return
+        for handler, row in sorted(metrics.items()):
+            latency = row['avg_latency_seconds']
+            self.stdout.write(
+                f"{handler}: pending={row['pending']} failed={row['failed']} "
+                f"oldest_pending={row['oldest_pending_seconds']:.0f}s "
+                f"delivered_1h={row['delivered_recently']} "
+                f"avg_latency={'-' if latency is None else f'{latency:.1f}s'}"
+            )
@@ -0,0 +1,54 @@
+# cornelsimba/core/management/commands/seed_benchmark_data.py
+from django.core.management.base import BaseCommand
+
+from core.seed import BATCH_SIZE, DEFAULT_VOLUMES, Seeder
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic data at realistic volume for benchmarks (never run against production)'
+
+    def add_arguments(self, parser):
+        for table, rows in DEFAULT_VOLUMES.items():
+            parser.add_argument(
+                f"--{table.replace('_', '-')}", type=int, dest=table,
+                help=f"Rows to create (default {rows:,} x --scale)",
+            )
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiply the default volumes, e.g. 0.01 for a quick local data set')
+        parser.add_argument('--only', nargs='+', choices=list(DEFAULT_VOLUMES),
+                            help='Seed just these tables')
+        parser.add_argument('--days', type=int, default=730, help='Spread dates over this many past days')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable data')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        volumes = {}
+        for table, rows in DEFAULT_VOLUMES.items():
+            if options['only'] and table not in options['only']:
+                continue
+            explicit = options[table]
+            volumes[table] = explicit if explicit is not None else int(rows * options['scale'])
+
+        self.stdout.write(self.style.WARNING(
+            "⚠ Seeding " + ', '.join(f"{rows:,} {table}" for table, rows in volumes.items())
+        ))
+        seeder = Seeder(
+            seed=options['seed'], days=options['days'],
+            batch_size=options['batch_size'], progress=self.progress,
+        )
+        self.reported = {}
+        created = seeder.run(volumes)
+
+        for table, rows in created.items():
+            self.stdout.write(f"✔ {table}: {rows:,}")
+        self.stdout.write(self.style.SUCCESS(
+            "✅ Benchmark data seeded. Rebuild derived tables (rebuild_sales_facts, "
+            "rebuild_customer_metrics, plan_reorders) before benchmarking reports that read them."
+        ))
+
+    def progress(self, table, done, total):
+        # Report roughly every 10%
+        tenth = done * 10 // total
+        if self.reported.get(table) != tenth:
+            self.reported[table] = tenth
+            self.stdout.write(f"  {table}: {done:,}/{total:,}")
@@ -0,0 +1,342 @@
+# cornelsimba/core/middleware.py
+"""
+Per-request performance metrics.
+
+RequestMetricsMiddleware wraps every database connection with an
+execute_wrapper for the duration of the request and records:
+
+- SQL query count and total database time
+- repeated query fingerprints (the same SQL shape run more than once, the
+  usual sign of an N+1 loop), with IN (...) lists collapsed
+- template render time (top-level Template.render calls only, so
+  {% extends %} / {% include %} are not counted twice)
+- total time and response size
+
+Each request goes into an in-process ring buffer (RECENT, newest last) and
+into hourly per-URL-name totals that are flushed to RequestMetric every
+PERF_METRICS_FLUSH_SECONDS, merging a latency histogram so p50 / p95 can be
+read back per URL name (see percentile()). The staff page
+core:request_metrics shows both.
+
+Query budgets: decorate a view with @query_budget(max_queries) (optionally
+max_db_ms). A request over budget is logged; with PERF_QUERY_BUDGET_STRICT
+(on under `manage.py test`) it raises QueryBudgetExceeded, so a test that
+requests the view fails.
+
+Streaming responses are measured up to the point the view returns; queries
+run while the body streams are not counted.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ENABLED = getattr(settings, 'PERF_METRICS_ENABLED', True)
+RING_SIZE = getattr(settings, 'PERF_METRICS_RING_SIZE', 500)
+FLUSH_SECONDS = getattr(settings, 'PERF_METRICS_FLUSH_SECONDS', 30)
+RETENTION_DAYS = getattr(settings, 'PERF_METRICS_RETENTION_DAYS', 14)
+BUDGET_STRICT = getattr(settings, 'PERF_QUERY_BUDGET_STRICT', False)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+RECENT = deque(maxlen=RING_SIZE)
+
+_current = ContextVar('request_metrics', default=None)
+_template_depth = ContextVar('template_depth', default=0)
+
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more queries (or spent more DB time) than its declared budget"""
+
+
+def query_budget(max_queries, max_db_ms=None):
+    """Declare the most queries (and DB ms) a view should need per request"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.budget = (max_queries, max_db_ms)
+            return view_func(request, *args, **kwargs)
+        _wrapped_view.query_budget = (max_queries, max_db_ms)
+        return _wrapped_view
+    return decorator
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, so repeats of one shape match"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERALS.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class _Metrics:
+    __slots__ = ('queries', 'db_seconds', 'fingerprints', 'template_seconds', 'budget')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.fingerprints = Counter()
+        self.template_seconds = 0.0
+        self.budget = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, limit=5):
+        return [(sql, count) for sql, count in self.fingerprints.most_common(limit) if count > 1]
+
+
+# Template timing -------------------------------------------------------------
+
+_patched = False
+
+
+def _instrument_templates():
+    """Time top-level Template.render calls for the request being measured (patched once)"""
+    global _patched
+    if _patched:
+        return
+    from django.template.base import Template
+
+    original = Template.render
+
+    def render(self, context):
+        metrics = _current.get()
+        if metrics is None:
+            return original(self, context)
+        depth = _template_depth.get()
+        token = _template_depth.set(depth + 1)
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            if depth == 0:
+                metrics.template_seconds += time.perf_counter() - started
+            _template_depth.reset(token)
+
+    Template.render = render
+    _patched = True
+
+
+# Hourly totals -----------------------------------------------------------------
+
+class _Totals:
+    """Per (view name, hour) totals waiting to be flushed to RequestMetric"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.last_flush = time.monotonic()
+
+    def add(self, sample):
+        key = (sample['view_name'], sample['at'].replace(minute=0, second=0, microsecond=0))
+        with self.lock:
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = defaultdict(int, histogram=[0] * (len(LATENCY_BUCKETS_MS) + 1))
+            row['requests'] += 1
+            row['errors'] += sample['status'] >= 500
+            row['budget_exceeded'] += sample['over_budget']
+            row['total_ms'] += sample['total_ms']
+            row['max_ms'] = max(row['max_ms'], sample['total_ms'])
+            row['db_ms'] += sample['db_ms']
+            row['template_ms'] += sample['template_ms']
+            row['queries'] += sample['queries']
+            row['max_queries'] = max(row['max_queries'], sample['queries'])
+            row['response_bytes'] += sample['response_bytes'] or 0
+            row['histogram'][_bucket(sample['total_ms'])] += 1
+
+    def due(self):
+        return time.monotonic() - self.last_flush >= FLUSH_SECONDS
+
+    def take(self):
+        with self.lock:
+            rows, self.rows = self.rows, {}
+            self.last_flush = time.monotonic()
+        return rows
+
+    def restore(self, rows):
+        """Put back totals that could not be written (merged with anything newer)"""
+        with self.lock:
+            for key, row in rows.items():
+                current = self.rows.get(key)
+                if current is None:
+                    self.rows[key] = row
+                    continue
+                for field in ('max_ms', 'max_queries'):
+                    current[field] = max(current[field], row[field])
+                for field, value in row.items():
+                    if field == 'histogram':
+                        current[field] = [a + b for a, b in zip(current[field], value)]
+                    elif field not in ('max_ms', 'max_queries'):
+                        current[field] += value
+
+
+TOTALS = _Totals()
+
+
+def _bucket(ms):
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if ms <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+
+def flush_metrics():
+    """Merge the buffered totals into RequestMetric. Returns the number of rows touched."""
+    rows = TOTALS.take()
+    if not rows:
+        return 0
+    try:
+        _write_totals(rows)
+    except IntegrityError:
+        # Another process created the same hour row first; retry on the next flush
+        TOTALS.restore(rows)
+        return 0
+    return len(rows)
+
+
+def _write_totals(rows):
+    from .models import RequestMetric
+
+    with transaction.atomic():
+        existing = {
+            (metric.view_name, metric.period_start): metric
+            for metric in RequestMetric.objects.select_for_update().filter(
+                period_start__in={period for view_name, period in rows},
+                view_name__in={view_name for view_name, period in rows},
+            )
+        }
+        to_create, to_update = [], []
+        for (view_name, period), row in rows.items():
+            metric = existing.get((view_name, period))
+            if metric is None:
+                metric = RequestMetric(view_name=view_name, period_start=period, latency_histogram=[0] * len(row['histogram']))
+                to_create.append(metric)
+            else:
+                to_update.append(metric)
+            metric.requests += row['requests']
+            metric.errors += row['errors']
+            metric.budget_exceeded += row['budget_exceeded']
+            metric.total_ms += row['total_ms']
+            metric.max_ms = max(metric.max_ms, row['max_ms'])
+            metric.db_ms += row['db_ms']
+            metric.template_ms += row['template_ms']
+            metric.queries += row['queries']
+            metric.max_queries = max(metric.max_queries, row['max_queries'])
+            metric.response_bytes += row['response_bytes']
+            metric.latency_histogram = [a + b for a, b in zip(metric.latency_histogram, row['histogram'])]
+        RequestMetric.objects.bulk_create(to_create)
+        RequestMetric.objects.bulk_update(to_update, [
+            'requests', 'errors', 'budget_exceeded', 'total_ms', 'max_ms', 'db_ms',
+            'template_ms', 'queries', 'max_queries', 'response_bytes', 'latency_histogram',
+        ])
+        RequestMetric.objects.filter(period_start__lt=timezone.now() - timedelta(days=RETENTION_DAYS)).delete()
+
+
+def percentile(histogram, fraction):
+    """Upper bound (ms) of the bucket holding the given fraction of requests; None past the last bound"""
+    total = sum(histogram)
+    if not total:
+        return None
+    target = total * fraction
+    running = 0
+    for index, count in enumerate(histogram):
+        running += count
+        if running >= target:
+            return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+# Middleware ----------------------------------------------------------------------
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if ENABLED:
+            _instrument_templates()
+
+    def __call__(self, request):
+        if not ENABLED:
+            return self.get_response(request)
+
+        metrics = _Metrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        sample = {
+            'at': timezone.now(),
+            'method': request.method,
+            'path': request.path,
+            'view_name': (match.view_name if match else '') or 'unresolved',
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'db_ms': round(metrics.db_seconds * 1000, 1),
+            'template_ms': round(metrics.template_seconds * 1000, 1),
+            'queries': metrics.queries,
+            'duplicates': metrics.duplicates(),
+            'response_bytes': None if response.streaming else len(response.content),
+            'over_budget': False,
+        }
+        self._check_budget(metrics, sample)
+        RECENT.append(sample)
+        TOTALS.add(sample)
+        if TOTALS.due():
+            try:
+                flush_metrics()
+            except Exception as e:
+                # Metrics must never break a request
+                logger.warning(f"Could not flush request metrics: {e}")
+        return response
+
+    def _check_budget(self, metrics, sample):
+        if metrics.budget is None:
+            return
+        max_queries, max_db_ms = metrics.budget
+        problems = []
+        if max_queries is not None and sample['queries'] > max_queries:
+            problems.append(f"{sample['queries']} queries (budget {max_queries})")
+        if max_db_ms is not None and sample['db_ms'] > max_db_ms:
+            problems.append(f"{sample['db_ms']}ms in the database (budget {max_db_ms}ms)")
+        if not problems:
+            return
+        sample['over_budget'] = True
+        message = f"{sample['view_name']} over budget: {', '.join(problems)}"
+        if sample['duplicates']:
+            sql, count = sample['duplicates'][0]
+            message += f"; most repeated ({count}x): {sql[:200]}"
+        if BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
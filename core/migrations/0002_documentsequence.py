@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-19 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=20)),
+                ('period', models.CharField(blank=True, default='', help_text='e.g. YYYYMMDD for daily numbering', max_length=20)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['prefix', 'period'],
+                'constraints': [models.UniqueConstraint(fields=('prefix', 'period'), name='unique_document_sequence')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 00:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_documentsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=200)),
+                ('period_start', models.DateTimeField()),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('budget_exceeded', models.PositiveIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('db_ms', models.FloatField(default=0)),
+                ('template_ms', models.FloatField(default=0)),
+                ('queries', models.PositiveBigIntegerField(default=0)),
+                ('max_queries', models.PositiveIntegerField(default=0)),
+                ('response_bytes', models.PositiveBigIntegerField(default=0)),
+                ('latency_histogram', models.JSONField(default=list)),
+            ],
+            options={
+                'ordering': ['-period_start', 'view_name'],
+                'indexes': [models.Index(fields=['period_start'], name='core_reques_period__c97283_idx')],
+                'constraints': [models.UniqueConstraint(fields=('view_name', 'period_start'), name='unique_request_metric_period')],
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+# cornelsimba/core/models.py
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """A business event, written in the same transaction as the change it describes"""
+    topic = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['pk']
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk}"
+
+
+class OutboxDelivery(models.Model):
+    """One event for one registered handler (see core/bus.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('delivered', 'Delivered'),
+        ('failed', 'Failed'),
+    ]
+
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='deliveries')
+    handler = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['pk']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'handler'], name='unique_outbox_delivery'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+            models.Index(fields=['handler', 'status']),
+        ]
+        verbose_name_plural = 'Outbox deliveries'
+
+    def __str__(self):
+        return f"{self.event} -> {self.handler} ({self.status})"
+
+
+class DocumentSequence(models.Model):
+    """Counter behind generated document numbers (see core/sequences.py)"""
+    prefix = models.CharField(max_length=20)
+    period = models.CharField(max_length=20, blank=True, default='', help_text="e.g. YYYYMMDD for daily numbering")
+    last_value = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['prefix', 'period']
+        constraints = [
+            models.UniqueConstraint(fields=['prefix', 'period'], name='unique_document_sequence'),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix}-{self.period}: {self.last_value}" if self.period else f"{self.prefix}: {self.last_value}"
+
+
+class RequestMetric(models.Model):
+    """Hourly request totals per URL name, written by core.middleware.RequestMetricsMiddleware"""
+    view_name = models.CharField(max_length=200)
+    period_start = models.DateTimeField()
+    requests = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    budget_exceeded = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    db_ms = models.FloatField(default=0)
+    template_ms = models.FloatField(default=0)
+    queries = models.PositiveBigIntegerField(default=0)
+    max_queries = models.PositiveIntegerField(default=0)
+    response_bytes = models.PositiveBigIntegerField(default=0)
+    # Request counts per core.middleware.LATENCY_BUCKETS_MS bucket (+ one open bucket)
+    latency_histogram = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ['-period_start', 'view_name']
+        constraints = [
+            models.UniqueConstraint(fields=['view_name', 'period_start'], name='unique_request_metric_period'),
+        ]
+        indexes = [
+            models.Index(fields=['period_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.view_name} @ {self.period_start:%Y-%m-%d %H:00} ({self.requests} requests)"
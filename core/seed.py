@@ -0,0 +1,538 @@
+# cornelsimba/core/seed.py
+"""
+Synthetic data for performance work.
+
+Seeder generates realistic volumes of the tables the hot paths read -
+items, stock history, sales with lines and payments, audit logs, employees
+with leave history and payroll, income and expense records and ledger
+transactions - with bulk_create in batches,
+one transaction per batch, so millions of rows never sit in memory at once.
+Dates are spread over the last `days` days (auto_now_add fields are
+back-dated while seeding) and the random generator is seeded, so two runs
+with the same options produce the same data.
+
+Every generated row carries the BENCH prefix in its number / code (sku,
+sale_number, employee_id, customer name), and numbering continues after
+rows already seeded, so seeding can be run again to grow a data set. Every
+run also makes sure the bench_admin user exists, a superuser in every group,
+for run_benchmarks to request pages as.
+bulk_create skips save() and signals: no stock movements, ledger postings
+or outbox events are triggered. Rebuild derived tables afterwards
+(rebuild_sales_facts, rebuild_customer_metrics, ...) if a benchmark reads them.
+"""
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_versions
+
+PREFIX = 'BENCH'
+BATCH_SIZE = 2000
+
+# Superuser in every group (some views check group membership, not is_superuser);
+# run_benchmarks requests pages as this user by default
+BENCH_USERNAME = 'bench_admin'
+
+# What `seed_benchmark_data` creates unless told otherwise
+DEFAULT_VOLUMES = {
+    'items': 50_000,
+    'stock_history': 1_000_000,
+    'sales': 500_000,
+    'audit_logs': 2_000_000,
+    'employees': 1_000,
+    'payrolls': 24_000,
+    'incomes': 500_000,
+    'expenses': 200_000,
+    'transactions': 5_000_000,
+}
+
+SEEDED_MODELS = [
+    'inventory.Item', 'inventory.StockHistory', 'sales.Customer', 'sales.Sale', 'sales.SaleItem',
+    'sales.Payment', 'audit.AuditLog', 'hr.Employee', 'hr.LeaveRequest', 'finance.Payroll', 'finance.Income', 'finance.Expense',
+    'finance.Transaction',
+]
+
+LEAVES_PER_EMPLOYEE = 8
+SALES_PER_CUSTOMER = 250
+CENTS = Decimal('0.01')
+
+
+@contextmanager
+def backdating(model, *field_names):
+    """Let bulk_create keep explicit values in auto_now_add fields"""
+    fields = [model._meta.get_field(name) for name in field_names]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+class Seeder:
+    def __init__(self, seed=0, days=730, batch_size=BATCH_SIZE, progress=None):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.batch_size = batch_size
+        self.progress = progress or (lambda table, done, total: None)
+        self.now = timezone.now()
+        self._item_cache = None
+
+    def run(self, volumes):
+        """Seed every table in `volumes` ({name: rows}); returns rows created per table"""
+        self.benchmark_user()
+        created = {}
+        for table in DEFAULT_VOLUMES:
+            count = volumes.get(table) or 0
+            if count > 0:
+                created.update(getattr(self, f'seed_{table}')(count))
+        # bulk_create sends no signals; let cached reports see the new rows
+        bump_versions(*SEEDED_MODELS)
+        return created
+
+    def benchmark_user(self):
+        user, created = User.objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={'is_superuser': True, 'is_staff': True, 'email': 'bench@example.com'},
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        user.groups.set(Group.objects.all())
+        return user
+
+    # Helpers -------------------------------------------------------------------
+
+    def _when(self):
+        return self.now - timedelta(seconds=self.rng.randrange(self.days * 86400))
+
+    def _money(self, low, high):
+        return Decimal(self.rng.randrange(low * 100, high * 100)) / 100
+
+    def _next_number(self, model, field):
+        return model.objects.filter(**{f'{field}__startswith': f'{PREFIX}-'}).count() + 1
+
+    def _items(self):
+        """(pk, selling_price) of every active item"""
+        if self._item_cache is None:
+            from inventory.models import Item
+            self._item_cache = list(Item.objects.filter(is_active=True).values_list('pk', 'selling_price'))
+        return self._item_cache
+
+    def _insert(self, table, total, build):
+        """Call build(start, size) -> [(model, objects), ...] per batch and bulk insert it"""
+        for start, size in _batches(total, self.batch_size):
+            with transaction.atomic():
+                for model, objects in build(start, size):
+                    model.objects.bulk_create(objects, batch_size=self.batch_size)
+            self.progress(table, start + size, total)
+
+    # Inventory -------------------------------------------------------------------
+
+    def seed_items(self, count):
+        from inventory.lookup import invalidate_catalog
+        from inventory.models import Item
+
+        categories = [value for value, label in Item.CATEGORY_CHOICES]
+        units = ['kg', 'pcs', 'liter', 'box', 'bag']
+        first = self._next_number(Item, 'sku')
+
+        def build(start, size):
+            items = []
+            for number in range(first + start, first + start + size):
+                purchase_price = self._money(1_000, 200_000)
+                name = f"Bench item {number:06d}"
+                sku = f"{PREFIX}-ITM-{number:06d}"
+                items.append(Item(
+                    name=name,
+                    sku=sku,
+                    search_name=name.lower(),
+                    search_sku=sku.lower(),
+                    category=self.rng.choice(categories),
+                    unit_of_measure=self.rng.choice(units),
+                    quantity=Decimal(self.rng.randrange(0, 5_000)),
+                    reorder_level=Decimal(self.rng.randrange(10, 200)),
+                    minimum_stock=Decimal(self.rng.randrange(5, 50)),
+                    purchase_price=purchase_price,
+                    selling_price=(purchase_price * Decimal('1.3')).quantize(CENTS),
+                ))
+            return [(Item, items)]
+
+        self._insert('items', count, build)
+        self._item_cache = None
+        invalidate_catalog()
+        return {'items': count}
+
+    def seed_stock_history(self, count):
+        from inventory.models import StockHistory
+
+        items = self._items()
+        if not items:
+            return {'stock_history': 0}
+        types = ['STOCK_IN'] * 4 + ['STOCK_OUT'] * 5 + ['ADJUSTMENT']
+
+        def build(start, size):
+            rows = []
+            for _ in range(size):
+                transaction_type = self.rng.choice(types)
+                quantity = Decimal(self.rng.randrange(1, 500))
+                previous = Decimal(self.rng.randrange(0, 5_000))
+                new = previous + quantity if transaction_type == 'STOCK_IN' else max(previous - quantity, Decimal('0'))
+                rows.append(StockHistory(
+                    item_id=self.rng.choice(items)[0],
+                    transaction_type=transaction_type,
+                    quantity=quantity,
+                    previous_quantity=previous,
+                    new_quantity=new,
+                    reference=f"{PREFIX}-{transaction_type}",
+                    created_by='benchmark',
+                    created_at=self._when(),
+                ))
+            return [(StockHistory, rows)]
+
+        with backdating(StockHistory, 'created_at'):
+            self._insert('stock_history', count, build)
+        return {'stock_history': count}
+
+    # Sales -------------------------------------------------------------------------
+
+    def _customers(self, wanted):
+        from sales.models import Customer
+
+        existing = list(Customer.objects.filter(name__startswith=f'{PREFIX} ').values_list('pk', flat=True))
+        missing = wanted - len(existing)
+        if missing > 0:
+            first = len(existing) + 1
+            Customer.objects.bulk_create([
+                Customer(
+                    name=f"{PREFIX} Customer {number:05d}",
+                    customer_type=self.rng.choice(['COMPANY', 'INDIVIDUAL']),
+                    credit_limit=self._money(1_000_000, 50_000_000),
+                )
+                for number in range(first, first + missing)
+            ], batch_size=self.batch_size)
+            existing = list(Customer.objects.filter(name__startswith=f'{PREFIX} ').values_list('pk', flat=True))
+        return existing
+
+    def seed_sales(self, count):
+        from sales.models import Payment, Sale, SaleItem
+
+        items = self._items()
+        if not items:
+            return {'sales': 0}
+        customers = self._customers(max(count // SALES_PER_CUSTOMER, 50))
+        statuses = ['COMPLETED'] * 6 + ['APPROVED'] * 2 + ['PENDING', 'DRAFT', 'CANCELLED']
+        methods = [value for value, label in Payment.PAYMENT_METHODS]
+        first = self._next_number(Sale, 'sale_number')
+        created = {'sales': 0, 'sale_items': 0, 'payments': 0}
+
+        def build(start, size):
+            sales, lines = [], []
+            for number in range(first + start, first + start + size):
+                when = self._when()
+                sale_lines = []
+                for item_id, price in self.rng.sample(items, min(self.rng.randint(1, 4), len(items))):
+                    quantity = Decimal(self.rng.randrange(1, 50))
+                    unit_price = price or self._money(1_000, 100_000)
+                    total = (quantity * unit_price).quantize(CENTS)
+                    sale_lines.append(SaleItem(
+                        item_id=item_id, quantity=quantity, unit_price=unit_price, tax_rate=Decimal('18'),
+                        total_price=total, tax_amount=(total * Decimal('0.18')).quantize(CENTS), created_at=when,
+                    ))
+                total_amount = sum(line.total_price for line in sale_lines)
+                tax_amount = sum(line.tax_amount for line in sale_lines)
+                net_amount = total_amount + tax_amount
+                status = self.rng.choice(statuses)
+                sale_type = self.rng.choice(['CASH', 'CASH', 'CREDIT'])
+                if status == 'COMPLETED' and sale_type == 'CASH':
+                    paid = net_amount
+                elif status in ('COMPLETED', 'APPROVED'):
+                    paid = (net_amount * Decimal(self.rng.choice([0, 25, 50, 100])) / 100).quantize(CENTS)
+                else:
+                    paid = Decimal('0')
+                sale = Sale(
+                    sale_number=f"{PREFIX}-SAL-{number:07d}",
+                    sale_type=sale_type,
+                    status=status,
+                    customer_id=self.rng.choice(customers),
+                    total_amount=total_amount,
+                    tax_amount=tax_amount,
+                    net_amount=net_amount,
+                    amount_paid=paid,
+                    balance_due=net_amount - paid,
+                    is_paid=paid >= net_amount,
+                    sale_date=when.date(),
+                    created_at=when,
+                )
+                sales.append(sale)
+                lines.append(sale_lines)
+
+            # Sale pks are needed before their lines and payments can be built
+            Sale.objects.bulk_create(sales, batch_size=self.batch_size)
+            sale_items, payments = [], []
+            for sale, sale_lines in zip(sales, lines):
+                for line in sale_lines:
+                    line.sale = sale
+                    sale_items.append(line)
+                if sale.amount_paid:
+                    payments.append(Payment(
+                        sale=sale,
+                        amount=sale.amount_paid,
+                        payment_method=self.rng.choice(methods),
+                        payment_date=sale.sale_date,
+                        reference_number=sale.sale_number,
+                    ))
+            created['sales'] += len(sales)
+            created['sale_items'] += len(sale_items)
+            created['payments'] += len(payments)
+            return [(SaleItem, sale_items), (Payment, payments)]
+
+        with backdating(Sale, 'created_at'), backdating(SaleItem, 'created_at'):
+            self._insert('sales', count, build)
+        return created
+
+    # Audit -------------------------------------------------------------------------
+
+    def seed_audit_logs(self, count):
+        from audit.models import AuditLog
+
+        user_ids = list(User.objects.values_list('pk', flat=True)) or [None]
+        modules = [value for value, label in AuditLog.MODULE_CHOICES]
+        actions = [value for value, label in AuditLog.ACTION_CHOICES]
+
+        def build(start, size):
+            logs = []
+            for _ in range(size):
+                module = self.rng.choice(modules)
+                action = self.rng.choice(actions)
+                logs.append(AuditLog(
+                    user_id=self.rng.choice(user_ids),
+                    timestamp=self._when(),
+                    module=module,
+                    action=action,
+                    object_type=module.title(),
+                    object_id=str(self.rng.randrange(1, 100_000)),
+                    description=f"{PREFIX} {action.lower()} on {module.lower()}",
+                    ip_address=f"10.0.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}",
+                ))
+            return [(AuditLog, logs)]
+
+        self._insert('audit_logs', count, build)
+        return {'audit_logs': count}
+
+    # HR ------------------------------------------------------------------------------
+
+    def seed_employees(self, count):
+        from hr.models import Employee, LeaveRequest, LeaveType
+
+        departments = [value for value, label in Employee.DEPARTMENT_CHOICES if value]
+        positions = [value for value, label in Employee.POSITION_CHOICES if value]
+        if not LeaveType.objects.exists():
+            LeaveType.objects.bulk_create([
+                LeaveType(name='Annual Leave', max_days=21),
+                LeaveType(name='Sick Leave', max_days=14, requires_approval=False),
+            ])
+        leave_types = list(LeaveType.objects.values_list('pk', flat=True))
+        statuses = [value for value, label in LeaveRequest.STATUS_CHOICES]
+        first = self._next_number(Employee, 'employee_id')
+        created = {'employees': 0, 'leave_requests': 0}
+
+        def build(start, size):
+            employees = [
+                Employee(
+                    employee_id=f"{PREFIX}-{number:05d}",
+                    full_name=f"Bench Employee {number:05d}",
+                    department=self.rng.choice(departments),
+                    position=self.rng.choice(positions),
+                    phone=f"07{self.rng.randrange(10**8):08d}",
+                    address='Dar es Salaam',
+                    date_joined=self._when().date(),
+                )
+                for number in range(first + start, first + start + size)
+            ]
+            Employee.objects.bulk_create(employees, batch_size=self.batch_size)
+            leaves = []
+            for employee in employees:
+                for _ in range(self.rng.randint(0, LEAVES_PER_EMPLOYEE * 2)):
+                    submitted = self._when()
+                    start_date = (submitted + timedelta(days=self.rng.randint(1, 30))).date()
+                    days = self.rng.randint(1, 14)
+                    leaves.append(LeaveRequest(
+                        employee=employee,
+                        leave_type_id=self.rng.choice(leave_types),
+                        start_date=start_date,
+                        end_date=start_date + timedelta(days=days - 1),
+                        days_requested=days,
+                        reason='Synthetic leave',
+                        status=self.rng.choice(statuses),
+                        submitted_date=submitted,
+                    ))
+            created['employees'] += len(employees)
+            created['leave_requests'] += len(leaves)
+            return [(LeaveRequest, leaves)]
+
+        with backdating(LeaveRequest, 'submitted_date'):
+            self._insert('employees', count, build)
+        return created
+
+    # Finance -------------------------------------------------------------------------
+
+    def seed_payrolls(self, count):
+        """Monthly payroll of the bench employees, latest months first, up to `count` rows"""
+        from finance.models import Payroll
+        from hr.models import Employee
+
+        employees = list(
+            Employee.objects.filter(employee_id__startswith=f'{PREFIX}-').order_by('pk').values_list('pk', flat=True)
+        )
+        if not employees:
+            return {'payrolls': 0}
+        months = [name for name, label in Payroll.MONTH_CHOICES]
+        existing = set(
+            Payroll.objects.filter(employee_id__in=employees).values_list('employee_id', 'month', 'year')
+        )
+        today = self.now.date()
+        periods = []
+        year, month = today.year, today.month
+        for _ in range(max(self.days // 30, 1)):
+            periods.append((year, month))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        rows = [
+            (employee, months[month - 1], year)
+            for year, month in periods
+            for employee in employees
+            if (employee, months[month - 1], year) not in existing
+        ][:count]
+        # The current and previous month are still being paid
+        unpaid = {(months[month - 1], year) for year, month in periods[:2]}
+
+        def build(start, size):
+            payrolls = []
+            for employee, month, year in rows[start:start + size]:
+                basic = self._money(300_000, 3_000_000)
+                is_paid = (month, year) not in unpaid
+                payrolls.append(Payroll(
+                    employee_id=employee,
+                    basic_salary=basic,
+                    allowances=(basic * Decimal('0.1')).quantize(CENTS),
+                    tax_amount=(basic * Decimal('0.09')).quantize(CENTS),
+                    pension_amount=(basic * Decimal('0.1')).quantize(CENTS),
+                    month=month,
+                    year=year,
+                    is_paid=is_paid,
+                    payment_date=date(year, months.index(month) + 1, 28) if is_paid else None,
+                ))
+            return [(Payroll, payrolls)]
+
+        self._insert('payrolls', len(rows), build)
+        return {'payrolls': len(rows)}
+
+    def seed_incomes(self, count):
+        from finance.models import Income
+
+        types = [value for value, label in Income.INCOME_TYPES]
+        methods = [value for value, label in Income._meta.get_field('payment_method').choices]
+
+        def build(start, size):
+            incomes = []
+            for _ in range(size):
+                when = self._when()
+                # Most income is collected; a few records are cancelled
+                is_paid = self.rng.random() < 0.8
+                is_active = self.rng.random() < 0.97
+                incomes.append(Income(
+                    source=f"{PREFIX} income",
+                    amount=self._money(10_000, 5_000_000),
+                    date=when.date(),
+                    income_type=self.rng.choice(types),
+                    payment_method=self.rng.choice(methods),
+                    is_paid=is_paid,
+                    payment_date=(when + timedelta(days=self.rng.randint(0, 30))).date() if is_paid else None,
+                    is_active=is_active,
+                    is_cancelled=not is_active,
+                    created_by='benchmark',
+                    created_at=when,
+                ))
+            return [(Income, incomes)]
+
+        with backdating(Income, 'created_at'):
+            self._insert('incomes', count, build)
+        return {'incomes': count}
+
+    def seed_expenses(self, count):
+        from finance.models import Expense
+
+        types = [value for value, label in Expense.EXPENSE_TYPES if value != 'Procurement']
+        methods = [value for value, label in Expense._meta.get_field('payment_method').choices]
+
+        def build(start, size):
+            expenses = []
+            for _ in range(size):
+                when = self._when()
+                expense_type = self.rng.choice(types)
+                is_paid = self.rng.random() < 0.85
+                expenses.append(Expense(
+                    category=f"{PREFIX} {expense_type.lower()}",
+                    expense_type=expense_type,
+                    amount=self._money(5_000, 2_000_000),
+                    date=when.date(),
+                    is_paid=is_paid,
+                    payment_date=(when + timedelta(days=self.rng.randint(0, 30))).date() if is_paid else None,
+                    payment_method=self.rng.choice(methods),
+                    created_at=when,
+                ))
+            return [(Expense, expenses)]
+
+        with backdating(Expense, 'created_at'):
+            self._insert('expenses', count, build)
+        return {'expenses': count}
+
+    def seed_transactions(self, count):
+        from finance.models import Account, Transaction
+
+        accounts = {}
+        for code, name, account_type in [
+            ('1000', 'Cash', 'Asset'),
+            ('4000', 'Sales Revenue', 'Revenue'),
+            ('5000', 'Operating Expenses', 'Expense'),
+            ('5100', 'Salary Expense', 'Expense'),
+        ]:
+            accounts[code], _ = Account.objects.get_or_create(
+                code=code, defaults={'name': name, 'account_type': account_type},
+            )
+        postings = [
+            ('Income', '1000', '4000'),
+            ('Income', '1000', '4000'),
+            ('Expense', '5000', '1000'),
+            ('Payroll', '5100', '1000'),
+        ]
+
+        def build(start, size):
+            rows = []
+            for _ in range(size):
+                transaction_type, debit, credit = self.rng.choice(postings)
+                rows.append(Transaction(
+                    transaction_type=transaction_type,
+                    amount=self._money(10_000, 5_000_000),
+                    date=self._when(),
+                    description=f"{PREFIX} {transaction_type.lower()}",
+                    debit_account=accounts[debit],
+                    credit_account=accounts[credit],
+                    created_by='benchmark',
+                ))
+            return [(Transaction, rows)]
+
+        with backdating(Transaction, 'date'):
+            self._insert('transactions', count, build)
+        return {'transactions': count}
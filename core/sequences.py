@@ -0,0 +1,100 @@
+# cornelsimba/core/sequences.py
+"""
+Document numbers (SALE-20250101-0001, PO-..., EMP-001) from a counter table.
+
+Each (prefix, period) pair has one DocumentSequence row. Taking a number is a
+single `UPDATE ... SET last_value = last_value + 1` on that row followed by
+an indexed read of the new value; the row lock held by the UPDATE means two
+concurrent creates can never see the same value. Inside a larger
+transaction the number rolls back with it, so it is gap-free.
+
+The row is created on first use. `seed` lets a caller start the counter after
+numbers that already exist (generated by the old count()/timestamp schemes);
+it only runs when the row is created.
+
+With DOCUMENT_SEQUENCE_BLOCK_SIZE > 1 (or block_size=...), a process reserves
+that many values per UPDATE and hands them out from memory. Blocks are only
+reserved outside transactions (a rolled-back block would be handed out
+twice); unused values are lost when the process exits, so numbering then has
+gaps.
+"""
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DocumentSequence
+
+BLOCK_SIZE = getattr(settings, 'DOCUMENT_SEQUENCE_BLOCK_SIZE', 1)
+
+_lock = threading.Lock()
+# (prefix, period) -> [next value, last value] of a reserved block
+_blocks = {}
+
+
+def _advance(prefix, period, step, seed):
+    """Move the counter on by `step` and return its new value"""
+    with transaction.atomic():
+        updated = DocumentSequence.objects.filter(prefix=prefix, period=period).update(
+            last_value=F('last_value') + step,
+        )
+        if not updated:
+            start = seed() if seed else 0
+            try:
+                with transaction.atomic():
+                    DocumentSequence.objects.create(prefix=prefix, period=period, last_value=start + step)
+                return start + step
+            except IntegrityError:
+                # Another process created the row first
+                DocumentSequence.objects.filter(prefix=prefix, period=period).update(
+                    last_value=F('last_value') + step,
+                )
+        return DocumentSequence.objects.filter(prefix=prefix, period=period).values_list(
+            'last_value', flat=True,
+        ).get()
+
+
+def next_value(prefix, period='', seed=None, block_size=None):
+    """Next integer in the (prefix, period) sequence"""
+    block_size = block_size or BLOCK_SIZE
+    key = (prefix, period)
+    if block_size > 1:
+        with _lock:
+            block = _blocks.get(key)
+            if block and block[0] <= block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+            if not connection.in_atomic_block:
+                last = _advance(prefix, period, block_size, seed)
+                _blocks[key] = [last - block_size + 2, last]
+                return last - block_size + 1
+    return _advance(prefix, period, 1, seed)
+
+
+def max_suffix(model, field, start):
+    """Highest trailing number among `field` values beginning with `start` (0 if none)"""
+    values = model._default_manager.filter(**{f'{field}__startswith': start}).values_list(field, flat=True)
+    numbers = [0]
+    for value in values:
+        try:
+            numbers.append(int(value.rsplit('-', 1)[-1]))
+        except (ValueError, AttributeError):
+            continue
+    return max(numbers)
+
+
+def daily_number(prefix, model, field, width=4, date=None):
+    """`PREFIX-YYYYMMDD-0001`, numbered per day; `model.field` seeds a new day"""
+    period = (date or timezone.localdate()).strftime('%Y%m%d')
+    start = f"{prefix}-{period}-"
+    value = next_value(prefix, period, seed=lambda: max_suffix(model, field, start))
+    return f"{start}{value:0{width}d}"
+
+
+def serial_number(prefix, model, field, width=3):
+    """`PREFIX-001`, one running sequence; `model.field` seeds it"""
+    value = next_value(prefix, seed=lambda: max_suffix(model, field, f"{prefix}-"))
+    return f"{prefix}-{value:0{width}d}"
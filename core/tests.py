@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from .middleware import QueryBudgetExceeded, query_budget
+
+
+def _three_queries(request):
+    for _ in range(3):
+        User.objects.count()
+    return HttpResponse('ok')
+
+
+urlpatterns = [
+    path('over-budget/', query_budget(2)(_three_queries)),
+    path('within-budget/', query_budget(3)(_three_queries)),
+]
+
+
+@override_settings(ROOT_URLCONF='core.tests')
+@mock.patch('core.middleware.BUDGET_STRICT', True)
+class QueryBudgetTests(TestCase):
+    def test_over_budget_view_fails(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, '3 queries (budget 2)'):
+            self.client.get('/over-budget/')
+
+    def test_view_within_budget_passes(self):
+        response = self.client.get('/within-budget/')
+        self.assertEqual(response.status_code, 200)
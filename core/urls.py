@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('performance/', views.request_metrics, name='request_metrics'),
+]
@@ -0,0 +1,68 @@
+# cornelsimba/core/views.py
+from datetime import timedelta
+
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import render
+from django.utils import timezone
+
+from .middleware import LATENCY_BUCKETS_MS, RECENT, percentile
+from .models import RequestMetric
+
+WINDOWS = {'1h': 1, '24h': 24, '7d': 24 * 7}
+
+
+def is_staff(user):
+    return user.is_staff
+
+
+@login_required
+@user_passes_test(is_staff)
+def request_metrics(request):
+    """p50 / p95 latency and query counts per URL name, plus the most recent requests"""
+    window = request.GET.get('window', '24h')
+    hours = WINDOWS.get(window, 24)
+    since = timezone.now() - timedelta(hours=hours)
+
+    by_view = {}
+    for metric in RequestMetric.objects.filter(period_start__gte=since - timedelta(hours=1)):
+        row = by_view.setdefault(metric.view_name, {
+            'view_name': metric.view_name,
+            'requests': 0, 'errors': 0, 'budget_exceeded': 0,
+            'total_ms': 0.0, 'db_ms': 0.0, 'template_ms': 0.0, 'queries': 0,
+            'max_ms': 0.0, 'max_queries': 0, 'response_bytes': 0,
+            'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        })
+        for field in ('requests', 'errors', 'budget_exceeded', 'queries', 'response_bytes'):
+            row[field] += getattr(metric, field)
+        for field in ('total_ms', 'db_ms', 'template_ms'):
+            row[field] += getattr(metric, field)
+        row['max_ms'] = max(row['max_ms'], metric.max_ms)
+        row['max_queries'] = max(row['max_queries'], metric.max_queries)
+        row['histogram'] = [a + b for a, b in zip(row['histogram'], metric.latency_histogram)]
+
+    rows = []
+    for row in by_view.values():
+        count = row['requests'] or 1
+        row.update({
+            'p50_ms': percentile(row['histogram'], 0.5),
+            'p95_ms': percentile(row['histogram'], 0.95),
+            'avg_ms': row['total_ms'] / count,
+            'avg_db_ms': row['db_ms'] / count,
+            'avg_template_ms': row['template_ms'] / count,
+            'avg_queries': row['queries'] / count,
+            'avg_kb': row['response_bytes'] / count / 1024,
+        })
+        rows.append(row)
+    sort = request.GET.get('sort', 'p95_ms')
+    if sort not in ('p95_ms', 'p50_ms', 'avg_queries', 'max_queries', 'requests', 'avg_db_ms'):
+        sort = 'p95_ms'
+    rows.sort(key=lambda row: row[sort] if row[sort] is not None else float('inf'), reverse=True)
+
+    return render(request, 'core/request_metrics.html', {
+        'rows': rows,
+        'recent': list(reversed(RECENT))[:50],
+        'window': window,
+        'windows': list(WINDOWS),
+        'sort': sort,
+        'open_bucket_ms': LATENCY_BUCKETS_MS[-1],
+    })
@@ -36,6 +36,7 @@ urlpatterns = [
     path('sales/', include('sales.urls')),
 
     path('audit/', include('audit.urls')),
+    path('core/', include('core.urls')),
     path('accounts/logout/', auth_views.LogoutView.as_view(), name='logout'),
 ]
 
@@ -1,3 +1,16 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+
+class MainDashboardTests(TestCase):
+    """main_dashboard within its @query_budget, which fails the request under `manage.py test`"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_main_dashboard_within_budget(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard:main'))
+        self.assertEqual(response.status_code, 200)
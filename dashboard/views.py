@@ -6,6 +6,7 @@ from finance.models import FinanceEditRequest
 import logging
 
 from audit.models import AuditLog
+from core.middleware import query_budget
 
 from accounts.constants import (
     GROUP_ADMIN,
@@ -46,6 +47,7 @@ logger = logging.getLogger(__name__)
 
 
 @login_required
+@query_budget(25)
 def main_dashboard(request):
     user = request.user
     modules = set()
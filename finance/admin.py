@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Income, Expense, Payroll, Account, Transaction
+from .models import Income, Expense, Payroll, Account, Transaction, SaleIncomeEvent
 from django.utils.html import format_html
 
 @admin.register(Income)
@@ -108,4 +108,20 @@ class TransactionAdmin(admin.ModelAdmin):
     readonly_fields = ('date',)
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('debit_account', 'credit_account')
\ No newline at end of file
+        return super().get_queryset(request).select_related('debit_account', 'credit_account')
+
+
+@admin.register(SaleIncomeEvent)
+class SaleIncomeEventAdmin(admin.ModelAdmin):
+    list_display = ('sale', 'status', 'attempts', 'available_at', 'created_at', 'processed_at', 'income')
+    list_filter = ('status',)
+    search_fields = ('sale__sale_number', 'last_error')
+    raw_id_fields = ('sale', 'stock_out', 'income')
+    readonly_fields = ('created_at', 'processed_at')
+    actions = ['retry_events']
+
+    def retry_events(self, request, queryset):
+        from .integration import retry_failed_events
+        count = retry_failed_events(queryset.values_list('sale_id', flat=True))
+        self.message_user(request, f'{count} event(s) re-queued.')
+    retry_events.short_description = "Re-queue failed events"
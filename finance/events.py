@@ -0,0 +1,22 @@
+# cornelsimba/finance/events.py
+"""Finance handlers for events published by other modules (see core/bus.py)"""
+import logging
+
+from core.bus import subscribe
+
+from .integration import process_sale_income_events
+
+logger = logging.getLogger(__name__)
+
+
+@subscribe('inventory.stock_outs.approved')
+def book_sale_income(event):
+    """Complete the approved sales and book their income (idempotent per sale)"""
+    result = process_sale_income_events(sale_ids=event.payload['sale_ids'])
+    if result['failed']:
+        # The failed SaleIncomeEvent rows keep their own backoff and are retried by
+        # process_sale_income; failing the delivery would make the bus redo them too
+        logger.warning(
+            f"{result['failed']} sale income event(s) failed for event {event.pk}; "
+            f"left to the sale income retries"
+        )
@@ -0,0 +1,160 @@
+# cornelsimba/finance/integration.py
+"""
+Sale -> Finance integration through an outbox table.
+
+Approving a sale's stock out writes one SaleIncomeEvent per sale in the same
+transaction (enqueue_sale_income). process_sale_income_events() then works
+the pending rows off in batches: it completes the sales, marks their lines as
+stocked out and creates income with Income.bulk_create_from_sales().
+
+The sale is the idempotency key: a sale can only ever have one event, rows
+are claimed with SELECT ... FOR UPDATE SKIP LOCKED (where the database
+supports it) and income creation skips sales that already have income, so
+running the processor twice, or from two workers, cannot double-book.
+A batch that fails is retried row by row; rows that keep failing are backed
+off exponentially and parked as 'failed' after SALE_INCOME_MAX_ATTEMPTS.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Income, SaleIncomeEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, 'SALE_INCOME_MAX_ATTEMPTS', 5)
+BATCH_SIZE = 100
+
+
+def enqueue_sale_income(stock_outs, user=None):
+    """
+    Record that the sales behind `stock_outs` are ready for income.
+
+    Call inside the approval transaction. Sales that already have an event
+    are left alone. Returns the sale ids.
+    """
+    events = {
+        stock_out.linked_sale_id: SaleIncomeEvent(
+            sale_id=stock_out.linked_sale_id,
+            stock_out=stock_out,
+            created_by=user,
+        )
+        for stock_out in stock_outs
+        if stock_out.linked_sale_id
+    }
+    if events:
+        SaleIncomeEvent.objects.bulk_create(list(events.values()), ignore_conflicts=True)
+    return list(events)
+
+
+def _apply(events, now):
+    """Complete the sales of `events` and create their income (one savepoint)"""
+    from sales.models import Sale, SaleItem
+    from sales.analytics import sync_sales_facts
+
+    sale_ids = [event.sale_id for event in events]
+    approved_at = SaleIncomeEvent.objects.filter(sale=OuterRef('pk')).values('created_at')[:1]
+
+    with transaction.atomic():
+        Sale.objects.filter(pk__in=sale_ids).exclude(status='COMPLETED').update(
+            status='COMPLETED',
+            stock_out_processed_date=Subquery(approved_at),
+            updated_at=now,
+        )
+        SaleItem.objects.filter(sale_id__in=sale_ids, is_stocked_out=False).update(
+            is_stocked_out=True,
+            stock_out_date=now,
+        )
+        sync_sales_facts(sale_ids)
+        user = events[0].created_by
+        incomes = Income.bulk_create_from_sales(
+            Sale.objects.filter(pk__in=sale_ids).select_related('customer'), user,
+        )
+
+        by_sale = {income.sale_id: income for income in incomes}
+        for event in events:
+            event.status = 'processed'
+            event.processed_at = now
+            event.attempts += 1
+            event.last_error = ''
+            event.income = by_sale.get(event.sale_id)
+        SaleIncomeEvent.objects.bulk_update(
+            events, ['status', 'processed_at', 'attempts', 'last_error', 'income'],
+        )
+    return incomes
+
+
+def _fail(event, error, now):
+    event.attempts += 1
+    event.last_error = str(error)
+    if event.attempts >= MAX_ATTEMPTS:
+        event.status = 'failed'
+    else:
+        # 1, 2, 4, 8... minutes
+        event.available_at = now + timedelta(minutes=2 ** (event.attempts - 1))
+    event.save(update_fields=['attempts', 'last_error', 'status', 'available_at'])
+    logger.error(f"Sale income event for sale {event.sale_id} failed (attempt {event.attempts}): {error}")
+
+
+@transaction.atomic
+def _process_batch(queryset, batch_size, now):
+    events = list(
+        queryset.select_for_update(skip_locked=True).select_related('created_by')[:batch_size]
+    )
+    if not events:
+        return None
+
+    result = {'processed': 0, 'failed': 0, 'incomes': []}
+    try:
+        result['incomes'] = _apply(events, now)
+        result['processed'] = len(events)
+        return result
+    except Exception as e:
+        if len(events) == 1:
+            _fail(events[0], e, now)
+            result['failed'] = 1
+            return result
+
+    # Isolate the bad rows so the rest of the batch still goes through
+    for event in events:
+        try:
+            result['incomes'] += _apply([event], now)
+            result['processed'] += 1
+        except Exception as e:
+            _fail(event, e, now)
+            result['failed'] += 1
+    return result
+
+
+def process_sale_income_events(sale_ids=None, batch_size=BATCH_SIZE, now=None):
+    """
+    Work off pending events that are due (optionally only those for `sale_ids`).
+
+    Returns {'processed': int, 'failed': int, 'incomes': [Income]}.
+    """
+    now = now or timezone.now()
+    queryset = SaleIncomeEvent.objects.filter(status='pending', available_at__lte=now).order_by('pk')
+    if sale_ids is not None:
+        queryset = queryset.filter(sale_id__in=list(sale_ids))
+
+    totals = {'processed': 0, 'failed': 0, 'incomes': []}
+    while True:
+        result = _process_batch(queryset, batch_size, now)
+        if result is None:
+            break
+        totals['processed'] += result['processed']
+        totals['failed'] += result['failed']
+        totals['incomes'] += result['incomes']
+    return totals
+
+
+def retry_failed_events(sale_ids=None):
+    """Put failed events back in the queue. Returns the count."""
+    queryset = SaleIncomeEvent.objects.filter(status='failed')
+    if sale_ids is not None:
+        queryset = queryset.filter(sale_id__in=list(sale_ids))
+    return queryset.update(status='pending', attempts=0, available_at=timezone.now())
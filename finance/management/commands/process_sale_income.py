@@ -0,0 +1,26 @@
+# cornelsimba/finance/management/commands/process_sale_income.py
+from django.core.management.base import BaseCommand
+
+from finance.integration import BATCH_SIZE, process_sale_income_events, retry_failed_events
+
+
+class Command(BaseCommand):
+    help = 'Complete approved sales and book their income from the outbox (run every few minutes from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Re-queue events that exhausted their attempts first')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = retry_failed_events()
+            self.stdout.write(f"Re-queued {requeued} failed events")
+
+        result = process_sale_income_events(batch_size=options['batch_size'])
+        self.stdout.write(
+            f"Processed {result['processed']} events, "
+            f"created {len(result['incomes'])} income records, "
+            f"{result['failed']} failed"
+        )
+        self.stdout.write(self.style.SUCCESS('Sale income processing complete'))
@@ -0,0 +1,37 @@
+# cornelsimba/finance/management/commands/reconcile_procurement.py
+from django.core.management.base import BaseCommand
+
+from finance.reconciliation import expense_delivered_purchase_orders, reconciliation_report
+
+
+class Command(BaseCommand):
+    help = 'Book expenses for delivered, finance-ready POs and report PO / expense / receipt mismatches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--report-only', action='store_true',
+                            help='Only print the mismatch report, create no expenses')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Book at most this many POs')
+
+    def handle(self, *args, **options):
+        if not options['report_only']:
+            result = expense_delivered_purchase_orders(limit=options['limit'])
+            expenses = result['expenses']
+            total = sum(expense.amount for expense in expenses)
+            self.stdout.write(f"Created {len(expenses)} expenses (Tsh {total:,.2f})")
+            if result['skipped_closed']:
+                self.stdout.write(self.style.WARNING(
+                    f"Accounting period closed: skipped {len(result['skipped_closed'])} POs"
+                ))
+
+        report = reconciliation_report()
+        for row in report['rows']:
+            po = row['purchase_order']
+            self.stdout.write(
+                f"{po.po_number}: PO Tsh {row['total_amount']:,.2f} | "
+                f"expense Tsh {row['expense_amount']:,.2f} | "
+                f"received Tsh {row['received_value']:,.2f} | {', '.join(row['issues'])}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {report['checked']} delivered POs, {len(report['rows'])} with mismatches"
+        ))
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-19 00:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def enqueue_unbooked_sales(apps, schema_editor):
+    """Queue sales whose stock out was approved but which never got income"""
+    StockOut = apps.get_model('inventory', 'StockOut')
+    SaleIncomeEvent = apps.get_model('finance', 'SaleIncomeEvent')
+
+    rows = StockOut.objects.filter(
+        status='approved',
+        linked_sale__isnull=False,
+        linked_sale__income_records__isnull=True,
+    ).order_by('linked_sale_id', 'pk').values_list('linked_sale_id', 'pk')
+    events = {}
+    for sale_id, stock_out_id in rows:
+        events.setdefault(sale_id, SaleIncomeEvent(sale_id=sale_id, stock_out_id=stock_out_id))
+    SaleIncomeEvent.objects.bulk_create(list(events.values()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0010_financeeditrequest_edit_reason'),
+        ('inventory', '0018_stockoutline'),
+        ('sales', '0006_alter_sale_options_remove_sale_currency_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleIncomeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sale_income_events', to=settings.AUTH_USER_MODEL)),
+                ('income', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='finance.income')),
+                ('sale', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='income_event', to='sales.sale')),
+                ('stock_out', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='income_events', to='inventory.stockout')),
+            ],
+            options={
+                'ordering': ['pk'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='finance_sal_status_67ba80_idx')],
+            },
+        ),
+        migrations.RunPython(enqueue_unbooked_sales, migrations.RunPython.noop),
+    ]
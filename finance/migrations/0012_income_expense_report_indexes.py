@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-19 00:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0011_saleincomeevent'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='finance_exp_is_paid_26be49_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='finance_inc_is_acti_6c00ad_idx',
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['is_paid', 'date'], name='finance_exp_is_paid_30b855_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['is_active', 'date'], name='finance_inc_is_acti_447235_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['is_paid', 'is_active', 'payment_date'], name='finance_inc_is_paid_aead26_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_income_expense_report_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='income',
+            name='finance_inc_is_paid_aead26_idx',
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_paid', True)), fields=['payment_date'], name='income_paid_payment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_paid', False)), fields=['date'], name='income_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payroll',
+            index=models.Index(condition=models.Q(('is_paid', False)), fields=['year', 'month'], name='payroll_unpaid_idx'),
+        ),
+    ]
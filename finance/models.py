@@ -2,6 +2,7 @@
 from django.db import models
 from hr.models import Employee
 from procurement.models import PurchaseOrder
+from core.cache import bump_versions
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from django.utils import timezone
@@ -141,8 +142,22 @@ class Income(models.Model):
         indexes = [
             models.Index(fields=['date']),
             models.Index(fields=['income_type']),
-            models.Index(fields=['is_active']),
             models.Index(fields=['sale']),
+            # Reports: active income in a date range (is_active alone is served by
+            # the leading column)
+            models.Index(fields=['is_active', 'date']),
+            # Django filters booleans as `"is_paid"` / `NOT "is_paid"`, which SQLite
+            # cannot seek on; partial indexes match those predicates instead
+            models.Index(
+                fields=['payment_date'],
+                condition=models.Q(is_paid=True, is_active=True),
+                name='income_paid_payment_date_idx',
+            ),
+            models.Index(
+                fields=['date'],
+                condition=models.Q(is_paid=False, is_active=True),
+                name='income_unpaid_idx',
+            ),
         ]
 
     @classmethod
@@ -200,6 +215,132 @@ class Income(models.Model):
         
         return income
 
+    @classmethod
+    def bulk_create_from_sales(cls, sales, user=None):
+        """
+        Create income (and its ledger transaction) for many completed sales at once.
+        
+        Sales that already have income, or fall in a closed accounting period,
+        are skipped. Returns the created Income records.
+        """
+        sales = [sale for sale in sales if sale.status == 'COMPLETED']
+        if not sales:
+            return []
+        
+        existing = set(
+            cls.objects.filter(sale__in=sales).values_list('sale_id', flat=True)
+        )
+        closed_periods = set(
+            AccountingPeriod.objects.filter(is_closed=True).values_list('year', 'month')
+        )
+        created_by = user.get_full_name() if user else 'System'
+        today = timezone.now().date()
+        
+        incomes = []
+        for sale in sales:
+            if sale.pk in existing:
+                continue
+            sale_date = sale.sale_date or today
+            if (sale_date.year, sale_date.month) in closed_periods:
+                logger.warning(f"Skipped income for sale {sale.sale_number}: accounting period is closed")
+                continue
+            incomes.append(cls(
+                source=f"Sale: {sale.sale_number}",
+                amount=sale.net_amount,
+                currency='Tsh',
+                date=sale_date,
+                income_type='Sales',
+                description=f"Sale to {sale.customer.name}",
+                reference=sale.sale_number,
+                sale=sale,
+                is_paid=False,  # Sales income may not be paid immediately
+                created_by=created_by,
+            ))
+        if not incomes:
+            return []
+        
+        incomes = cls.objects.bulk_create(incomes)
+        
+        sales_account, _ = Account.objects.get_or_create(
+            code='4000',
+            defaults={'name': 'Sales Revenue', 'account_type': 'Revenue'}
+        )
+        cash_account, _ = Account.objects.get_or_create(
+            code='1000',
+            defaults={'name': 'Cash', 'account_type': 'Asset'}
+        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                transaction_type='Income',
+                amount=income.amount,
+                description=f"Sale income: {income.reference}",
+                income=income,
+                debit_account=cash_account,  # Cash increases (debit)
+                credit_account=sales_account,  # Revenue increases (credit)
+                created_by=created_by,
+            )
+            for income in incomes
+        ])
+        bump_versions(cls, Transaction)
+        
+        return incomes
+
+
+class SaleIncomeEvent(models.Model):
+    """
+    Outbox row: a sale's stock out was approved and its income is due.
+    
+    One row per sale (the sale is the idempotency key). Rows are written in
+    the approval transaction and worked off by finance.integration, which
+    completes the sale and creates its income; failures are retried with
+    backoff (see the process_sale_income command).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+    
+    sale = models.OneToOneField(
+        'sales.Sale',
+        on_delete=models.CASCADE,
+        related_name='income_event'
+    )
+    stock_out = models.ForeignKey(
+        'inventory.StockOut',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='income_events'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='sale_income_events'
+    )
+    income = models.ForeignKey(
+        Income,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    
+    class Meta:
+        ordering = ['pk']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+    
+    def __str__(self):
+        return f"Income event for sale {self.sale_id} ({self.status})"
 
 class Expense(models.Model):
     EXPENSE_TYPES = [
@@ -303,9 +444,9 @@ class Expense(models.Model):
         indexes = [
             models.Index(fields=['date']),
             models.Index(fields=['expense_type']),
-            models.Index(fields=['is_paid']),
             models.Index(fields=['purchase_order']),
             models.Index(fields=['payment_date']),
+            models.Index(fields=['is_paid', 'date']),
         ]
 
 class Payroll(models.Model):
@@ -393,6 +534,8 @@ class Payroll(models.Model):
             models.Index(fields=['month', 'year']),
             models.Index(fields=['is_paid']),
             models.Index(fields=['payment_date']),
+            # Unpaid payroll (finance dashboard): see Income's partial indexes
+            models.Index(fields=['year', 'month'], condition=models.Q(is_paid=False), name='payroll_unpaid_idx'),
         ]
 
 
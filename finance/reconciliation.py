@@ -0,0 +1,195 @@
+# cornelsimba/finance/reconciliation.py
+"""
+Procurement -> Finance reconciliation.
+
+expense_delivered_purchase_orders() books every delivered, finance-ready
+purchase order that has no expense yet: the candidates come from one
+anti-join (NOT EXISTS expense), their rows are locked with SKIP LOCKED so
+two runs cannot book the same PO, and the expenses and their ledger
+transactions are written with two bulk_create calls. Nothing is booked
+while the expense date's accounting period is closed, as Expense.save()
+would refuse it.
+
+reconciliation_report() compares, for each delivered PO, the PO total with
+the booked expense amount and with the value actually received into stock
+(StockIn quantity x the item's average line price on the PO), in one query.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Count, DecimalField, Exists, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.cache import bump_versions
+from inventory.models import StockIn
+from procurement.matching import match_purchase_orders
+from procurement.models import FINANCE_READY, PurchaseOrder, PurchaseOrderItem
+
+from .models import Account, AccountingPeriod, Expense, Transaction
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+TOLERANCE = Decimal('0.01')
+MONEY = DecimalField(max_digits=17, decimal_places=2)
+PRICE = DecimalField(max_digits=20, decimal_places=6)
+
+ISSUE_LABELS = {
+    'no_expense': 'No expense booked',
+    'duplicate_expense': 'More than one expense',
+    'expense_mismatch': 'Expense differs from PO total',
+    'not_received': 'Nothing received into stock',
+    'receipt_mismatch': 'Received value differs from PO total',
+}
+
+
+def unexpensed_purchase_orders():
+    """Delivered, finance-ready POs without an expense"""
+    return PurchaseOrder.objects.filter(FINANCE_READY, status='Delivered').filter(
+        ~Exists(Expense.objects.filter(purchase_order=OuterRef('pk')))
+    )
+
+
+def _item_names(purchase_order_ids):
+    names = {}
+    for po_id, name in PurchaseOrderItem.objects.filter(
+        purchase_order_id__in=purchase_order_ids,
+    ).order_by('item__name').values_list('purchase_order_id', 'item__name'):
+        names.setdefault(po_id, []).append(name)
+    return names
+
+
+@transaction.atomic
+def expense_delivered_purchase_orders(user=None, expense_date=None, limit=None):
+    """
+    Create the missing procurement expenses (and their ledger transactions).
+
+    Returns {'expenses': [...], 'skipped_closed': [po_number, ...]}.
+    """
+    expense_date = expense_date or timezone.now().date()
+    result = {'expenses': [], 'skipped_closed': []}
+
+    candidates = unexpensed_purchase_orders().select_for_update(skip_locked=True, of=('self',))
+    candidates = candidates.select_related('supplier').order_by('order_date', 'pk')
+    purchase_orders = list(candidates[:limit] if limit else candidates)
+    if not purchase_orders:
+        return result
+
+    if AccountingPeriod.objects.filter(
+        year=expense_date.year, month=expense_date.month, is_closed=True,
+    ).exists():
+        result['skipped_closed'] = [po.po_number for po in purchase_orders]
+        logger.warning(f"Skipped {len(purchase_orders)} PO expenses: accounting period {expense_date:%Y-%m} is closed")
+        return result
+
+    names = _item_names([po.pk for po in purchase_orders])
+    expenses = Expense.objects.bulk_create([
+        Expense(
+            category=f"PO: {po.supplier.name}",
+            expense_type='Procurement',
+            amount=po.total_amount,
+            currency='Tsh',  # Always Tsh for procurement
+            date=expense_date,
+            description=f"Purchase Order {po.po_number}\nItems: {', '.join(names.get(po.pk, []))}",
+            purchase_order=po,
+            department=po.department,
+            is_paid=False,
+            payment_method='Bank',
+        )
+        for po in purchase_orders
+    ])
+
+    expense_account, _ = Account.objects.get_or_create(
+        code='5000',
+        defaults={'name': 'Operating Expenses', 'account_type': 'Expense'}
+    )
+    cash_account, _ = Account.objects.get_or_create(
+        code='1000',
+        defaults={'name': 'Cash', 'account_type': 'Asset'}
+    )
+    created_by = (user.get_full_name() or user.username) if user else 'System'
+    Transaction.objects.bulk_create([
+        Transaction(
+            transaction_type='Expense',
+            amount=expense.amount,
+            currency=expense.currency,
+            description=f"Expense payment: {expense.category}",
+            expense=expense,
+            debit_account=expense_account,
+            credit_account=cash_account,
+            created_by=created_by,
+        )
+        for expense in expenses
+    ])
+    bump_versions(Expense, Transaction)
+    match_purchase_orders(PurchaseOrder.objects.filter(pk__in=[po.pk for po in purchase_orders]))
+    result['expenses'] = expenses
+    return result
+
+
+def reconciliation_rows(purchase_orders=None):
+    """Delivered POs annotated with expense_amount, expense_count and received_value"""
+    purchase_orders = PurchaseOrder.objects.filter(status='Delivered') if purchase_orders is None else purchase_orders
+    expenses = Expense.objects.filter(purchase_order=OuterRef('pk')).order_by().values('purchase_order')
+    # An item can be on several lines of a PO: average them as matching.evaluate() does
+    line_price = PurchaseOrderItem.objects.filter(
+        purchase_order=OuterRef('purchase_order'), item=OuterRef('item'),
+    ).order_by().values('purchase_order', 'item').annotate(
+        price=ExpressionWrapper(Sum('total_price') / Sum('quantity'), output_field=PRICE),
+    ).values('price')[:1]
+    receipts = StockIn.objects.filter(purchase_order=OuterRef('pk')).order_by().annotate(
+        line_price=Subquery(line_price),
+    ).values('purchase_order')
+    received_value = ExpressionWrapper(F('quantity') * F('line_price'), output_field=MONEY)
+    return purchase_orders.annotate(
+        expense_amount=Coalesce(
+            Subquery(expenses.annotate(total=Sum('amount')).values('total')[:1]), Value(ZERO), output_field=MONEY,
+        ),
+        expense_count=Coalesce(
+            Subquery(expenses.annotate(n=Count('pk')).values('n')[:1]), Value(0),
+        ),
+        received_value=Coalesce(
+            Subquery(receipts.annotate(total=Sum(received_value)).values('total')[:1]), Value(ZERO), output_field=MONEY,
+        ),
+    )
+
+
+def reconciliation_report(purchase_orders=None):
+    """
+    Delivered POs whose total, expense and received value disagree.
+
+    Returns {'rows': [...], 'checked': n, 'counts': {issue: n}}; each row has
+    the PO figures and the labels of its issues (ISSUE_LABELS).
+    """
+    rows = reconciliation_rows(purchase_orders).select_related('supplier').order_by('-order_date', '-pk')
+    report = {'rows': [], 'checked': 0, 'counts': {}}
+    for po in rows:
+        report['checked'] += 1
+        issues = []
+        if not po.expense_count:
+            issues.append('no_expense')
+        else:
+            if po.expense_count > 1:
+                issues.append('duplicate_expense')
+            if abs(po.expense_amount - po.total_amount) > TOLERANCE:
+                issues.append('expense_mismatch')
+        if not po.received_value:
+            issues.append('not_received')
+        elif abs(po.received_value - po.total_amount) > TOLERANCE:
+            issues.append('receipt_mismatch')
+        if not issues:
+            continue
+        for issue in issues:
+            report['counts'][issue] = report['counts'].get(issue, 0) + 1
+        report['rows'].append({
+            'purchase_order': po,
+            'total_amount': po.total_amount,
+            'expense_amount': po.expense_amount,
+            'received_value': po.received_value,
+            'issues': [ISSUE_LABELS[issue] for issue in issues],
+        })
+    return report
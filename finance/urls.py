@@ -29,6 +29,7 @@ urlpatterns = [
 
     # Procurement
     path('procurement/expenses/', views.procurement_expenses, name='procurement_expenses'),
+    path('procurement/reconciliation/', views.procurement_reconciliation, name='procurement_reconciliation'),
     path('create-expense-from-po/<int:po_id>/', views.create_expense_from_po, name='create_expense_from_po'),
 
     # Reports
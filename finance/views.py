@@ -1,16 +1,21 @@
 # cornelsimba/finance/views.py - COMPLETE FIXED VERSION
+from django.template.response import TemplateResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q, F, Exists, OuterRef
 from django.db import transaction
 from functools import wraps
 from datetime import datetime, date
 from .models import Income, Expense, Payroll, Account, Transaction
+from .reconciliation import expense_delivered_purchase_orders, reconciliation_report, unexpensed_purchase_orders
 from .forms import IncomeForm, ExpenseForm, PayrollForm
 from hr.models import Employee
 from procurement.models import PurchaseOrder
+from procurement.matching import match_purchase_orders, rematch_purchase_orders
 from audit.utils import audit_log
+from core.middleware import query_budget
+from core.cache import cached_report
 
 from django.http import HttpResponse
 from django.template.loader import render_to_string
@@ -19,6 +24,7 @@ from django.template.loader import get_template
 from django.contrib.humanize.templatetags.humanize import intcomma
 from .models import FinanceEditRequest
 import logging 
+from django.core.exceptions import FieldDoesNotExist
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet
@@ -44,6 +50,7 @@ def group_required(group_name):
 # In finance/views.py - UPDATE the finance_dashboard function
 @login_required
 @group_required('Finance')
+@query_budget(35)
 def finance_dashboard(request):
     """Finance Dashboard - COMPLETE VERSION with proper calculations"""
     # Current month/year
@@ -485,6 +492,7 @@ def expense_create(request):
                 expense.department = expense.purchase_order.department
             
             expense.save()
+            rematch_purchase_orders(expense.purchase_order_id)
             
             # Create transaction record
             expense_account, _ = Account.objects.get_or_create(
@@ -537,6 +545,8 @@ def expense_create(request):
 @group_required('Finance')
 def expense_edit(request, pk):
     expense = get_object_or_404(Expense, pk=pk)
+    # Before the form is bound: validation copies the posted values onto the instance
+    previous_purchase_order_id = expense.purchase_order_id
 
     if request.method == 'POST':
         form = ExpenseForm(request.POST, instance=expense)
@@ -544,6 +554,7 @@ def expense_edit(request, pk):
 
             if request.user.is_superuser:
                 expense = form.save()
+                rematch_purchase_orders(previous_purchase_order_id, expense.purchase_order_id)
 
                 audit_log(
                     user=request.user,
@@ -860,12 +871,11 @@ def procurement_expenses(request):
     """View delivered POs that can be converted to expenses"""
     delivered_pos = PurchaseOrder.objects.filter(status='Delivered').select_related(
         'supplier', 'requested_by'
+    ).annotate(
+        # Which POs already have expenses, in the same query
+        has_expense=Exists(Expense.objects.filter(purchase_order=OuterRef('pk')))
     ).order_by('-order_date')
     
-    # Check which POs already have expenses
-    for po in delivered_pos:
-        po.has_expense = po.expenses.exists()
-    
     # Department summary
     department_summary = {}
     for po in delivered_pos:
@@ -908,6 +918,7 @@ def create_expense_from_po(request, po_id):
         is_paid=False,
         payment_method='Bank'
     )
+    match_purchase_orders(PurchaseOrder.objects.filter(pk=purchase_order.pk))
     
     # 🔴 AUDIT ADD - After this line
     audit_log(
@@ -927,6 +938,41 @@ def create_expense_from_po(request, po_id):
 
 @login_required
 @group_required('Finance')
+def procurement_reconciliation(request):
+    """Book all missing PO expenses at once and list POs whose figures disagree"""
+    if request.method == 'POST':
+        result = expense_delivered_purchase_orders(user=request.user)
+        expenses = result['expenses']
+        if expenses:
+            total = sum(expense.amount for expense in expenses)
+            audit_log(
+                user=request.user,
+                action='CREATE',
+                module='FINANCE',
+                object_type='Expense',
+                description=f'Created {len(expenses)} expenses from delivered POs - Tsh {total:,.2f}',
+                request=request
+            )
+            messages.success(request, f'Created {len(expenses)} expenses from delivered POs (Tsh {total:,.2f})')
+        elif result['skipped_closed']:
+            messages.error(request, 'The current accounting period is closed; no expenses were created.')
+        else:
+            messages.info(request, 'Every delivered, finance-ready PO already has an expense.')
+        return redirect('finance:procurement_reconciliation')
+
+    report = reconciliation_report()
+    pending = unexpensed_purchase_orders().aggregate(count=Count('pk'), total=Sum('total_amount'))
+    context = {
+        'report': report,
+        'pending_count': pending['count'],
+        'pending_total': pending['total'] or 0,
+    }
+    return render(request, 'finance/procurement_reconciliation.html', context)
+
+
+@login_required
+@group_required('Finance')
+@cached_report('finance.Income', 'finance.Expense')
 def financial_reports(request):
     from django.db.models.functions import TruncMonth
     from django.db.models import Q
@@ -1060,7 +1106,7 @@ def financial_reports(request):
         'available_years': available_years,
     }
 
-    return render(request, 'finance/reports.html', context)
+    return TemplateResponse(request, 'finance/reports.html', context)
 
 @login_required
 @group_required('Finance')
@@ -1274,6 +1320,7 @@ def income_mark_paid(request, pk):
 
 @login_required
 @group_required('Finance')
+@cached_report('finance.Income', 'finance.Expense', 'finance.Payroll')
 def cash_flow_statement(request):
     """Generate Cash Flow Statement (Operating Activities)"""
 
@@ -1374,7 +1421,7 @@ def cash_flow_statement(request):
         'payroll_transactions': payroll_transactions,
     }
 
-    return render(request, 'finance/cash_flow.html', context)
+    return TemplateResponse(request, 'finance/cash_flow.html', context)
 
 @login_required
 @group_required('Finance')
@@ -1574,6 +1621,7 @@ def process_payroll_with_leaves(request):
 
 @login_required
 @group_required('Finance')
+@query_budget(15)
 def trial_balance(request):
     """Generate trial balance report - SIMPLIFIED VERSION"""
     # Get all active accounts
@@ -1582,17 +1630,21 @@ def trial_balance(request):
     total_debits = 0
     total_credits = 0
     
+    # Debit and credit totals for every account, one grouped query each
+    debits = dict(
+        Transaction.objects.order_by().values('debit_account')
+        .annotate(total=Sum('amount')).values_list('debit_account', 'total')
+    )
+    credits = dict(
+        Transaction.objects.order_by().values('credit_account')
+        .annotate(total=Sum('amount')).values_list('credit_account', 'total')
+    )
+
     # Prepare account data
     account_data = []
     for account in accounts:
-        # Get all debit and credit transactions for this account
-        debit_total = account.debit_transactions.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        credit_total = account.credit_transactions.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        debit_total = debits.get(account.pk) or 0
+        credit_total = credits.get(account.pk) or 0
         
         # Determine normal balance based on account type
         if account.account_type in ['Asset', 'Expense']:
@@ -2269,6 +2321,7 @@ def approve_finance_edit(request, pk):
         return redirect('finance:pending_finance_edits')
     
     obj = get_object_or_404(model_class, pk=edit_request.object_id)
+    previous_purchase_order_id = getattr(obj, 'purchase_order_id', None)
 
     # Apply requested changes with proper date conversion
     for field, value in edit_request.requested_changes.items():
@@ -2281,9 +2334,18 @@ def approve_finance_edit(request, pk):
                 except ValueError:
                     messages.error(request, f"Invalid date format for {field}")
                     return redirect('finance:pending_finance_edits')
+        # Foreign keys are stored as pks (see expense_edit): set the _id attribute
+        try:
+            model_field = model_class._meta.get_field(field)
+            if model_field.is_relation:
+                field = model_field.attname
+        except FieldDoesNotExist:
+            pass
         setattr(obj, field, value)
 
     obj.save()
+    if edit_request.request_type == 'Expense':
+        rematch_purchase_orders(previous_purchase_order_id, obj.purchase_order_id)
 
     # Assign approved_by correctly based on model type
     # Expense and Payroll use Employee, Income has no approved_by
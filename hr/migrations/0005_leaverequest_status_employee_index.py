@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0004_leavetype_alter_employee_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'employee'], name='hr_leavereq_status_fff692_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from core.sequences import serial_number
 
 class Employee(models.Model):
     # Department choices - using your existing choices from forms.py
@@ -48,18 +49,7 @@ class Employee(models.Model):
         # Auto-generate employee ID if not provided
         if not self.employee_id or self.employee_id.strip() == '':
             # Generate a unique ID like EMP-001, EMP-002, etc.
-            last_employee = Employee.objects.order_by('id').last()
-            if last_employee:
-                try:
-                    # Try to extract number from existing ID
-                    last_id = int(last_employee.employee_id.split('-')[-1])
-                    new_id = last_id + 1
-                except (ValueError, IndexError):
-                    new_id = 1
-            else:
-                new_id = 1
-            
-            self.employee_id = f"EMP-{new_id:03d}"
+            self.employee_id = serial_number('EMP', Employee, 'employee_id')
         
         super().save(*args, **kwargs)
     
@@ -163,6 +153,9 @@ class LeaveRequest(models.Model):
     
     class Meta:
         ordering = ['-submitted_date']
+        indexes = [
+            models.Index(fields=['status', 'employee']),
+        ]
 
 
 
@@ -1,3 +1,56 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Employee
+
+DEPARTMENTS = ['HR', 'Finance', 'Procurement', 'Inventory', 'IT', 'Sales']
+
+
+class EmployeeListTests(TestCase):
+    """employee_list within its @query_budget, which fails the request under `manage.py test`"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('hr_admin', 'hr@example.com', 'password')
+        Employee.objects.bulk_create([
+            Employee(
+                employee_id=f"EMP-{number:03d}",
+                full_name=f"Employee {number:03d}",
+                department=DEPARTMENTS[number % len(DEPARTMENTS)],
+                position='Staff',
+                phone='0700000000',
+                address='Dar es Salaam',
+                date_joined=date(2025, 1, 1),
+                is_active=number % 5 != 0,
+            )
+            for number in range(30)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_employee_list_within_budget(self):
+        response = self.client.get(reverse('hr:employee_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_count'], 30)
+        self.assertEqual(response.context['active_count'], 24)
+        self.assertEqual(response.context['departments_count'], len(DEPARTMENTS))
+        self.assertEqual(response.context['department_distribution']['IT'], 5)
+
+    def test_department_count_does_not_add_queries(self):
+        url = reverse('hr:employee_list')
+        self.client.get(url)
+        before = self._queries(url)
+        Employee.objects.filter(department='Sales').update(department='Administration')
+        Employee.objects.filter(department='IT', is_active=True).update(department='Auditor')
+        self.assertEqual(self._queries(url), before)
 
-# Create your tests here.
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries.captured_queries)
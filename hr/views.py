@@ -6,9 +6,10 @@ from .forms import EmployeeForm
 from django.contrib.auth.models import User
 from functools import wraps
 from audit.utils import audit_log
+from core.middleware import query_budget
 from .models import LeaveRequest, LeaveType, LeaveBalance
 from .leave_forms import LeaveRequestForm, LeaveApprovalForm, HRLeaveForm, HRAbsenceForm
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.contrib import messages
 from django.utils import timezone
 from django.db import IntegrityError
@@ -23,7 +24,6 @@ from reportlab.lib.enums import TA_CENTER
 from django.http import HttpResponse
 from .email_utils import send_leave_email
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
 
 # Helper function to restrict access by group - SINGLE VERSION
 def group_required(group_name):
@@ -113,6 +113,7 @@ def hr_dashboard(request):
 
 @login_required
 @group_required('HR')
+@query_budget(18)
 def employee_list(request):
     # Get all employees
     employees_list = Employee.objects.all().select_related('user').order_by('-date_joined')
@@ -142,19 +143,21 @@ def employee_list(request):
     if department_filter:
         employees_list = employees_list.filter(department=department_filter)
     
-    # Get unique departments for filter dropdown
-    departments = Employee.objects.values_list('department', flat=True).distinct().exclude(department__isnull=True).exclude(department='').order_by('department')
+    # Department distribution in one grouped query; its keys fill the filter dropdown
+    department_distribution = dict(
+        Employee.objects.exclude(department__isnull=True).exclude(department='')
+        .values_list('department').annotate(count=Count('pk')).order_by('department')
+    )
+    departments = list(department_distribution)
     
     # Count statistics
-    total_count = employees_list.count()
-    active_count = employees_list.filter(is_active=True).count()
-    inactive_count = employees_list.filter(is_active=False).count()
-    
-    # Calculate department distribution
-    department_distribution = {}
-    for dept in departments:
-        count = Employee.objects.filter(department=dept).count()
-        department_distribution[dept] = count
+    counts = employees_list.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+    )
+    total_count = counts['total']
+    active_count = counts['active']
+    inactive_count = total_count - active_count
     
     # Pagination
     page = request.GET.get('page', 1)
@@ -176,7 +179,7 @@ def employee_list(request):
         'active_count': active_count,
         'inactive_count': inactive_count,
         'departments': departments,
-        'departments_count': departments.count(),
+        'departments_count': len(departments),
         'department_distribution': department_distribution,
         'active_percentage': active_percentage,
         'search_query': search_query,
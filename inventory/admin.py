@@ -1,10 +1,10 @@
 # cornelsimba/inventory/admin.py
 from django.contrib import admin
-from .models import Item, StockIn, StockOut, StockAdjustment, StockHistory
+from .models import Item, StockIn, StockOut, StockAdjustment, StockHistory, ReorderSuggestion, StockReservation, StockOutLine
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ['name', 'category', 'quantity', 'unit_of_measure', 'status']
+    list_display = ['name', 'category', 'quantity', 'reserved_quantity', 'unit_of_measure', 'status']
     list_filter = ['category', 'is_active']
     search_fields = ['name', 'sku']
     readonly_fields = ['created_at', 'updated_at']
@@ -29,12 +29,19 @@ class StockInAdmin(admin.ModelAdmin):
             return request.user.groups.filter(name='Manager').exists() or request.user.is_superuser
         return request.user.is_superuser
 
+class StockOutLineInline(admin.TabularInline):
+    model = StockOutLine
+    extra = 0
+    readonly_fields = ['item', 'quantity', 'sale_item']
+    can_delete = False
+
 @admin.register(StockOut)
 class StockOutAdmin(admin.ModelAdmin):
     list_display = ['item', 'quantity', 'purpose', 'status', 'date']
     list_filter = ['status', 'purpose', 'date']
     search_fields = ['item__name', 'reference']
     readonly_fields = ['created_at', 'approved_at', 'date']
+    inlines = [StockOutLineInline]
     
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
@@ -62,4 +69,19 @@ class StockHistoryAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
 
-    
\ No newline at end of file
+@admin.register(ReorderSuggestion)
+class ReorderSuggestionAdmin(admin.ModelAdmin):
+    list_display = ['item', 'avg_daily_usage', 'suggested_reorder_level', 'suggested_order_quantity', 'supplier', 'computed_at']
+    list_filter = ['supplier']
+    search_fields = ['item__name', 'item__sku']
+    readonly_fields = ['computed_at']
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ['item', 'quantity', 'status', 'sale', 'stock_out', 'expires_at', 'created_at']
+    list_filter = ['status']
+    search_fields = ['item__name', 'sale__sale_number']
+    readonly_fields = ['item', 'quantity', 'status', 'sale', 'stock_out', 'expires_at', 'created_at', 'created_by', 'closed_at']
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,168 @@
+# cornelsimba/inventory/approvals.py
+"""
+Stock out approval, one or many at a time.
+
+Approving a batch costs a fixed number of statements regardless of its size:
+one availability query, one conditional UPDATE of Item quantities, one
+reservation release, bulk StockHistory inserts, one UPDATE of the stock outs,
+one insert of sale income events (see finance/integration.py) and one
+outbox event for finance (see core/bus.py).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, When
+from django.utils import timezone
+
+from core.bus import publish
+from core.cache import bump_versions
+from finance.integration import enqueue_sale_income
+
+from .lookup import update_cached_quantity
+from .models import Item, StockOut, StockOutLine, StockHistory
+from .reservations import consume_for_stock_outs, held_for_stock_outs
+
+
+def _lines_by_stock_out(stock_outs):
+    """{stock_out_id: [(item_id, quantity), ...]} - stock outs without lines are single-item"""
+    lines = defaultdict(list)
+    rows = StockOutLine.objects.filter(stock_out__in=stock_outs).order_by('pk').values_list(
+        'stock_out_id', 'item_id', 'quantity',
+    )
+    for stock_out_id, item_id, quantity in rows:
+        lines[stock_out_id].append((item_id, quantity))
+    for stock_out in stock_outs:
+        if stock_out.pk not in lines:
+            lines[stock_out.pk].append((stock_out.item_id, stock_out.quantity))
+    return lines
+
+
+@transaction.atomic
+def approve_stock_outs(stock_out_ids, user):
+    """
+    Approve pending stock outs in one transaction.
+
+    Stock outs are taken in id order; one that cannot be covered by free stock
+    plus its own reservations is skipped and the rest still go through.
+    Linked sales get a finance.SaleIncomeEvent and an
+    'inventory.stock_outs.approved' event, whose finance handler completes
+    them; pass it to core.bus.dispatch_after_commit() to book the income
+    straight away. Returns {'approved': [StockOut], 'skipped': {id: reason},
+    'sale_ids': [int], 'event': OutboxEvent or None}.
+    """
+    now = timezone.now()
+    stock_outs = list(
+        StockOut.objects.select_for_update(of=('self',)).filter(
+            pk__in=list(stock_out_ids), status='pending',
+        ).select_related('item', 'linked_sale').order_by('pk')
+    )
+    skipped = {
+        pk: 'Not pending'
+        for pk in set(int(pk) for pk in stock_out_ids) - {so.pk for so in stock_outs}
+    }
+    if not stock_outs:
+        return {'approved': [], 'skipped': skipped, 'sale_ids': [], 'event': None}
+
+    lines = _lines_by_stock_out(stock_outs)
+    held = held_for_stock_outs(stock_outs)
+
+    # One availability query for every item in the batch
+    item_ids = {item_id for rows in lines.values() for item_id, _ in rows}
+    items = {
+        pk: {'name': name, 'on_hand': on_hand, 'left': on_hand, 'free': on_hand - reserved}
+        for pk, name, on_hand, reserved in Item.objects.filter(pk__in=item_ids).values_list(
+            'pk', 'name', 'quantity', 'reserved_quantity',
+        )
+    }
+
+    def available(stock_out_id, item_id):
+        # Own reservation plus free stock, never more than is physically left
+        item = items[item_id]
+        return min(item['left'], held[(stock_out_id, item_id)] + max(item['free'], 0))
+
+    approved = []
+    deductions = defaultdict(Decimal)
+    for stock_out in stock_outs:
+        needed = defaultdict(Decimal)
+        for item_id, quantity in lines[stock_out.pk]:
+            needed[item_id] += quantity
+
+        shortages = [
+            f"{items[item_id]['name']}: Need {quantity}, Available {available(stock_out.pk, item_id)}"
+            for item_id, quantity in needed.items()
+            if quantity > available(stock_out.pk, item_id)
+        ]
+        if shortages:
+            skipped[stock_out.pk] = "Insufficient stock: " + "; ".join(shortages)
+            continue
+
+        for item_id, quantity in needed.items():
+            # Own reservation covers part of the need, the rest comes from free stock
+            items[item_id]['free'] -= quantity - held[(stock_out.pk, item_id)]
+            items[item_id]['left'] -= quantity
+            deductions[item_id] += quantity
+        approved.append(stock_out)
+
+    if not approved:
+        return {'approved': [], 'skipped': skipped, 'sale_ids': [], 'event': None}
+
+    # One conditional UPDATE; the WHERE guards against concurrent changes
+    updated = Item.objects.filter(
+        Q(*[Q(pk=item_id, quantity__gte=quantity) for item_id, quantity in deductions.items()], _connector=Q.OR)
+    ).update(
+        quantity=Case(
+            *[When(pk=item_id, then=F('quantity') - quantity) for item_id, quantity in deductions.items()],
+            output_field=DecimalField(max_digits=15, decimal_places=3),
+        )
+    )
+    if updated != len(deductions):
+        raise ValidationError("Stock changed while approving. Please try again.")
+
+    consume_for_stock_outs(approved)
+
+    approved_ids = [stock_out.pk for stock_out in approved]
+    StockOut.objects.filter(pk__in=approved_ids).update(status='approved', approved_by=user, approved_at=now)
+
+    # Stock history per line, with running quantities per item
+    created_by = user.get_full_name() or user.username
+    running = {item_id: items[item_id]['on_hand'] for item_id in deductions}
+    history = []
+    for stock_out in approved:
+        for item_id, quantity in lines[stock_out.pk]:
+            previous = running[item_id]
+            running[item_id] = previous - quantity
+            history.append(StockHistory(
+                item_id=item_id,
+                transaction_type='STOCK_OUT',
+                quantity=quantity,
+                previous_quantity=previous,
+                new_quantity=running[item_id],
+                reference_id=stock_out.pk,
+                reference_model='StockOut',
+                reference=stock_out.reference,
+                notes=f"Approved stock out: {stock_out.notes or ''}",
+                created_by=created_by,
+            ))
+    StockHistory.objects.bulk_create(history, batch_size=1000)
+    bump_versions(Item, StockOut, StockHistory)
+
+    for item_id, quantity in running.items():
+        update_cached_quantity(item_id, quantity)
+
+    # Sale completion and income happen in finance, via the outbox
+    sale_ids = enqueue_sale_income(approved, user)
+    event = None
+    if sale_ids:
+        event = publish('inventory.stock_outs.approved', {
+            'stock_out_ids': [stock_out.pk for stock_out in approved],
+            'sale_ids': sale_ids,
+        })
+
+    for stock_out in approved:
+        stock_out.status = 'approved'
+        stock_out.approved_by = user
+        stock_out.approved_at = now
+
+    return {'approved': approved, 'skipped': skipped, 'sale_ids': sale_ids, 'event': event}
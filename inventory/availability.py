@@ -0,0 +1,113 @@
+# cornelsimba/inventory/availability.py
+"""
+Batched stock availability checks.
+
+Availability for a line is the item's on-hand quantity minus what active
+reservations for *other* sales already hold (Item.reserved_quantity, see
+reservations.py). A whole batch of sales is checked with two queries (sale
+lines joined to their items, and the sales' own active reservations) no
+matter how many sales or lines are involved.
+"""
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from .models import Item, StockReservation
+
+ZERO = Decimal('0.000')
+
+
+def own_reservations(sale_ids):
+    """{(item_id, sale_id): quantity} held by active reservations of the given sales"""
+    rows = StockReservation.objects.filter(
+        status='active',
+        sale_id__in=list(sale_ids),
+    ).order_by().values_list('item_id', 'sale_id').annotate(total=Sum('quantity'))
+    return {(item_id, sale_id): total or ZERO for item_id, sale_id, total in rows}
+
+
+def _line_result(line_id, sale_id, item_id, name, unit, required, on_hand, reserved):
+    available = on_hand - reserved
+    shortfall = max(required - available, ZERO)
+    return {
+        'line_id': line_id,
+        'sale_id': sale_id,
+        'item_id': item_id,
+        'item_name': name,
+        'unit_of_measure': unit,
+        'required': required,
+        'on_hand': on_hand,
+        'reserved': reserved,
+        'available': available,
+        'shortfall': shortfall,
+    }
+
+
+def check_sales_availability(sale_ids):
+    """
+    Check every line of the given sales against current stock.
+
+    Returns {sale_id: {'is_available': bool, 'lines': [...], 'shortfalls': [...]}}
+    where each line is a dict (see _line_result). Stock reserved for the sale
+    being checked does not count against it.
+    """
+    from sales.models import SaleItem
+
+    sale_ids = list(sale_ids)
+    results = {
+        sale_id: {'is_available': True, 'lines': [], 'shortfalls': []}
+        for sale_id in sale_ids
+    }
+    if not sale_ids:
+        return results
+
+    lines = SaleItem.objects.filter(sale_id__in=sale_ids).order_by('sale_id', 'pk').values_list(
+        'pk', 'sale_id', 'item_id', 'item__name', 'item__unit_of_measure', 'quantity',
+        'item__quantity', 'item__reserved_quantity',
+    )
+    own = own_reservations(sale_ids)
+
+    for line_id, sale_id, item_id, name, unit, required, on_hand, reserved in lines:
+        reserved -= own.get((item_id, sale_id), ZERO)
+        line = _line_result(line_id, sale_id, item_id, name, unit, required, on_hand, reserved)
+        result = results[sale_id]
+        result['lines'].append(line)
+        if line['shortfall'] > 0:
+            result['shortfalls'].append(line)
+            result['is_available'] = False
+    return results
+
+
+def check_lines_availability(lines):
+    """
+    Check ad-hoc (item_id, quantity) lines against current stock.
+
+    Quantities for the same item are summed before checking. Returns one
+    result dict per distinct item, in first-seen order.
+    """
+    required = {}
+    for item_id, quantity in lines:
+        required[item_id] = required.get(item_id, ZERO) + Decimal(str(quantity))
+    if not required:
+        return []
+
+    items = {
+        pk: (name, unit, on_hand, reserved)
+        for pk, name, unit, on_hand, reserved in Item.objects.filter(pk__in=list(required)).values_list(
+            'pk', 'name', 'unit_of_measure', 'quantity', 'reserved_quantity',
+        )
+    }
+
+    results = []
+    for item_id, quantity in required.items():
+        name, unit, on_hand, reserved = items.get(item_id, ('', '', ZERO, ZERO))
+        results.append(_line_result(None, None, item_id, name, unit, quantity, on_hand, reserved))
+    return results
+
+
+def shortfall_message(shortfalls):
+    """Human readable summary used by Sale.check_stock_availability()"""
+    return "Insufficient stock: " + "; ".join(
+        f"{line['item_name']}: Need {line['required']}, Available {line['available']}"
+        for line in shortfalls
+    )
@@ -0,0 +1,46 @@
+# cornelsimba/inventory/events.py
+"""Inventory handlers for events published by other modules (see core/bus.py)"""
+from django.contrib.auth.models import User
+
+from audit.utils import audit_log
+from core.bus import subscribe
+
+from .models import StockIn
+
+
+@subscribe('procurement.purchase_order.delivered')
+def receive_purchase_order(event):
+    """Book a delivered purchase order into stock (once per order)"""
+    from procurement.models import PurchaseOrder
+    from procurement.matching import match_purchase_orders
+
+    purchase_order = PurchaseOrder.objects.select_related('supplier').get(pk=event.payload['purchase_order_id'])
+    reference = f"PO-{purchase_order.po_number}"
+    # At-least-once delivery: a replay must not receive the goods twice
+    if StockIn.objects.filter(source='Purchase', reference=reference).exists():
+        return
+
+    user = User.objects.filter(pk=event.payload.get('user_id')).first()
+    received_by = (user.get_full_name() or user.username) if user else ''
+    for item in purchase_order.items.select_related('item'):
+        stock_in = StockIn.objects.create(
+            item=item.item,
+            quantity=item.quantity,
+            supplier=purchase_order.supplier.name,
+            reference=reference,
+            purchase_order=purchase_order,
+            source='Purchase',
+            status='approved',
+            created_by=user,
+            received_by=received_by,
+        )
+        audit_log(
+            user=user,
+            action='CREATE',
+            module='INVENTORY',
+            object_type='StockIn',
+            object_id=stock_in.id,
+            description=f'Stock In from PO {purchase_order.po_number}: {item.quantity} {item.item.unit_of_measure} of "{item.item.name}"',
+        )
+
+    match_purchase_orders(PurchaseOrder.objects.filter(pk=purchase_order.pk))
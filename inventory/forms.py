@@ -2,9 +2,50 @@
 from django import forms
 from .models import Item, StockIn, StockOut, StockAdjustment
 from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
 from django.utils import timezone
 from decimal import Decimal, ROUND_HALF_UP
 
+
+class ItemLookupSelect(forms.Select):
+    """
+    Item <select> that only renders the selected option.
+
+    The rest of the catalog is searched on demand through the item lookup API
+    (inventory/js/item_lookup.js), so form pages don't render every active
+    item. The field queryset is still used to validate the submitted value.
+    """
+
+    def __init__(self, attrs=None, in_stock=False):
+        attrs = {'class': 'form-control', **(attrs or {})}
+        attrs['data-item-lookup'] = reverse_lazy('inventory:item_lookup_api')
+        if in_stock:
+            attrs['data-in-stock'] = '1'
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        all_choices = self.choices
+        queryset = getattr(all_choices, 'queryset', None)
+        if queryset is None:
+            return super().optgroups(name, value, attrs)
+
+        field = all_choices.field
+        selected = [v for v in value if v not in ('', None)]
+        choices = []
+        if field.empty_label is not None:
+            choices.append(('', field.empty_label))
+        if selected:
+            choices.extend(
+                (obj.pk, field.label_from_instance(obj))
+                for obj in queryset.filter(pk__in=selected)
+            )
+        self.choices = choices
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
+
+
 class ItemForm(forms.ModelForm):
     class Meta:
         model = Item
@@ -77,7 +118,7 @@ class StockInForm(forms.ModelForm):
             'supplier', 'reference', 'notes'
         ]
         widgets = {
-            'item': forms.Select(attrs={'class': 'form-control'}),
+            'item': ItemLookupSelect(),
             'quantity': forms.NumberInput(attrs={'class': 'form-control', 'min': 0.001, 'step': 0.001}),
             'source': forms.Select(attrs={'class': 'form-control'}),
             'supplier': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Supplier name'}),
@@ -115,7 +156,7 @@ class StockOutForm(forms.ModelForm):
             'purpose', 'reference', 'notes'
         ]
         widgets = {
-            'item': forms.Select(attrs={'class': 'form-control'}),
+            'item': ItemLookupSelect(),
             'quantity': forms.NumberInput(attrs={'class': 'form-control', 'min': 0.001, 'step': 0.001}),
             'issued_to': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Person or department (optional)'}),
             'purpose': forms.Select(attrs={'class': 'form-control'}),
@@ -144,9 +185,9 @@ class StockOutForm(forms.ModelForm):
         quantity = cleaned_data.get('quantity')
         
         if item and quantity:
-            if quantity > item.quantity:
+            if quantity > item.available_quantity:
                 raise ValidationError({
-                    'quantity': f'Insufficient stock! Available: {item.quantity} {item.unit_of_measure}'
+                    'quantity': f'Insufficient stock! Available: {item.available_quantity} {item.unit_of_measure}'
                 })
         
         return cleaned_data
@@ -168,7 +209,7 @@ class StockAdjustmentForm(forms.ModelForm):
             'reason', 'reference_stock_in'
         ]
         widgets = {
-            'item': forms.Select(attrs={'class': 'form-control'}),
+            'item': ItemLookupSelect(),
             'adjustment_quantity': forms.NumberInput(attrs={'class': 'form-control', 'step': 0.001}),
             'adjustment_type': forms.Select(attrs={'class': 'form-control'}),
             'reason': forms.Textarea(attrs={'class': 'form-control', 'rows': 4, 'placeholder': 'Explain why this adjustment is needed...'}),
@@ -0,0 +1,181 @@
+# cornelsimba/inventory/lookup.py
+"""
+Item autocomplete lookups.
+
+Active items are held in a process-level catalog: a list of lower-cased
+name/SKU keys kept in sorted order, so a prefix search is a bisect plus a
+short scan instead of a query. The catalog is rebuilt from the indexed
+search_name/search_sku columns when it expires or when an Item is saved or
+deleted (see signals.py). Saves that only touch `quantity` patch the cached
+row in place rather than throwing the catalog away.
+
+A generation counter in Django's cache lets other worker processes notice an
+invalidation when a shared cache backend is configured; with the default
+per-process cache they fall back to the TTL.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Item
+
+CATALOG_TTL = getattr(settings, 'ITEM_LOOKUP_CACHE_SECONDS', 300)
+MAX_PAGE_SIZE = 50
+DEFAULT_PAGE_SIZE = 20
+
+_GENERATION_KEY = 'inventory:item_catalog_generation'
+_PREFIX_END = '\uffff'
+
+_lock = threading.Lock()
+_catalog = None
+
+
+class _Catalog:
+    """Sorted prefix keys plus the row data they point at"""
+
+    def __init__(self, rows, generation):
+        self.built_at = time.monotonic()
+        self.generation = generation
+        self.rows = {}
+        keyed = []
+        for pk, name, sku, search_name, search_sku, unit, quantity in rows:
+            self.rows[pk] = {
+                'id': pk,
+                'name': name,
+                'sku': sku or '',
+                'unit_of_measure': unit,
+                'quantity': quantity,
+                'search_name': search_name,
+            }
+            keyed.append((search_name, pk))
+            if search_sku:
+                keyed.append((search_sku, pk))
+        keyed.sort()
+        self.keys = [key for key, _ in keyed]
+        self.ids = [pk for _, pk in keyed]
+        # Name order for browsing with an empty query
+        self.by_name = sorted(self.rows, key=lambda pk: (self.rows[pk]['search_name'], pk))
+
+    def is_fresh(self, generation):
+        return generation == self.generation and time.monotonic() - self.built_at < CATALOG_TTL
+
+    def match(self, prefix):
+        """Item ids whose name or SKU starts with `prefix`, in name order"""
+        if not prefix:
+            return self.by_name
+        found = set()
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            found.add(self.ids[i])
+            i += 1
+        return sorted(found, key=lambda pk: (self.rows[pk]['search_name'], pk))
+
+
+def _generation():
+    return cache.get(_GENERATION_KEY, 0)
+
+
+def prefix_filter(queryset, prefix):
+    """
+    Restrict `queryset` to items whose name or SKU starts with `prefix`.
+
+    Uses range comparisons on the lower-cased columns so the indexes are
+    usable (LIKE 'abc%' is not index-friendly on every backend).
+    """
+    prefix = (prefix or '').strip().lower()
+    if not prefix:
+        return queryset
+    upper = prefix + _PREFIX_END
+    return queryset.filter(
+        Q(search_name__gte=prefix, search_name__lt=upper) |
+        Q(search_sku__gte=prefix, search_sku__lt=upper)
+    )
+
+
+def get_catalog():
+    """Return the current catalog, rebuilding it when stale"""
+    global _catalog
+    generation = _generation()
+    catalog = _catalog
+    if catalog is not None and catalog.is_fresh(generation):
+        return catalog
+
+    with _lock:
+        catalog = _catalog
+        if catalog is None or not catalog.is_fresh(generation):
+            rows = Item.objects.filter(is_active=True).order_by().values_list(
+                'pk', 'name', 'sku', 'search_name', 'search_sku', 'unit_of_measure', 'quantity',
+            )
+            catalog = _catalog = _Catalog(rows.iterator(chunk_size=5000), generation)
+    return catalog
+
+
+def invalidate_catalog():
+    """Drop the local catalog and tell other processes to drop theirs"""
+    global _catalog
+    _catalog = None
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:
+        cache.set(_GENERATION_KEY, 1, None)
+
+
+def update_cached_quantity(item_id, quantity):
+    """Patch the on-hand quantity of a cached row (no-op if not cached)"""
+    catalog = _catalog
+    if catalog is not None and item_id in catalog.rows:
+        catalog.rows[item_id]['quantity'] = quantity
+
+
+def search_items(query, page=1, page_size=DEFAULT_PAGE_SIZE, in_stock=False):
+    """
+    Prefix search over active items by name or SKU.
+
+    Returns (results, total, has_next). Cached quantities can lag other
+    processes by up to the TTL, so forms must still validate stock on submit.
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    page = max(1, int(page))
+    prefix = (query or '').strip().lower()
+
+    if CATALOG_TTL <= 0:
+        queryset = prefix_filter(Item.objects.filter(is_active=True), prefix)
+        if in_stock:
+            queryset = queryset.filter(quantity__gt=0)
+        queryset = queryset.order_by('search_name', 'pk')
+        total = queryset.count()
+        start = (page - 1) * page_size
+        results = [
+            {
+                'id': row['pk'],
+                'name': row['name'],
+                'sku': row['sku'] or '',
+                'unit_of_measure': row['unit_of_measure'],
+                'quantity': row['quantity'],
+            }
+            for row in queryset.values('pk', 'name', 'sku', 'unit_of_measure', 'quantity')[start:start + page_size]
+        ]
+        return results, total, start + page_size < total
+
+    catalog = get_catalog()
+    ids = catalog.match(prefix)
+    if in_stock:
+        ids = [pk for pk in ids if catalog.rows[pk]['quantity'] > 0]
+
+    total = len(ids)
+    start = (page - 1) * page_size
+    results = []
+    for pk in ids[start:start + page_size]:
+        row = catalog.rows[pk]
+        results.append({
+            'id': row['id'],
+            'name': row['name'],
+            'sku': row['sku'],
+            'unit_of_measure': row['unit_of_measure'],
+            'quantity': row['quantity'],
+        })
+    return results, total, start + page_size < total
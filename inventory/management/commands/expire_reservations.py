@@ -0,0 +1,22 @@
+# inventory/management/commands/expire_reservations.py
+from django.core.management.base import BaseCommand
+
+from inventory.reservations import expire_reservations, rebuild_reserved_quantities
+
+
+class Command(BaseCommand):
+    help = 'Expire stale stock reservations (run every few minutes from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Also recompute Item.reserved_quantity from active reservations')
+
+    def handle(self, *args, **options):
+        expired = expire_reservations()
+        self.stdout.write(f"Expired {expired} reservations")
+
+        if options['rebuild']:
+            fixed = rebuild_reserved_quantities()
+            self.stdout.write(f"Corrected reserved quantity on {fixed} items")
+
+        self.stdout.write(self.style.SUCCESS('Reservation sweep complete'))
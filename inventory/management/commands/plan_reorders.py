@@ -0,0 +1,61 @@
+# inventory/management/commands/plan_reorders.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory.planning import (
+    DEFAULT_WINDOW_DAYS,
+    DEFAULT_LEAD_TIME_DAYS,
+    DEFAULT_COVER_DAYS,
+    DEFAULT_SERVICE_Z,
+    build_reorder_plan,
+    save_reorder_plan,
+    apply_reorder_levels,
+    create_draft_purchase_orders,
+)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild demand-based reorder suggestions (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-days', type=int, default=DEFAULT_WINDOW_DAYS,
+                            help='Rolling consumption window in days')
+        parser.add_argument('--lead-time-days', type=int, default=DEFAULT_LEAD_TIME_DAYS,
+                            help='Supplier lead time in days')
+        parser.add_argument('--cover-days', type=int, default=DEFAULT_COVER_DAYS,
+                            help='Days of usage each order should cover')
+        parser.add_argument('--service-z', type=float, default=DEFAULT_SERVICE_Z,
+                            help='Safety stock z-score (1.65 = ~95%% service level)')
+        parser.add_argument('--apply', action='store_true',
+                            help='Write suggested levels to Item.reorder_level / minimum_stock')
+        parser.add_argument('--create-pos', action='store_true',
+                            help='Create draft purchase orders grouped by supplier')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        suggestions = build_reorder_plan(
+            window_days=options['window_days'],
+            lead_time_days=options['lead_time_days'],
+            cover_days=options['cover_days'],
+            service_z=options['service_z'],
+        )
+        saved = save_reorder_plan(suggestions)
+        to_order = sum(1 for s in suggestions if s.suggested_order_quantity > 0)
+        self.stdout.write(f"Planned {saved} items ({to_order} need reordering)")
+
+        if options['apply']:
+            updated = apply_reorder_levels(suggestions)
+            self.stdout.write(f"Updated reorder levels on {updated} items")
+
+        if options['create_pos']:
+            purchase_orders = create_draft_purchase_orders(suggestions)
+            for po in purchase_orders:
+                self.stdout.write(f"Created draft {po.po_number} for supplier #{po.supplier_id}")
+            if not purchase_orders:
+                self.stdout.write("No draft purchase orders needed")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reorder planning complete in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 23:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_alter_stockin_options'),
+        ('procurement', '0002_alter_purchaseorder_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_days', models.PositiveIntegerField()),
+                ('avg_daily_usage', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=15)),
+                ('usage_std_dev', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=15)),
+                ('lead_time_days', models.PositiveIntegerField()),
+                ('suggested_reorder_level', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=15)),
+                ('suggested_minimum_stock', models.DecimalField(decimal_places=3, default=Decimal('0.000'), help_text='Safety stock', max_digits=15)),
+                ('suggested_order_quantity', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=15)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_suggestion', to='inventory.item')),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reorder_suggestions', to='procurement.supplier')),
+            ],
+            options={
+                'verbose_name': 'Reorder Suggestion',
+                'verbose_name_plural': 'Reorder Suggestions',
+                'ordering': ['item__name'],
+                'indexes': [models.Index(fields=['supplier'], name='inventory_r_supplie_95326a_idx')],
+            },
+        ),
+    ]
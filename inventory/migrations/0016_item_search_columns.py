@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+def populate_search_columns(apps, schema_editor):
+    Item = apps.get_model('inventory', 'Item')
+    batch = []
+    for item in Item.objects.only('pk', 'name', 'sku').iterator(chunk_size=2000):
+        item.search_name = (item.name or '').lower()
+        item.search_sku = (item.sku or '').lower()
+        batch.append(item)
+        if len(batch) >= 2000:
+            Item.objects.bulk_update(batch, ['search_name', 'search_sku'])
+            batch = []
+    if batch:
+        Item.objects.bulk_update(batch, ['search_name', 'search_sku'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_reordersuggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='search_sku',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(populate_search_columns, migrations.RunPython.noop),
+    ]
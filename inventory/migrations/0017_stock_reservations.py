@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-18 23:53
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def reserve_pending_sale_stock_outs(apps, schema_editor):
+    """Hold stock for sale stock-outs that are already waiting for approval"""
+    StockOut = apps.get_model('inventory', 'StockOut')
+    StockReservation = apps.get_model('inventory', 'StockReservation')
+    Item = apps.get_model('inventory', 'Item')
+
+    pending = StockOut.objects.filter(status='pending', purpose='SALE', linked_sale__isnull=False)
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            item_id=stock_out.item_id,
+            quantity=stock_out.quantity,
+            status='active',
+            sale_id=stock_out.linked_sale_id,
+            stock_out_id=stock_out.pk,
+            created_by_id=stock_out.created_by_id,
+        )
+        for stock_out in pending.iterator()
+    ], batch_size=1000)
+
+    totals = StockReservation.objects.filter(status='active').values('item_id').annotate(total=Sum('quantity'))
+    for row in totals:
+        Item.objects.filter(pk=row['item_id']).update(reserved_quantity=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_item_search_columns'),
+        ('sales', '0006_alter_sale_options_remove_sale_currency_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='reserved_quantity',
+            field=models.DecimalField(decimal_places=3, default=Decimal('0.000'), editable=False, max_digits=15),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=15, validators=[django.core.validators.MinValueValidator(0.001)])),
+                ('status', models.CharField(choices=[('active', 'Active'), ('consumed', 'Consumed'), ('released', 'Released'), ('expired', 'Expired')], default='active', max_length=20)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_reservations', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservations', to='inventory.item')),
+                ('sale', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_reservations', to='sales.sale')),
+                ('stock_out', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations', to='inventory.stockout')),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='inventory_s_status_c656ef_idx'), models.Index(fields=['item', 'status'], name='inventory_s_item_id_785d27_idx')],
+            },
+        ),
+        migrations.RunPython(reserve_pending_sale_stock_outs, migrations.RunPython.noop),
+    ]
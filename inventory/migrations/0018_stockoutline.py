@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-18 23:56
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def split_pending_sale_stock_outs(apps, schema_editor):
+    """Give pending sale stock-outs one line per sale item so approval covers the whole sale"""
+    StockOut = apps.get_model('inventory', 'StockOut')
+    StockOutLine = apps.get_model('inventory', 'StockOutLine')
+    SaleItem = apps.get_model('sales', 'SaleItem')
+
+    pending = dict(
+        StockOut.objects.filter(status='pending', linked_sale__isnull=False).values_list('linked_sale_id', 'pk')
+    )
+    StockOutLine.objects.bulk_create([
+        StockOutLine(
+            stock_out_id=pending[sale_item.sale_id],
+            item_id=sale_item.item_id,
+            quantity=sale_item.quantity,
+            sale_item_id=sale_item.pk,
+        )
+        for sale_item in SaleItem.objects.filter(sale_id__in=list(pending)).order_by('pk').iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0017_stock_reservations'),
+        ('sales', '0006_alter_sale_options_remove_sale_currency_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockOutLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=15, validators=[django.core.validators.MinValueValidator(0.001)])),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_out_lines', to='inventory.item')),
+                ('sale_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_out_lines', to='sales.saleitem')),
+                ('stock_out', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='inventory.stockout')),
+            ],
+            options={
+                'verbose_name': 'Stock Out Line',
+                'verbose_name_plural': 'Stock Out Lines',
+                'ordering': ['stock_out', 'pk'],
+            },
+        ),
+        migrations.RunPython(split_pending_sale_stock_outs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-19 00:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
+
+
+def link_purchase_receipts(apps, schema_editor):
+    """Link existing PO receipts through their 'PO-<po_number>' reference"""
+    StockIn = apps.get_model('inventory', 'StockIn')
+    PurchaseOrder = apps.get_model('procurement', 'PurchaseOrder')
+    StockIn.objects.filter(
+        source='Purchase', reference__startswith='PO-', purchase_order__isnull=True,
+    ).update(
+        purchase_order=Subquery(
+            PurchaseOrder.objects.filter(po_number=Substr(OuterRef('reference'), 4)).values('pk')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0018_stockoutline'),
+        ('procurement', '0002_alter_purchaseorder_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockin',
+            name='purchase_order',
+            field=models.ForeignKey(blank=True, help_text='Purchase order this delivery was received against', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_ins', to='procurement.purchaseorder'),
+        ),
+        migrations.RunPython(link_purchase_receipts, migrations.RunPython.noop),
+    ]
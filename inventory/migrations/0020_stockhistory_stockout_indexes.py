@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_stockin_purchase_order'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockhistory',
+            index=models.Index(fields=['item', '-created_at'], name='inventory_s_item_id_315629_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockout',
+            index=models.Index(fields=['status', 'purpose'], name='inventory_s_status_40436a_idx'),
+        ),
+    ]
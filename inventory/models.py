@@ -1,10 +1,14 @@
 # cornelsimba/inventory/models.py - COMPLETELY FIXED VERSION
 from django.db import models
+from django.db.models import F
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.utils import timezone 
 from decimal import Decimal
+
+from core.cache import bump_versions
+
 User = get_user_model()
 
 # Helper function for decimal normalization
@@ -24,12 +28,17 @@ class Item(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='RAW_MATERIALS')
     description = models.TextField(blank=True, null=True)
     sku = models.CharField(max_length=50, unique=True, blank=True, null=True, help_text="Stock Keeping Unit")
+    # Lower-cased copies of name/SKU for indexed prefix lookups (kept in sync in save())
+    search_name = models.CharField(max_length=100, blank=True, default='', editable=False, db_index=True)
+    search_sku = models.CharField(max_length=50, blank=True, default='', editable=False, db_index=True)
     unit_of_measure = models.CharField(max_length=20, default='kg', help_text="e.g., kg, pcs, liter, box")
     
     # Stock tracking
     quantity = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('0.000'))
     reorder_level = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('10.000'))
     minimum_stock = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('5.000'))
+    # Held by active StockReservations - only changed through inventory.reservations
+    reserved_quantity = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('0.000'), editable=False)
     
     # Pricing (for sales integration)
     purchase_price = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Cost price in Tsh")
@@ -93,6 +102,22 @@ class Item(models.Model):
             elif self.category.lower() == 'finished goods':
                 self.category = 'FINISHED_GOODS'
         
+        # Keep lookup columns in sync with name/SKU
+        self.search_name = (self.name or '').lower()
+        self.search_sku = (self.sku or '').lower()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'name', 'sku'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'search_name', 'search_sku'}
+        
+        # reserved_quantity is maintained with F() updates (inventory/reservations.py);
+        # never write back a possibly stale in-memory value on a full save
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'reserved_quantity' and field.attname not in deferred
+            ]
+        
         # Run validation
         self.full_clean()
         
@@ -100,6 +125,11 @@ class Item(models.Model):
         super().save(*args, **kwargs)
     
     
+    @property
+    def available_quantity(self):
+        """On-hand quantity not held by pending sale reservations"""
+        return self.quantity - self.reserved_quantity
+    
     @property
     def is_low_stock(self):
         """Check if stock is below reorder level"""
@@ -153,6 +183,14 @@ class StockIn(models.Model):
     source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='Purchase')
     supplier = models.CharField(max_length=100, blank=True, null=True)
     reference = models.CharField(max_length=100, blank=True, null=True, help_text="PO Number, GRN, etc.")
+    purchase_order = models.ForeignKey(
+        'procurement.PurchaseOrder',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_ins',
+        help_text="Purchase order this delivery was received against",
+    )
     
     # Approval tracking
     status = models.CharField(
@@ -191,19 +229,27 @@ class StockIn(models.Model):
 
         # Update item stock ONLY once
         if is_new:
-            self.item.quantity = clean_decimal(
-                Decimal(self.item.quantity) + Decimal(self.quantity)
-            )
-            self.item.save(update_fields=['quantity'])
+            self._move_stock(self.quantity)
 
     def delete(self, *args, **kwargs):
         if self.status == 'approved':
-            self.item.quantity = clean_decimal(
-                Decimal(self.item.quantity) - Decimal(self.quantity)
-            )
-            self.item.save(update_fields=['quantity'])
+            self._move_stock(-self.quantity)
         super().delete(*args, **kwargs)
 
+    def _move_stock(self, quantity):
+        """
+        Add `quantity` to the item's stock in the database. self.item may be a
+        stale instance (e.g. several PO lines for one item, each with its own
+        copy), so its in-memory quantity is never written back.
+        """
+        from .lookup import update_cached_quantity
+
+        Item.objects.filter(pk=self.item_id).update(quantity=F('quantity') + quantity)
+        self.item.refresh_from_db(fields=['quantity'])
+        # .update() sends no post_save: keep the catalog and cached reports in step
+        update_cached_quantity(self.item_id, self.item.quantity)
+        bump_versions(Item)
+
     def __str__(self):
         return f"{self.item.name} - {self.quantity} in from {self.supplier or self.source}"
 
@@ -299,6 +345,9 @@ class StockOut(models.Model):
         ordering = ['-date']
         verbose_name = 'Stock Out'
         verbose_name_plural = 'Stock Outs'
+        indexes = [
+            models.Index(fields=['status', 'purpose']),
+        ]
     
     @property
     def is_sale_related(self):
@@ -319,6 +368,28 @@ class StockOut(models.Model):
         return None
 
 
+class StockOutLine(models.Model):
+    """
+    One line of a multi-item stock out (one per SaleItem for sale stock-outs).
+    
+    StockOut.item/quantity still describe the first line so single-item
+    screens keep working; stock outs without lines are single-item.
+    """
+    stock_out = models.ForeignKey(StockOut, on_delete=models.CASCADE, related_name='lines')
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name='stock_out_lines')
+    quantity = models.DecimalField(max_digits=15, decimal_places=3, validators=[MinValueValidator(0.001)])
+    sale_item = models.ForeignKey('sales.SaleItem', on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='stock_out_lines')
+    
+    class Meta:
+        ordering = ['stock_out', 'pk']
+        verbose_name = 'Stock Out Line'
+        verbose_name_plural = 'Stock Out Lines'
+    
+    def __str__(self):
+        return f"{self.item.name} - {self.quantity} (Stock Out #{self.stock_out_id})"
+
+
 class StockAdjustment(models.Model):
     """For correcting stock errors - requires approval"""
     
@@ -445,6 +516,92 @@ class StockHistory(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Stock History'
         verbose_name_plural = 'Stock Histories'
+        indexes = [
+            # An item's movements, newest first
+            models.Index(fields=['item', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.item.name} - {self.transaction_type} - {self.quantity}"
+
+class ReorderSuggestion(models.Model):
+    """Demand-based reorder plan for an item - rebuilt nightly by `plan_reorders`"""
+    item = models.OneToOneField(Item, on_delete=models.CASCADE, related_name='reorder_suggestion')
+    
+    # Consumption statistics over the planning window
+    window_days = models.PositiveIntegerField()
+    avg_daily_usage = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('0.000'))
+    usage_std_dev = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('0.000'))
+    
+    # Suggested levels
+    lead_time_days = models.PositiveIntegerField()
+    suggested_reorder_level = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('0.000'))
+    suggested_minimum_stock = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('0.000'),
+                                                  help_text="Safety stock")
+    suggested_order_quantity = models.DecimalField(max_digits=15, decimal_places=3, default=Decimal('0.000'))
+    
+    # Last supplier the item was bought from (used to group draft POs)
+    supplier = models.ForeignKey('procurement.Supplier', on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='reorder_suggestions')
+    
+    computed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['item__name']
+        verbose_name = 'Reorder Suggestion'
+        verbose_name_plural = 'Reorder Suggestions'
+        indexes = [
+            models.Index(fields=['supplier']),
+        ]
+    
+    def __str__(self):
+        return f"{self.item.name}: reorder at {self.suggested_reorder_level}, order {self.suggested_order_quantity}"
+    
+    @property
+    def needs_reorder(self):
+        """Order quantity is only suggested once stock is at/below the reorder point"""
+        return self.suggested_order_quantity > 0
+
+
+class StockReservation(models.Model):
+    """
+    Stock held for a sale between its stock out request and approval.
+    
+    Item.reserved_quantity is the sum of ACTIVE reservations; all changes go
+    through inventory/reservations.py so both stay in step.
+    """
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('consumed', 'Consumed'),
+        ('released', 'Released'),
+        ('expired', 'Expired'),
+    ]
+    
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name='reservations')
+    quantity = models.DecimalField(max_digits=15, decimal_places=3, validators=[MinValueValidator(0.001)])
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    
+    # What the stock is held for
+    sale = models.ForeignKey('sales.Sale', on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='stock_reservations')
+    stock_out = models.ForeignKey(StockOut, on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='reservations')
+    
+    # Tracking
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='stock_reservations')
+    closed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['item', 'status']),
+        ]
     
     def __str__(self):
-        return f"{self.item.name} - {self.transaction_type} - {self.quantity}"
\ No newline at end of file
+        return f"{self.item.name} - {self.quantity} reserved ({self.get_status_display()})"
@@ -0,0 +1,276 @@
+# cornelsimba/inventory/planning.py
+"""
+Demand-based reorder planning.
+
+Daily consumption per item is pulled with grouped queries (one row per
+item per day) and reduced with NumPy across all items at once, so a run over
+tens of thousands of items costs a handful of queries plus a few vector ops.
+
+Consumption sources:
+  * lines of approved multi-item StockOuts, and approved StockOuts without
+    lines (single-item) - both by approval day
+  * STOCK_OUT StockHistory rows that are NOT backed by a StockOut
+    (legacy/manual entries) - StockOut-backed history is skipped so the
+    same movement is not counted twice.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal, ROUND_UP
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum, OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from core.cache import bump_versions
+
+from .models import Item, StockOut, StockOutLine, StockHistory, ReorderSuggestion
+
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_LEAD_TIME_DAYS = 7
+DEFAULT_COVER_DAYS = 30
+DEFAULT_SERVICE_Z = 1.65  # ~95% service level
+
+OPEN_PO_STATUSES = ['Draft', 'Pending', 'Approved', 'Ordered']
+
+
+def _to_decimal(value):
+    """Round a float up to 3 decimal places (never under-order)"""
+    return Decimal(str(float(value))).quantize(Decimal('0.001'), rounding=ROUND_UP)
+
+
+def _consumption_rows(start):
+    """Yield (item_id, day, quantity) rows for consumption since `start`"""
+    # A multi-item stock out's header only describes its first line
+    lines = StockOutLine.objects.filter(
+        stock_out__status='approved',
+        item__is_active=True,
+    ).annotate(
+        moved_at=Coalesce('stock_out__approved_at', 'stock_out__date'),
+    ).filter(
+        moved_at__gte=start,
+    ).annotate(
+        day=TruncDate('moved_at'),
+    ).order_by().values_list('item_id', 'day').annotate(total=Sum('quantity'))
+
+    stock_outs = StockOut.objects.filter(
+        status='approved',
+        item__is_active=True,
+        lines__isnull=True,
+    ).annotate(
+        moved_at=Coalesce('approved_at', 'date'),
+    ).filter(
+        moved_at__gte=start,
+    ).annotate(
+        day=TruncDate('moved_at'),
+    ).order_by().values_list('item_id', 'day').annotate(total=Sum('quantity'))
+
+    history = StockHistory.objects.filter(
+        transaction_type='STOCK_OUT',
+        created_at__gte=start,
+        item__is_active=True,
+    ).exclude(
+        reference_model='StockOut',
+    ).annotate(
+        day=TruncDate('created_at'),
+    ).order_by().values_list('item_id', 'day').annotate(total=Sum('quantity'))
+
+    yield from lines.iterator(chunk_size=5000)
+    yield from stock_outs.iterator(chunk_size=5000)
+    yield from history.iterator(chunk_size=5000)
+
+
+def consumption_stats(item_ids, window_days=DEFAULT_WINDOW_DAYS, today=None):
+    """
+    Average daily usage and its standard deviation for each item in `item_ids`.
+
+    Days without movement count as zero usage. Returns two float arrays aligned
+    with `item_ids` (which must be sorted ascending).
+    """
+    today = today or timezone.now().date()
+    start_day = today - timedelta(days=window_days - 1)
+    start = timezone.make_aware(datetime.combine(start_day, time.min))
+
+    item_ids = np.asarray(item_ids, dtype=np.int64)
+    n_items = len(item_ids)
+    if n_items == 0:
+        return np.zeros(0), np.zeros(0)
+
+    ids, offsets, quantities = [], [], []
+    for item_id, day, total in _consumption_rows(start):
+        if day is None:
+            continue
+        ids.append(item_id)
+        offsets.append((day - start_day).days)
+        quantities.append(float(total or 0))
+
+    if not ids:
+        return np.zeros(n_items), np.zeros(n_items)
+
+    ids = np.asarray(ids, dtype=np.int64)
+    offsets = np.clip(np.asarray(offsets, dtype=np.int64), 0, window_days - 1)
+    quantities = np.abs(np.asarray(quantities, dtype=np.float64))
+
+    # Map item ids onto row positions; drop rows for items not being planned
+    rows = np.searchsorted(item_ids, ids)
+    rows = np.clip(rows, 0, n_items - 1)
+    known = item_ids[rows] == ids
+    rows, offsets, quantities = rows[known], offsets[known], quantities[known]
+
+    # Collapse all sources onto one total per (item, day) cell
+    cells = rows * window_days + offsets
+    unique_cells, inverse = np.unique(cells, return_inverse=True)
+    daily = np.bincount(inverse, weights=quantities)
+    cell_rows = unique_cells // window_days
+
+    total = np.bincount(cell_rows, weights=daily, minlength=n_items)
+    total_sq = np.bincount(cell_rows, weights=daily * daily, minlength=n_items)
+
+    mean = total / window_days
+    variance = np.maximum(total_sq / window_days - mean * mean, 0.0)
+    return mean, np.sqrt(variance)
+
+
+def build_reorder_plan(window_days=DEFAULT_WINDOW_DAYS,
+                       lead_time_days=DEFAULT_LEAD_TIME_DAYS,
+                       cover_days=DEFAULT_COVER_DAYS,
+                       service_z=DEFAULT_SERVICE_Z):
+    """
+    Compute reorder suggestions for every active item (not saved).
+
+    reorder point = avg usage x lead time + safety stock
+    safety stock  = z x std dev x sqrt(lead time)
+    order qty     = reorder point + avg usage x cover days - on hand
+                    (only when on hand is at/below the reorder point)
+    """
+    from procurement.models import PurchaseOrderItem
+
+    last_supplier = PurchaseOrderItem.objects.filter(
+        item=OuterRef('pk'),
+    ).order_by('-purchase_order__order_date', '-purchase_order_id').values('purchase_order__supplier_id')[:1]
+
+    items = list(
+        Item.objects.filter(is_active=True).order_by('pk').annotate(
+            last_supplier_id=Subquery(last_supplier),
+        ).values_list('pk', 'quantity', 'last_supplier_id')
+    )
+    if not items:
+        return []
+
+    item_ids = np.fromiter((row[0] for row in items), dtype=np.int64, count=len(items))
+    on_hand = np.fromiter((float(row[1]) for row in items), dtype=np.float64, count=len(items))
+
+    mean, std = consumption_stats(item_ids, window_days=window_days)
+
+    safety = service_z * std * math.sqrt(lead_time_days)
+    reorder_point = mean * lead_time_days + safety
+    target = reorder_point + mean * cover_days
+    order_qty = np.where(on_hand <= reorder_point, np.maximum(target - on_hand, 0.0), 0.0)
+    # Items with no usage in the window get no order suggestion
+    order_qty = np.where(mean > 0, order_qty, 0.0)
+
+    now = timezone.now()
+    return [
+        ReorderSuggestion(
+            item_id=item_id,
+            window_days=window_days,
+            avg_daily_usage=_to_decimal(mean[i]),
+            usage_std_dev=_to_decimal(std[i]),
+            lead_time_days=lead_time_days,
+            suggested_reorder_level=_to_decimal(reorder_point[i]),
+            suggested_minimum_stock=_to_decimal(safety[i]),
+            suggested_order_quantity=_to_decimal(order_qty[i]),
+            supplier_id=supplier_id,
+            computed_at=now,
+        )
+        for i, (item_id, _, supplier_id) in enumerate(items)
+    ]
+
+
+@transaction.atomic
+def save_reorder_plan(suggestions, batch_size=1000):
+    """Replace the stored plan with `suggestions`"""
+    ReorderSuggestion.objects.all().delete()
+    ReorderSuggestion.objects.bulk_create(suggestions, batch_size=batch_size)
+    return len(suggestions)
+
+
+@transaction.atomic
+def apply_reorder_levels(suggestions, batch_size=1000):
+    """
+    Copy suggested reorder/minimum levels onto Item for items with usage.
+
+    Uses bulk_update, so Item.save() validation is not re-run for every row.
+    """
+    by_item = {s.item_id: s for s in suggestions if s.avg_daily_usage > 0}
+    items = [
+        item for item in Item.objects.filter(is_active=True).only('pk', 'reorder_level', 'minimum_stock')
+        if item.pk in by_item
+    ]
+
+    for item in items:
+        suggestion = by_item[item.pk]
+        item.reorder_level = suggestion.suggested_reorder_level
+        # Minimum stock must stay below the reorder level
+        item.minimum_stock = min(suggestion.suggested_minimum_stock, suggestion.suggested_reorder_level)
+
+    Item.objects.bulk_update(items, ['reorder_level', 'minimum_stock'], batch_size=batch_size)
+    bump_versions(Item)
+    return len(items)
+
+
+@transaction.atomic
+def create_draft_purchase_orders(suggestions, batch_size=1000):
+    """
+    Create one Draft PurchaseOrder per supplier for items that need reordering.
+
+    Items without a known supplier, or already on an open PO, are skipped.
+    Returns the list of created purchase orders.
+    """
+    from procurement.models import PurchaseOrder, PurchaseOrderItem
+    from procurement.totals import save_lines
+
+    to_order = [s for s in suggestions if s.suggested_order_quantity > 0 and s.supplier_id]
+    if not to_order:
+        return []
+
+    already_open = set(
+        PurchaseOrderItem.objects.filter(
+            purchase_order__status__in=OPEN_PO_STATUSES,
+            item_id__in=[s.item_id for s in to_order],
+        ).values_list('item_id', flat=True)
+    )
+
+    prices = dict(
+        Item.objects.filter(pk__in=[s.item_id for s in to_order]).values_list('pk', 'purchase_price')
+    )
+
+    by_supplier = defaultdict(list)
+    for suggestion in to_order:
+        if suggestion.item_id not in already_open:
+            by_supplier[suggestion.supplier_id].append(suggestion)
+
+    created = []
+    for supplier_id, lines in by_supplier.items():
+        purchase_order = PurchaseOrder.objects.create(
+            supplier_id=supplier_id,
+            status='Draft',
+            notes=f"Auto-generated by reorder planner on {timezone.now().date()} ({len(lines)} items)",
+        )
+
+        po_items = []
+        for suggestion in lines:
+            quantity = math.ceil(suggestion.suggested_order_quantity)
+            unit_price = prices.get(suggestion.item_id) or Decimal('0.00')
+            po_items.append(PurchaseOrderItem(
+                purchase_order=purchase_order,
+                item_id=suggestion.item_id,
+                quantity=quantity,
+                unit_price=unit_price,
+            ))
+        save_lines(purchase_order, po_items, batch_size=batch_size)
+        created.append(purchase_order)
+
+    return created
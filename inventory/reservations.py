@@ -0,0 +1,151 @@
+# cornelsimba/inventory/reservations.py
+"""
+Stock reservations for pending sale stock-outs.
+
+A sale's stock out request reserves every sale line. Item.reserved_quantity
+is moved with conditional F() updates, so two requests racing for the same
+stock cannot both succeed: the UPDATE only matches while
+`quantity - reserved_quantity` still covers the line.
+
+Reservations end in one of three ways:
+  * consumed  - the stock out was approved (stock actually leaves)
+  * released  - the stock out was rejected or the sale cancelled
+  * expired   - nobody acted before expires_at (`expire_reservations` command)
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Sum, When
+from django.utils import timezone
+
+from .models import Item, StockReservation
+
+RESERVATION_TTL_HOURS = getattr(settings, 'STOCK_RESERVATION_TTL_HOURS', 72)
+
+
+@transaction.atomic
+def reserve_for_sale(sale, user=None, stock_out=None, ttl_hours=RESERVATION_TTL_HOURS):
+    """
+    Reserve stock for every line of `sale`.
+
+    Raises ValidationError (and reserves nothing) if any line is short.
+    """
+    required = defaultdict(lambda: 0)
+    for item_id, quantity in sale.items.values_list('item_id', 'quantity'):
+        required[item_id] += quantity
+
+    shortages = []
+    # Lock rows in a consistent order to avoid deadlocks between requests
+    for item_id in sorted(required):
+        quantity = required[item_id]
+        updated = Item.objects.filter(
+            pk=item_id,
+            quantity__gte=F('reserved_quantity') + quantity,
+        ).update(reserved_quantity=F('reserved_quantity') + quantity)
+        if not updated:
+            shortages.append(item_id)
+
+    if shortages:
+        rows = Item.objects.filter(pk__in=shortages).values_list('pk', 'name', 'quantity', 'reserved_quantity')
+        # Raising rolls back the reservations made above
+        raise ValidationError(
+            "Insufficient available stock: " + "; ".join(
+                f"{name}: Need {required[pk]}, Available {quantity - reserved}"
+                for pk, name, quantity, reserved in rows
+            )
+        )
+
+    expires_at = timezone.now() + timedelta(hours=ttl_hours) if ttl_hours else None
+    return StockReservation.objects.bulk_create([
+        StockReservation(
+            item_id=item_id,
+            quantity=quantity,
+            sale=sale,
+            stock_out=stock_out,
+            expires_at=expires_at,
+            created_by=user,
+        )
+        for item_id, quantity in required.items()
+    ])
+
+
+@transaction.atomic
+def _close(reservations, status):
+    """Move active reservations to `status` and give back their reserved totals"""
+    reservations = reservations.filter(status='active')
+    ids = list(reservations.select_for_update().values_list('pk', flat=True))
+    if not ids:
+        return 0
+
+    totals = StockReservation.objects.filter(pk__in=ids).order_by('item_id').values_list('item_id').annotate(
+        total=Sum('quantity'),
+    )
+    totals = dict(totals)
+    # One UPDATE for all affected items
+    Item.objects.filter(pk__in=list(totals)).update(
+        reserved_quantity=Case(
+            *[When(pk=item_id, then=F('reserved_quantity') - total) for item_id, total in totals.items()],
+            output_field=DecimalField(max_digits=15, decimal_places=3),
+        )
+    )
+
+    return StockReservation.objects.filter(pk__in=ids).update(status=status, closed_at=timezone.now())
+
+
+def _stock_out_reservations(stock_outs):
+    """Reservations held for `stock_outs` (by linked sale, or by the stock out itself)"""
+    sale_ids = [so.linked_sale_id for so in stock_outs if so.linked_sale_id]
+    own_ids = [so.pk for so in stock_outs if not so.linked_sale_id]
+    return StockReservation.objects.filter(Q(sale_id__in=sale_ids) | Q(stock_out_id__in=own_ids))
+
+
+def held_for_stock_outs(stock_outs):
+    """{(stock_out_id, item_id): quantity} still held by active reservations"""
+    by_sale = {so.linked_sale_id: so.pk for so in stock_outs if so.linked_sale_id}
+    rows = _stock_out_reservations(stock_outs).filter(status='active').order_by().values_list(
+        'sale_id', 'stock_out_id', 'item_id',
+    ).annotate(total=Sum('quantity'))
+
+    held = defaultdict(lambda: 0)
+    for sale_id, stock_out_id, item_id, total in rows:
+        owner = by_sale.get(sale_id, stock_out_id)
+        held[(owner, item_id)] += total
+    return held
+
+
+def consume_for_stock_outs(stock_outs):
+    """Stock outs approved: the held stock is now leaving"""
+    return _close(_stock_out_reservations(stock_outs), 'consumed')
+
+
+def release_for_stock_out(stock_out):
+    """Stock out rejected: give the stock back"""
+    return _close(_stock_out_reservations([stock_out]), 'released')
+
+
+def release_for_sales(sale_ids):
+    """Sales cancelled: give back everything they hold"""
+    return _close(StockReservation.objects.filter(sale_id__in=list(sale_ids)), 'released')
+
+
+def expire_reservations(now=None):
+    """Expire active reservations past their expires_at. Returns the count."""
+    now = now or timezone.now()
+    return _close(StockReservation.objects.filter(expires_at__lte=now), 'expired')
+
+
+@transaction.atomic
+def rebuild_reserved_quantities():
+    """Recompute Item.reserved_quantity from active reservations (repairs drift)"""
+    totals = dict(
+        StockReservation.objects.filter(status='active').order_by().values('item_id').annotate(
+            total=Sum('quantity'),
+        ).values_list('item_id', 'total')
+    )
+    fixed = Item.objects.filter(reserved_quantity__gt=0).exclude(pk__in=list(totals)).update(reserved_quantity=0)
+    for item_id, total in totals.items():
+        fixed += Item.objects.filter(pk=item_id).exclude(reserved_quantity=total).update(reserved_quantity=total)
+    return fixed
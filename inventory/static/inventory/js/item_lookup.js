@@ -0,0 +1,147 @@
+// Item Lookup (autocomplete) for <select data-item-lookup="...">
+// Pure JavaScript - No Django template tags
+
+(function() {
+    'use strict';
+
+    const DEBOUNCE_MS = 200;
+
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('select[data-item-lookup]').forEach(attachLookup);
+
+        // Selects added later (e.g. sale item formset rows)
+        const observer = new MutationObserver(function(mutations) {
+            mutations.forEach(function(mutation) {
+                mutation.addedNodes.forEach(function(node) {
+                    if (node.nodeType !== 1) return;
+                    if (node.matches('select[data-item-lookup]')) {
+                        attachLookup(node);
+                    }
+                    node.querySelectorAll('select[data-item-lookup]').forEach(attachLookup);
+                });
+            });
+        });
+        observer.observe(document.body, { childList: true, subtree: true });
+    });
+
+    function attachLookup(select) {
+        if (select.dataset.lookupReady) return;
+        select.dataset.lookupReady = '1';
+
+        const wrapper = document.createElement('div');
+        wrapper.className = 'item-lookup';
+        wrapper.style.position = 'relative';
+
+        const input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control item-lookup-input';
+        input.placeholder = 'Search by item name or SKU...';
+        input.autocomplete = 'off';
+
+        const results = document.createElement('div');
+        results.className = 'item-lookup-results';
+        results.style.cssText = 'display:none;position:absolute;left:0;right:0;z-index:1000;' +
+            'max-height:260px;overflow-y:auto;background:#fff;border:1px solid #ced4da;border-radius:4px;';
+
+        wrapper.appendChild(input);
+        wrapper.appendChild(results);
+        select.parentNode.insertBefore(wrapper, select);
+
+        let timer = null;
+        let currentQuery = '';
+        let nextPage = 1;
+
+        function search(page) {
+            const params = new URLSearchParams({ q: currentQuery, page: page });
+            if (select.dataset.inStock === '1') {
+                params.set('in_stock', '1');
+            }
+            fetch(`${select.dataset.itemLookup}?${params.toString()}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) return;
+                    if (page === 1) {
+                        results.innerHTML = '';
+                    }
+                    const more = results.querySelector('.item-lookup-more');
+                    if (more) more.remove();
+
+                    data.results.forEach(item => results.appendChild(renderRow(item)));
+                    if (data.results.length === 0 && page === 1) {
+                        const empty = document.createElement('div');
+                        empty.style.cssText = 'padding:6px 10px;color:#6c757d;';
+                        empty.textContent = 'No matching items';
+                        results.appendChild(empty);
+                    }
+                    if (data.has_next) {
+                        nextPage = data.page + 1;
+                        results.appendChild(renderMore());
+                    }
+                    results.style.display = 'block';
+                })
+                .catch(error => {
+                    console.error('Error searching items:', error);
+                });
+        }
+
+        function renderRow(item) {
+            const row = document.createElement('div');
+            row.className = 'item-lookup-row';
+            row.style.cssText = 'padding:6px 10px;cursor:pointer;';
+            const sku = item.sku ? ` [${item.sku}]` : '';
+            row.textContent = `${item.name}${sku} (${item.quantity} ${item.unit_of_measure})`;
+            row.addEventListener('mousedown', function(e) {
+                e.preventDefault();
+                choose(item);
+            });
+            return row;
+        }
+
+        function renderMore() {
+            const more = document.createElement('div');
+            more.className = 'item-lookup-more';
+            more.style.cssText = 'padding:6px 10px;cursor:pointer;color:#0d6efd;';
+            more.textContent = 'Show more...';
+            more.addEventListener('mousedown', function(e) {
+                e.preventDefault();
+                search(nextPage);
+            });
+            return more;
+        }
+
+        function choose(item) {
+            let option = select.querySelector(`option[value="${item.id}"]`);
+            if (!option) {
+                option = document.createElement('option');
+                option.value = item.id;
+                option.textContent = `${item.name} (${item.quantity} ${item.unit_of_measure})`;
+                select.appendChild(option);
+            }
+            select.value = String(item.id);
+            select.dispatchEvent(new Event('change', { bubbles: true }));
+            input.value = item.name;
+            results.style.display = 'none';
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            timer = setTimeout(function() {
+                currentQuery = input.value.trim();
+                search(1);
+            }, DEBOUNCE_MS);
+        });
+
+        input.addEventListener('focus', function() {
+            if (!results.innerHTML) {
+                currentQuery = input.value.trim();
+                search(1);
+            } else {
+                results.style.display = 'block';
+            }
+        });
+
+        input.addEventListener('blur', function() {
+            results.style.display = 'none';
+        });
+    }
+})();
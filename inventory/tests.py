@@ -1,3 +1,113 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import OutboxDelivery
+from finance.models import Income, SaleIncomeEvent
+from procurement.models import PurchaseOrder, PurchaseOrderItem, Supplier
+from sales.models import Customer, Sale
+
+from .events import receive_purchase_order
+from .models import Item, StockIn, StockOut, StockOutLine
+from .planning import consumption_stats
+
+
+class ReceivePurchaseOrderTests(TestCase):
+    """Goods of a delivered PO booked into stock by the inventory event handler"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('store_admin', 'store@example.com', 'password')
+        supplier = Supplier.objects.create(
+            name='Mill Supplies', contact_person='Asha', phone='0700000000',
+            email='mill@example.com', address='Dar es Salaam',
+        )
+        cls.item = Item.objects.create(name='Maize', quantity=Decimal('2.000'))
+        cls.purchase_order = PurchaseOrder.objects.create(
+            po_number='PO-TEST-1', supplier=supplier, status='Delivered',
+        )
+        # Two lines for the same item: each StockIn gets its own copy of the Item
+        for quantity in (Decimal('5.000'), Decimal('3.000')):
+            PurchaseOrderItem.objects.create(
+                purchase_order=cls.purchase_order, item=cls.item, quantity=quantity, unit_price=Decimal('100'),
+            )
+
+    def receive(self):
+        receive_purchase_order(SimpleNamespace(
+            payload={'purchase_order_id': self.purchase_order.pk, 'user_id': self.user.pk},
+        ))
+
+    def test_duplicate_item_lines_are_all_received(self):
+        self.receive()
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, Decimal('10.000'))
+        self.assertEqual(StockIn.objects.filter(purchase_order=self.purchase_order).count(), 2)
+
+    def test_replay_does_not_receive_twice(self):
+        self.receive()
+        self.receive()
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, Decimal('10.000'))
+
+
+class ConsumptionStatsTests(TestCase):
+    """Daily usage the reorder planner reads from approved stock outs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_superuser('planner_admin', 'planner@example.com', 'password')
+        cls.flour = Item.objects.create(name='Flour', quantity=Decimal('100.000'))
+        cls.bran = Item.objects.create(name='Bran', quantity=Decimal('100.000'))
+        cls.sugar = Item.objects.create(name='Sugar', quantity=Decimal('100.000'))
+
+        # Multi-item stock out: the header only carries the first line
+        multi = StockOut.objects.create(item=cls.flour, quantity=Decimal('7.000'), purpose='SALE', created_by=user)
+        StockOutLine.objects.create(stock_out=multi, item=cls.flour, quantity=Decimal('7.000'))
+        StockOutLine.objects.create(stock_out=multi, item=cls.bran, quantity=Decimal('4.000'))
+        single = StockOut.objects.create(item=cls.sugar, quantity=Decimal('2.000'), created_by=user)
+        StockOut.objects.filter(pk__in=[multi.pk, single.pk]).update(status='approved', approved_at=timezone.now())
+
+    def test_every_line_of_a_stock_out_counts(self):
+        item_ids = sorted([self.flour.pk, self.bran.pk, self.sugar.pk])
+        mean, _ = consumption_stats(item_ids, window_days=10)
+
+        usage = dict(zip(item_ids, mean))
+        self.assertAlmostEqual(usage[self.flour.pk], 0.7)
+        self.assertAlmostEqual(usage[self.bran.pk], 0.4)
+        self.assertAlmostEqual(usage[self.sugar.pk], 0.2)
+
+
+class ApproveSaleStockOutTests(TestCase):
+    """Approving a sale's stock out books its income through the event bus"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('stock_admin', 'stock@example.com', 'password')
+        item = Item.objects.create(name='Flour', quantity=Decimal('20.000'))
+        cls.sale = Sale.objects.create(
+            customer=Customer.objects.create(name='Duka La Mama'), status='APPROVED',
+            net_amount=Decimal('5000'), created_by=cls.user,
+        )
+        cls.stock_out = StockOut.objects.create(
+            item=item, quantity=Decimal('10.000'), purpose='SALE', linked_sale=cls.sale, created_by=cls.user,
+        )
+
+    def test_income_is_booked_once_by_the_bus_handler(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('inventory:approve_stockout', args=[self.stock_out.pk]))
 
-# Create your tests here.
+        self.assertRedirects(response, reverse('inventory:stock_out_list'), fetch_redirect_response=False)
+        self.sale.refresh_from_db()
+        self.assertEqual(self.sale.status, 'COMPLETED')
+        self.assertEqual(Income.objects.filter(sale=self.sale).count(), 1)
+        event = SaleIncomeEvent.objects.get(sale=self.sale)
+        self.assertEqual((event.status, event.attempts), ('processed', 1))
+        delivery = OutboxDelivery.objects.get(event__topic='inventory.stock_outs.approved')
+        self.assertEqual(delivery.status, 'delivered')
@@ -31,6 +31,7 @@ urlpatterns = [
     # Stock Out Approval URLs - ADD THESE
     path('stock-outs/<int:pk>/approve/', views.approve_stockout, name='approve_stockout'),
     path('stock-outs/<int:pk>/reject/', views.reject_stockout, name='reject_stockout'),
+    path('stock-outs/bulk-approve/', views.bulk_approve_stockouts, name='bulk_approve_stockouts'),
     
     # Adjustments
     path('adjustments/', views.stock_adjustment_list, name='adjustment_list'),
@@ -46,6 +47,7 @@ urlpatterns = [
     path('pending-sales-stockouts/', views.pending_sales_stockouts, name='pending_sales_stockouts'),
 
     path('api/item/<int:pk>/', views.get_item_details, name='item_details_api'),
+    path('api/items/lookup/', views.item_lookup, name='item_lookup_api'),
 
     path('accounts/login/', auth_views.LogoutView.as_view(next_page='login'), name='login'),
 
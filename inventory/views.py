@@ -1,17 +1,26 @@
 # cornelsimba/inventory/views.py - COMPLETELY FIXED VERSION
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.response import TemplateResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Sum, Count, Q, F
 from django.db import transaction
+from django.core.exceptions import ValidationError
 from functools import wraps
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.conf import settings
 from .models import Item, StockIn, StockOut, StockAdjustment, StockHistory
 from .forms import ItemForm, StockInForm, StockOutForm, StockAdjustmentForm, ApproveRejectForm
+from .lookup import search_items
+from .availability import check_sales_availability
+from .reservations import release_for_stock_out
+from .approvals import approve_stock_outs
 from sales.models import Sale  # Add this import
+from finance.models import Income, SaleIncomeEvent
 from audit.utils import audit_log
+from core.bus import dispatch_after_commit
+from core.cache import cached_report
 from django.http import JsonResponse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from decimal import Decimal
@@ -339,7 +348,7 @@ def stock_in_create(request):
             messages.success(request, f'Stock In recorded for {stock_in.item.name}!')
             return redirect('inventory:stock_in_list')
     else:
-        form = StockInForm(user=request.user)
+        form = StockInForm(user=request.user, initial={'item': request.GET.get('item')})
     
     return render(request, 'inventory/stock_in_form.html', {'form': form})
 
@@ -455,12 +464,10 @@ def stock_out_create(request):
             messages.success(request, f'Stock Out recorded for {stock_out.item.name}!')
             return redirect('inventory:stock_out_list')
     else:
-        form = StockOutForm(user=request.user)
+        form = StockOutForm(user=request.user, initial={'item': request.GET.get('item')})
     
-    items = Item.objects.filter(is_active=True).order_by('name')
     return render(request, 'inventory/stock_out_form.html', {
         'form': form,
-        'items': items,
         'usd_to_tsh': USD_TO_TSH,
     })
 
@@ -631,6 +638,7 @@ def stock_adjustment_approve(request, pk):
 
 @login_required
 @group_required('Inventory')
+@cached_report('inventory.Item', 'inventory.StockHistory')
 def stock_report(request):
     items = Item.objects.filter(is_active=True).order_by('category', 'name')
     
@@ -681,7 +689,7 @@ def stock_report(request):
         'end_date': end_date.date(),
         'usd_to_tsh': USD_TO_TSH,
     }
-    return render(request, 'inventory/stock_report.html', context)
+    return TemplateResponse(request, 'inventory/stock_report.html', context)
 
 
 @login_required
@@ -721,134 +729,126 @@ def adjustment_detail(request, pk):
 
 @login_required
 @group_required('Inventory')
-@transaction.atomic
 def approve_stockout(request, pk):
-    """Approve a pending stock out request - FIXED VERSION"""
-    stock_out = get_object_or_404(StockOut, pk=pk)
+    """Approve a pending stock out request (all of its lines)"""
+    stock_out = get_object_or_404(StockOut.objects.select_related('item', 'linked_sale'), pk=pk)
     
     # Check if already approved
     if stock_out.status == 'approved':
         messages.warning(request, 'This stock out is already approved.')
         return redirect('inventory:stock_out_list')
     
-    # Check if stock is available
-    if stock_out.item.quantity < stock_out.quantity:
-        messages.error(request, 
-            f'Insufficient stock for {stock_out.item.name}. '
-            f'Available: {stock_out.item.quantity} {stock_out.item.unit_of_measure}, '
-            f'Required: {stock_out.quantity} {stock_out.item.unit_of_measure}')
+    try:
+        result = approve_stock_outs([stock_out.pk], request.user)
+    except ValidationError as e:
+        messages.error(request, f'Error approving stock out: {" ".join(e.messages)}')
         return redirect('inventory:stock_out_list')
     
+    if stock_out.pk in result['skipped']:
+        messages.error(request, f'Cannot approve stock out for {stock_out.item.name}. {result["skipped"][stock_out.pk]}')
+        return redirect('inventory:stock_out_list')
+    
+    incomes = _book_sale_income(result)
+    _audit_stock_out_approvals(request, result, incomes)
+    
+    sale = stock_out.linked_sale
+    if sale and incomes:
+        income = incomes[0]
+        messages.success(request, 
+            f'✅ Stock out approved and income record created (Tsh {income.amount:,.2f}). '
+            f'Sale {sale.sale_number} marked as COMPLETED.'
+        )
+    elif sale:
+        messages.warning(request, 
+            f'ℹ️ Stock out approved but no new income was created for sale {sale.sale_number} '
+            f'(already recorded, or queued for retry).'
+        )
+    else:
+        messages.success(request, 
+            f'✅ Stock out approved for {stock_out.item.name}. '
+            f'{stock_out.quantity} {stock_out.item.unit_of_measure} deducted from stock.'
+        )
+    
+    return redirect('inventory:stock_out_list')
+
+
+@login_required
+@group_required('Inventory')
+def bulk_approve_stockouts(request):
+    """Approve many pending stock outs in one transaction"""
+    if request.method != 'POST':
+        return redirect('inventory:pending_sales_stockouts')
+    
+    stock_out_ids = [pk for pk in request.POST.getlist('stockout_ids') if pk.isdigit()]
+    if not stock_out_ids:
+        messages.warning(request, 'Select at least one stock out to approve.')
+        return redirect('inventory:pending_sales_stockouts')
+    
     try:
-        # Update stock out status
-        stock_out.status = 'approved'
-        stock_out.approved_by = request.user
-        stock_out.approved_at = timezone.now()
-        stock_out.save()
-        
-        # 🔧 FIX 6: Harden stock out approval - NO FLOAT DRIFT
-        stock_out.item.quantity = (
-            Decimal(str(stock_out.item.quantity)) - Decimal(str(stock_out.quantity))
-        ).quantize(Decimal('0.001'))
-        stock_out.item.save(update_fields=['quantity'])
-        
-        # Create stock history
-        StockHistory.objects.create(
-            item=stock_out.item,
-            transaction_type='STOCK_OUT',
-            quantity=stock_out.quantity,
-            previous_quantity=stock_out.item.quantity + stock_out.quantity,
-            new_quantity=stock_out.item.quantity,
-            reference_id=stock_out.id,
-            reference_model='StockOut',
-            reference=stock_out.reference,
-            notes=f"Approved stock out: {stock_out.notes or ''}",
-            created_by=request.user.get_full_name() or request.user.username
+        result = approve_stock_outs(stock_out_ids, request.user)
+    except ValidationError as e:
+        messages.error(request, f'Error approving stock outs: {" ".join(e.messages)}')
+        return redirect('inventory:pending_sales_stockouts')
+    
+    incomes = _book_sale_income(result)
+    _audit_stock_out_approvals(request, result, incomes)
+    
+    if result['approved']:
+        messages.success(request, 
+            f'✅ Approved {len(result["approved"])} stock out(s); '
+            f'{len(incomes)} income record(s) created.'
+        )
+    for pk, reason in sorted(result['skipped'].items()):
+        messages.warning(request, f'Stock out #{pk} not approved: {reason}')
+    
+    return redirect('inventory:pending_sales_stockouts')
+
+
+def _book_sale_income(result):
+    """
+    Deliver an approval's event now, so finance completes the sales and books
+    their income (anything that fails stays queued for the outbox and
+    process_sale_income). Returns the incomes booked for these stock outs.
+    """
+    if not result['event']:
+        return []
+    dispatch_after_commit(result['event'])
+    booked = SaleIncomeEvent.objects.filter(stock_out__in=result['approved'], status='processed').values('income')
+    return list(Income.objects.filter(pk__in=booked))
+
+
+def _audit_stock_out_approvals(request, result, incomes):
+    """Audit entries for an approval batch"""
+    for stock_out in result['approved']:
+        audit_log(
+            user=request.user,
+            action='APPROVE',
+            module='INVENTORY',
+            object_type='StockOut',
+            object_id=stock_out.id,
+            description=f'Approved stock out: {stock_out.quantity} {stock_out.item.unit_of_measure} of "{stock_out.item.name}"',
+            request=request
         )
-        
-        # 🔴 CRITICAL FIX: Update the linked sale status
         if stock_out.linked_sale:
-            sale = stock_out.linked_sale
-            
-            # Update sale status to COMPLETED
-            sale.status = 'COMPLETED'
-            sale.stock_out_processed_date = timezone.now()
-            sale.save(update_fields=['status', 'stock_out_processed_date', 'updated_at'])
-            
-            # Update all sale items to mark as stocked out
-            for sale_item in sale.items.all():
-                sale_item.is_stocked_out = True
-                sale_item.stock_out_date = timezone.now()
-                sale_item.save(update_fields=['is_stocked_out', 'stock_out_date'])
-            
-            # ✅ AUDIT: Sale status update
             audit_log(
                 user=request.user,
                 action='UPDATE',
                 module='SALES',
                 object_type='Sale',
-                object_id=sale.id,
-                description=f'Inventory approved stock out, marking sale #{sale.sale_number} as COMPLETED',
+                object_id=stock_out.linked_sale_id,
+                description=f'Inventory approved stock out, marking sale #{stock_out.linked_sale.sale_number} as COMPLETED',
                 request=request
             )
-            
-        # ✅ FINANCE INTEGRATION: Create income record if not exists
-        if stock_out.purpose == 'SALE' and stock_out.linked_sale:
-            from finance.models import Income
-            
-            sale = stock_out.linked_sale
-            
-            # Check if income record already exists
-            if not Income.objects.filter(sale=sale).exists():
-                try:
-                    income = Income.create_from_sale(sale, request.user)
-                    
-                    # ✅ AUDIT: Income creation
-                    audit_log(
-                        user=request.user,
-                        action='CREATE',
-                        module='FINANCE',
-                        object_type='Income',
-                        object_id=income.id,
-                        description=f'Auto-created income from approved stock out: Tsh {income.amount:,.2f}',
-                        request=request
-                    )
-                    
-                    messages.success(request, 
-                        f'✅ Stock out approved and income record created (Tsh {income.amount:,.2f}). '
-                        f'Sale {sale.sale_number} marked as COMPLETED.'
-                    )
-                except Exception as e:
-                    messages.error(request, 
-                        f'⚠️ Stock out approved but failed to create income record: {str(e)}'
-                    )
-            else:
-                messages.warning(request, 
-                    f'ℹ️ Stock out approved but income record already exists for sale {sale.sale_number}.'
-                )
-        else:
-            messages.success(request, 
-                f'✅ Stock out approved for {stock_out.item.name}. '
-                f'{stock_out.quantity} {stock_out.item.unit_of_measure} deducted from stock.'
-            )
-        
-        # 🔴 AUDIT: Stock out approval
+    for income in incomes:
         audit_log(
             user=request.user,
-            action='APPROVE',
-            module='INVENTORY',
-            object_type='StockOut',
-            object_id=stock_out.id,
-            description=f'Approved stock out: {stock_out.quantity} {stock_out.item.unit_of_measure} of "{stock_out.item.name}"',
+            action='CREATE',
+            module='FINANCE',
+            object_type='Income',
+            object_id=income.id,
+            description=f'Auto-created income from approved stock out: Tsh {income.amount:,.2f}',
             request=request
         )
-        
-    except Exception as e:
-        messages.error(request, f'Error approving stock out: {str(e)}')
-        # Rollback transaction if needed
-        raise
-    
-    return redirect('inventory:stock_out_list')
 
 @login_required
 @group_required('Inventory')
@@ -867,6 +867,7 @@ def reject_stockout(request, pk):
         stock_out.rejected_by = request.user
         stock_out.rejected_at = timezone.now()
         stock_out.save()
+        release_for_stock_out(stock_out)
         
         # 🔴 CRITICAL FIX: Update the linked sale status back to APPROVED
         if stock_out.linked_sale:
@@ -946,16 +947,30 @@ def pending_sales_stockouts(request):
     pending_stockouts = StockOut.objects.filter(
         status='pending',
         purpose='SALE'
-    ).select_related('item', 'linked_sale', 'linked_sale__customer').order_by('-date')
+    ).select_related('item', 'linked_sale', 'linked_sale__customer').prefetch_related('lines').order_by('-date')
+    pending_stockouts = list(pending_stockouts)
     
-    # Calculate insufficient stock count
+    # Check every linked sale in one batch (not per row)
+    availability = check_sales_availability(
+        {stockout.linked_sale_id for stockout in pending_stockouts if stockout.linked_sale_id}
+    )
     insufficient_count = 0
     for stockout in pending_stockouts:
-        if stockout.item.quantity < stockout.quantity:
+        if stockout.linked_sale_id:
+            stockout.shortfalls = availability[stockout.linked_sale_id]['shortfalls']
+        elif stockout.item.quantity < stockout.quantity:
+            stockout.shortfalls = [{
+                'item_name': stockout.item.name,
+                'unit_of_measure': stockout.item.unit_of_measure,
+                'shortfall': stockout.quantity - stockout.item.quantity,
+            }]
+        else:
+            stockout.shortfalls = []
+        if stockout.shortfalls:
             insufficient_count += 1
     
     # Count for dashboard display
-    pending_count = pending_stockouts.count()
+    pending_count = len(pending_stockouts)
     
     # Get sales that are approved but don't have stock outs yet
     sales_without_stockout = Sale.objects.filter(
@@ -983,6 +998,7 @@ def stock_out_detail(request, pk):
     
     context = {
         'stock_out': stock_out,
+        'lines': stock_out.lines.select_related('item'),
         'usd_to_tsh': USD_TO_TSH,
     }
     return render(request, 'inventory/stock_out_detail.html', context)
@@ -1024,6 +1040,33 @@ def get_item_details(request, pk):
         return JsonResponse(data)
     except Item.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Item not found'})
+
+
+@login_required
+def item_lookup(request):
+    """API endpoint for item autocomplete (prefix match on name or SKU)"""
+    try:
+        page = int(request.GET.get('page', 1))
+        page_size = int(request.GET.get('page_size', 20))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid page'}, status=400)
+
+    results, total, has_next = search_items(
+        request.GET.get('q', ''),
+        page=page,
+        page_size=page_size,
+        in_stock=request.GET.get('in_stock') == '1',
+    )
+    for row in results:
+        row['quantity'] = str(row['quantity'])  # Keep decimal precision
+    return JsonResponse({
+        'success': True,
+        'results': results,
+        'page': max(page, 1),
+        'total': total,
+        'has_next': has_next,
+    })
+
     
 @login_required
 @group_required('Inventory')
@@ -0,0 +1,110 @@
+# cornelsimba/marketing/analytics.py
+"""
+Marketing sales analytics.
+
+A marketing sale's value is quantity x unit price (Sale.total_price is a
+Python property), so every aggregate here uses SALE_VALUE.
+
+monthly_series() returns a month-by-month series for any range of years
+from one TruncMonth grouped query; months without sales are filled with
+zeros in Python. breakdown() groups by any field in one query.
+
+Per-contract sales totals are stored on Contract (sales_value, sale_count)
+and moved by apply_sale_change() from Sale.save()/delete() with F()
+increments, so contract lists and Sale.clean() never aggregate sales.
+rebuild_contract_sales_totals() recomputes them from scratch.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Count, DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import Contract, Sale
+
+ZERO = Decimal('0')
+SALE_VALUE = ExpressionWrapper(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def monthly_series(start_year, end_year=None, sales=None):
+    """
+    [{'month': date, 'label': str, 'total': Decimal, 'count': int}] for every
+    month from January of start_year to December of end_year.
+    """
+    end_year = end_year or start_year
+    sales = Sale.objects.all() if sales is None else sales
+    rows = sales.filter(sale_date__year__gte=start_year, sale_date__year__lte=end_year).annotate(
+        month=TruncMonth('sale_date'),
+    ).order_by().values('month').annotate(total=Sum(SALE_VALUE), count=Count('pk'))
+    by_month = {row['month']: row for row in rows}
+
+    label_format = '%B' if start_year == end_year else '%b %Y'
+    series = []
+    for year in range(start_year, end_year + 1):
+        for month in range(1, 13):
+            key = date(year, month, 1)
+            row = by_month.get(key, {})
+            series.append({
+                'month': key,
+                'label': key.strftime(label_format),
+                'total': row.get('total') or ZERO,
+                'count': row.get('count', 0),
+            })
+    return series
+
+
+def breakdown(field, sales=None, limit=None):
+    """Sale count and value per value of `field`, largest value first"""
+    sales = Sale.objects.all() if sales is None else sales
+    rows = sales.order_by().values(field).annotate(
+        count=Count('pk'), total_value=Sum(SALE_VALUE),
+    ).order_by('-total_value')
+    return rows[:limit] if limit else rows
+
+
+def sales_totals(sales=None):
+    """Overall count and value in one query"""
+    sales = Sale.objects.all() if sales is None else sales
+    totals = sales.aggregate(count=Count('pk'), total_value=Sum(SALE_VALUE))
+    totals['total_value'] = totals['total_value'] or ZERO
+    return totals
+
+
+# Per-contract totals -----------------------------------------------------------
+
+def apply_sale_change(old, new):
+    """
+    Move contract totals for one sale. `old` and `new` are (contract_id,
+    value) before and after the change, None for a created / deleted sale.
+    """
+    if old == new:
+        return
+    if old is not None:
+        Contract.objects.filter(pk=old[0]).update(
+            sales_value=F('sales_value') - old[1], sale_count=F('sale_count') - 1,
+        )
+    if new is not None:
+        Contract.objects.filter(pk=new[0]).update(
+            sales_value=F('sales_value') + new[1], sale_count=F('sale_count') + 1,
+        )
+
+
+@transaction.atomic
+def rebuild_contract_sales_totals():
+    """Recompute every contract's sales_value / sale_count with one UPDATE"""
+    sales = Sale.objects.filter(contract=OuterRef('pk')).order_by().values('contract')
+    return Contract.objects.update(
+        sales_value=Coalesce(
+            Subquery(sales.annotate(total=Sum(SALE_VALUE)).values('total')[:1]),
+            Value(ZERO),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+        sale_count=Coalesce(
+            Subquery(sales.annotate(n=Count('pk')).values('n')[:1]),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+    )
@@ -0,0 +1,12 @@
+# cornelsimba/marketing/events.py
+"""Marketing handlers for outbox events (see core/bus.py)"""
+from core.bus import subscribe
+
+from .models import Sale
+
+
+@subscribe('marketing.sale.created')
+def book_sale_income(event):
+    """Finance income for a new contract sale"""
+    sale = Sale.objects.select_related('contract__customer', 'sales_person').get(pk=event.payload['sale_id'])
+    sale.create_finance_income()
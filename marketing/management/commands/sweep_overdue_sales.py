@@ -0,0 +1,15 @@
+# marketing/management/commands/sweep_overdue_sales.py
+from django.core.management.base import BaseCommand
+
+from marketing.overdue import sweep_overdue_sales
+
+
+class Command(BaseCommand):
+    help = 'Mark unpaid marketing sales past their due date as Overdue (run daily from cron)'
+
+    def handle(self, *args, **options):
+        result = sweep_overdue_sales()
+        self.stdout.write(f"Marked {result['marked']} sales overdue")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['overdue']} sales overdue in total (${result['overdue_value']:,.2f})"
+        ))
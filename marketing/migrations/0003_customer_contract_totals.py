@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-19 00:16
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_contract_totals(apps, schema_editor):
+    Customer = apps.get_model('marketing', 'Customer')
+    Contract = apps.get_model('marketing', 'Contract')
+
+    rows = Contract.objects.order_by().values('customer_id').annotate(total=Sum('value'), n=Count('pk'))
+    for row in rows:
+        Customer.objects.filter(pk=row['customer_id']).update(contract_value=row['total'], contract_count=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0002_alter_contract_options_alter_customer_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='contract_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='contract_value',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.RunPython(fill_contract_totals, migrations.RunPython.noop),
+    ]
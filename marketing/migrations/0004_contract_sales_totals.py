@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 00:21
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+
+
+def fill_sales_totals(apps, schema_editor):
+    Contract = apps.get_model('marketing', 'Contract')
+    Sale = apps.get_model('marketing', 'Sale')
+
+    value = ExpressionWrapper(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    rows = Sale.objects.order_by().values('contract_id').annotate(total=Sum(value), n=Count('pk'))
+    for row in rows:
+        Contract.objects.filter(pk=row['contract_id']).update(sales_value=row['total'] or 0, sale_count=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0003_customer_contract_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contract',
+            name='sale_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='contract',
+            name='sales_value',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.RunPython(fill_sales_totals, migrations.RunPython.noop),
+    ]
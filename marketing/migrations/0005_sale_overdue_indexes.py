@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0004_contract_sales_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['payment_status'], name='marketing_s_payment_0e6232_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(condition=models.Q(('payment_status__in', ['Pending', 'Partial'])), fields=['due_date'], name='mkt_sale_unpaid_due_idx'),
+        ),
+    ]
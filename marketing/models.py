@@ -4,6 +4,9 @@ from django.core.validators import MinValueValidator
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.db import transaction
+from core.bus import publish, dispatch_after_commit
+from core.sequences import daily_number
 
 class Customer(models.Model):
     CUSTOMER_TYPES = [
@@ -23,6 +26,11 @@ class Customer(models.Model):
     credit_limit = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     payment_terms = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    
+    # Denormalized contract totals, kept by refresh_contract_totals()
+    contract_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+    contract_count = models.PositiveIntegerField(default=0, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -32,15 +40,36 @@ class Customer(models.Model):
     class Meta:
         ordering = ['name']
     
+    @classmethod
+    def refresh_contract_totals(cls, customer_ids):
+        """Recompute contract_value / contract_count for the given customers in one UPDATE"""
+        from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+        from django.db.models.functions import Coalesce
+        
+        contracts = Contract.objects.filter(customer=OuterRef('pk')).order_by().values('customer')
+        cls.objects.filter(pk__in=[pk for pk in customer_ids if pk]).update(
+            contract_value=Coalesce(
+                Subquery(contracts.annotate(total=Sum('value')).values('total')[:1]),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            contract_count=Coalesce(
+                Subquery(contracts.annotate(n=Count('pk')).values('n')[:1]),
+                Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+    
     @property
     def total_contract_value(self):
         """Total value of all contracts with this customer"""
-        from django.db.models import Sum
-        return self.contracts.aggregate(total=Sum('value'))['total'] or 0
+        return self.contract_value
     
     @property
     def active_contracts_count(self):
-        """Count of active contracts"""
+        """Count of active contracts (annotated as `active_contracts` by list views)"""
+        if hasattr(self, 'active_contracts'):
+            return self.active_contracts
         today = timezone.now().date()
         return self.contracts.filter(end_date__gte=today).count()
 
@@ -84,6 +113,11 @@ class Contract(models.Model):
     renewal_date = models.DateField(null=True, blank=True, help_text="Date to review for renewal")
     
     notes = models.TextField(blank=True, null=True)
+    
+    # Denormalized sales totals, moved by Sale.save()/delete() (see marketing/analytics.py)
+    sales_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+    sale_count = models.PositiveIntegerField(default=0, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -96,10 +130,7 @@ class Contract(models.Model):
     def save(self, *args, **kwargs):
         # Auto-generate contract number if not provided
         if not self.contract_number:
-            from datetime import datetime
-            date_part = datetime.now().strftime('%Y%m%d')
-            last_contract = Contract.objects.filter(contract_number__contains=date_part).count()
-            self.contract_number = f"CON-{date_part}-{last_contract + 1:04d}"
+            self.contract_number = daily_number('CON', Contract, 'contract_number')
         
         # Update status based on dates
         today = timezone.now().date()
@@ -111,7 +142,20 @@ class Contract(models.Model):
             elif today > self.end_date:
                 self.status = 'Expired'
         
-        super().save(*args, **kwargs)
+        previous_customer_id = None
+        if self.pk:
+            previous_customer_id = Contract.objects.filter(pk=self.pk).values_list('customer_id', flat=True).first()
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Customer.refresh_contract_totals({self.customer_id, previous_customer_id})
+    
+    def delete(self, *args, **kwargs):
+        customer_id = self.customer_id
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Customer.refresh_contract_totals([customer_id])
+        return result
     
     def __str__(self):
         return f"{self.contract_number} - {self.customer.name} (${self.value})"
@@ -133,13 +177,12 @@ class Contract(models.Model):
     @property
     def total_sales_value(self):
         """Total value of sales under this contract"""
-        from django.db.models import Sum
-        return self.sales.aggregate(total=Sum('total_price'))['total'] or 0
+        return self.sales_value
     
     @property
     def sales_count(self):
         """Number of sales under this contract"""
-        return self.sales.count()
+        return self.sale_count
     
     class Meta:
         ordering = ['-start_date']
@@ -209,10 +252,7 @@ class Sale(models.Model):
         
         # Auto-generate invoice number if not provided
         if not self.invoice_number:
-            from datetime import datetime
-            date_part = datetime.now().strftime('%Y%m%d')
-            last_invoice = Sale.objects.filter(invoice_number__contains=date_part).count()
-            self.invoice_number = f"INV-{date_part}-{last_invoice + 1:04d}"
+            self.invoice_number = daily_number('INV', Sale, 'invoice_number')
         
         # Set due date if not provided (30 days from sale date)
         if not self.due_date:
@@ -225,36 +265,50 @@ class Sale(models.Model):
             if today > self.due_date:
                 self.payment_status = 'Overdue'
         
-        super().save(*args, **kwargs)
+        from .analytics import apply_sale_change
         
-        # Auto-create Finance Income record for new sales
-        if is_new:
-            self.create_finance_income()
+        with transaction.atomic():
+            old = None
+            if not is_new:
+                old = Sale.objects.filter(pk=self.pk).values_list('contract_id', 'quantity', 'unit_price').first()
+                old = (old[0], old[1] * old[2]) if old else None
+            
+            super().save(*args, **kwargs)
+            apply_sale_change(old, (self.contract_id, self.quantity * self.unit_price))
+            
+            # Finance books the income from the outbox (marketing/events.py)
+            if is_new:
+                dispatch_after_commit(publish('marketing.sale.created', {'sale_id': self.pk}))
+    
+    def delete(self, *args, **kwargs):
+        from .analytics import apply_sale_change
+        
+        with transaction.atomic():
+            old = Sale.objects.filter(pk=self.pk).values_list('contract_id', 'quantity', 'unit_price').first()
+            result = super().delete(*args, **kwargs)
+            if old:
+                apply_sale_change((old[0], old[1] * old[2]), None)
+        return result
     
     def create_finance_income(self):
-        """Create corresponding income record in Finance module"""
-        try:
-            from finance.models import Income
-            
-            Income.objects.create(
-                source=f"Sale: {self.invoice_number}",
-                amount=self.total_price,
-                date=self.sale_date,
-                income_type='Sales',
-                department=self.sales_person.department if hasattr(self.sales_person, 'department') else 'Sales',
-                reference=self.invoice_number,
-                description=f"Sale from contract {self.contract.contract_number}\n"
-                           f"Customer: {self.contract.customer.name}\n"
-                           f"Sales Person: {self.sales_person.full_name}"
-            )
-        except ImportError:
-            # Finance module not installed yet
-            pass
-        except Exception as e:
-            # Log error but don't crash
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Failed to create finance income for sale {self.id}: {e}")
+        """Create the corresponding income record in Finance (once per invoice)"""
+        from finance.models import Income
+        
+        source = f"Sale: {self.invoice_number}"
+        if Income.objects.filter(source=source, reference=self.invoice_number).exists():
+            return None
+        
+        return Income.objects.create(
+            source=source,
+            amount=self.total_price,
+            date=self.sale_date,
+            income_type='Sales',
+            department=self.sales_person.department if hasattr(self.sales_person, 'department') else 'Sales',
+            reference=self.invoice_number,
+            description=f"Sale from contract {self.contract.contract_number}\n"
+                       f"Customer: {self.contract.customer.name}\n"
+                       f"Sales Person: {self.sales_person.full_name}"
+        )
     
     @property
     def total_price(self):
@@ -282,4 +336,13 @@ class Sale(models.Model):
         return f"{self.invoice_number} - ${self.total_price} ({self.contract.customer.name})"
     
     class Meta:
-        ordering = ['-sale_date']
\ No newline at end of file
+        ordering = ['-sale_date']
+        indexes = [
+            models.Index(fields=['payment_status']),
+            # Unpaid sales only: what the overdue sweep scans (see marketing/overdue.py)
+            models.Index(
+                fields=['due_date'],
+                condition=models.Q(payment_status__in=['Pending', 'Partial']),
+                name='mkt_sale_unpaid_due_idx',
+            ),
+        ]
\ No newline at end of file
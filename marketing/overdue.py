@@ -0,0 +1,70 @@
+# cornelsimba/marketing/overdue.py
+"""
+Overdue invoices.
+
+Sale.save() only flips payment_status to 'Overdue' when a sale happens to
+be saved after its due date. sweep_overdue_sales() (run daily by the
+`sweep_overdue_sales` command) marks every unpaid sale past its due date in
+one UPDATE, served by the partial index on due_date over unpaid rows, and
+records the counts in the audit log.
+
+Between sweeps, reports use effective_payment_status() so a sale that fell
+due since the last run is still shown as overdue.
+"""
+from django.db.models import Case, CharField, Count, F, Sum, Value, When
+from django.utils import timezone
+
+from audit.utils import audit_log
+from core.cache import bump_versions
+
+from .analytics import SALE_VALUE
+from .models import Sale
+
+UNPAID_STATUSES = ('Pending', 'Partial')
+
+
+def effective_payment_status(today=None):
+    """payment_status as of `today`: unpaid sales past their due date count as Overdue"""
+    today = today or timezone.localdate()
+    return Case(
+        When(payment_status__in=UNPAID_STATUSES, due_date__lt=today, then=Value('Overdue')),
+        default=F('payment_status'),
+        output_field=CharField(),
+    )
+
+
+def payment_status_breakdown(sales=None, today=None):
+    """Sale count and value per effective payment status, largest value first"""
+    sales = Sale.objects.all() if sales is None else sales
+    return sales.annotate(status=effective_payment_status(today)).order_by().values('status').annotate(
+        count=Count('pk'), total_value=Sum(SALE_VALUE),
+    ).order_by('-total_value')
+
+
+def sweep_overdue_sales(today=None):
+    """Mark unpaid sales past their due date as Overdue. Returns the counts."""
+    today = today or timezone.localdate()
+    marked = Sale.objects.filter(
+        payment_status__in=UNPAID_STATUSES, due_date__lt=today,
+    ).update(payment_status='Overdue', updated_at=timezone.now())
+    if marked:
+        bump_versions(Sale)
+
+    overdue = Sale.objects.filter(payment_status='Overdue').aggregate(
+        count=Count('pk'), value=Sum(SALE_VALUE),
+    )
+    result = {
+        'marked': marked,
+        'overdue': overdue['count'],
+        'overdue_value': overdue['value'] or 0,
+        'as_of': today,
+    }
+    audit_log(
+        user=None,
+        action='UPDATE',
+        module='MARKETING',
+        object_type='Sale',
+        description=f"Overdue sweep: marked {marked} sale(s), {overdue['count']} overdue in total",
+        new_values=result,
+    )
+    return result
@@ -1,12 +1,16 @@
 # cornelsimba/marketing/views.py
+from django.template.response import TemplateResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Count, Q
+from django.db.models import Count, Q
 from django.db import transaction
 from functools import wraps
 from datetime import date, timedelta
 from .models import Customer, Contract, Sale
+from .analytics import breakdown, monthly_series, sales_totals
+from .overdue import payment_status_breakdown
+from core.cache import cached_report
 from .forms import CustomerForm, ContractForm, SaleForm
 
 # Helper function to restrict access by group
@@ -46,11 +50,8 @@ def marketing_dashboard(request):
         status='Active'
     ).order_by('end_date')[:5]
     
-    # Sales by status
-    sales_by_status = Sale.objects.values('payment_status').annotate(
-        count=Count('id'),
-        total=Sum('total_price')
-    ).order_by('-total')
+    # Sales by status as of today (overdue even if the nightly sweep has not run yet)
+    sales_by_status = payment_status_breakdown()
     
     context = {
         # Statistics
@@ -73,7 +74,11 @@ def marketing_dashboard(request):
 @login_required
 @group_required('Marketing')
 def client_list(request):
-    clients = Customer.objects.all().order_by('name')
+    # Contract totals are stored on the customer; active contracts are counted in the same query
+    today = date.today()
+    clients = Customer.objects.annotate(
+        active_contracts=Count('contracts', filter=Q(contracts__end_date__gte=today)),
+    ).order_by('name')
     
     # Filters
     client_type = request.GET.get('type')
@@ -285,52 +290,35 @@ def sale_update(request, pk):
 
 @login_required
 @group_required('Marketing')
+@cached_report('marketing.Sale')
 def sales_report(request):
     """Sales performance reports"""
-    # Time periods
+    # Time periods: ?year=2025 or ?start_year=2023&end_year=2025
     current_year = date.today().year
-    
-    # Sales by status
-    sales_by_status = Sale.objects.values('payment_status').annotate(
-        count=Count('id'),
-        total_value=Sum('total_price')
-    ).order_by('-total_value')
-    
-    # Sales by type
-    sales_by_type = Sale.objects.values('sale_type').annotate(
-        count=Count('id'),
-        total_value=Sum('total_price')
-    ).order_by('-total_value')
-    
-    # Monthly sales
-    monthly_sales = []
-    for month in range(1, 13):
-        total = Sale.objects.filter(
-            sale_date__year=current_year,
-            sale_date__month=month
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-        
-        monthly_sales.append({
-            'month': date(2000, month, 1).strftime('%B'),
-            'total': total
-        })
-    
-    # Top sales people
-    top_salespeople = Sale.objects.values('sales_person__full_name').annotate(
-        total_sales=Sum('total_price'),
-        sale_count=Count('id')
-    ).order_by('-total_sales')[:10]
+    try:
+        start_year = int(request.GET.get('start_year') or request.GET.get('year') or current_year)
+        end_year = int(request.GET.get('end_year') or start_year)
+    except ValueError:
+        start_year = end_year = current_year
+    if end_year < start_year:
+        start_year, end_year = end_year, start_year
+    
+    # Monthly sales for the whole range in one grouped query
+    monthly_sales = monthly_series(start_year, end_year)
+    totals = sales_totals()
     
     context = {
         'current_year': current_year,
-        'sales_by_status': sales_by_status,
-        'sales_by_type': sales_by_type,
+        'start_year': start_year,
+        'end_year': end_year,
+        'sales_by_status': payment_status_breakdown(),
+        'sales_by_type': breakdown('sale_type'),
         'monthly_sales': monthly_sales,
-        'top_salespeople': top_salespeople,
-        'total_sales': Sale.objects.count(),
-        'total_sales_value': Sale.objects.aggregate(total=Sum('total_price'))['total'] or 0,
+        'top_salespeople': breakdown('sales_person__full_name', limit=10),
+        'total_sales': totals['count'],
+        'total_sales_value': totals['total_value'],
     }
-    return render(request, 'marketing/sales_report.html', context)
+    return TemplateResponse(request, 'marketing/sales_report.html', context)
 
 
 # Remove all lead-related functions since you don't have a Lead model
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Supplier, PurchaseOrder, PurchaseOrderItem
+from .totals import save_lines
 
 @admin.register(Supplier)
 class SupplierAdmin(admin.ModelAdmin):
@@ -34,4 +35,12 @@ class PurchaseOrderAdmin(admin.ModelAdmin):
         ('Dates', {
             'fields': ('order_date', 'expected_delivery', 'created_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+
+    def save_formset(self, request, form, formset, change):
+        if formset.model is PurchaseOrderItem:
+            lines = formset.save(commit=False)
+            save_lines(form.instance, lines, formset.deleted_objects)
+            formset.save_m2m()
+        else:
+            super().save_formset(request, form, formset, change)
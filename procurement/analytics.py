@@ -0,0 +1,170 @@
+# cornelsimba/procurement/analytics.py
+"""
+Supplier performance.
+
+A purchase order is received when inventory books its goods in
+(inventory/events.py links each StockIn to the PO). From that:
+
+- lead time: days from order_date to the first StockIn of the PO
+- on-time: first StockIn on or before expected_delivery (POs without an
+  expected date are left out of the rate)
+- fill rate: quantity received / quantity ordered on delivered POs
+
+purchase_order_deliveries() annotates each PO with those figures through
+correlated subqueries; supplier_performance() groups them by supplier in
+one query. rebuild_supplier_performance() stores the result in
+SupplierPerformance (run nightly by `rebuild_supplier_performance`), which
+the supplier list and detail pages read.
+
+price_history() lists an item's purchase prices with the previous price
+(Lag window per item), so price trends come from one query.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Avg, Count, DecimalField, DurationField, ExpressionWrapper, F, IntegerField, Max, Min, OuterRef, Q,
+    Subquery, Sum, Value, Window,
+)
+from django.db.models.functions import Coalesce, Lag, TruncDate
+
+from inventory.models import StockIn
+
+from .models import PurchaseOrder, PurchaseOrderItem, Supplier, SupplierPerformance
+
+ZERO = Decimal('0')
+LEAD_TIME = ExpressionWrapper(F('received_on') - F('order_date'), output_field=DurationField())
+
+
+def purchase_order_deliveries(purchase_orders=None):
+    """
+    POs annotated with received_on (date of first StockIn, None if not
+    received), received_quantity and ordered_quantity.
+    """
+    purchase_orders = PurchaseOrder.objects.all() if purchase_orders is None else purchase_orders
+    receipts = StockIn.objects.filter(purchase_order=OuterRef('pk')).order_by().values('purchase_order')
+    lines = PurchaseOrderItem.objects.filter(purchase_order=OuterRef('pk')).order_by().values('purchase_order')
+    return purchase_orders.annotate(
+        received_on=Subquery(receipts.annotate(first=Min(TruncDate('date'))).values('first')[:1]),
+        received_quantity=Coalesce(
+            Subquery(receipts.annotate(total=Sum('quantity')).values('total')[:1]),
+            Value(ZERO),
+            output_field=DecimalField(max_digits=17, decimal_places=3),
+        ),
+        ordered_quantity=Coalesce(
+            Subquery(lines.annotate(total=Sum('quantity')).values('total')[:1]),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+    )
+
+
+def supplier_performance(supplier_ids=None):
+    """
+    {supplier_id: figures} for every supplier with purchase orders, from one
+    grouped query. Lead times come back as timedeltas.
+    """
+    purchase_orders = PurchaseOrder.objects.exclude(status='Cancelled')
+    if supplier_ids is not None:
+        purchase_orders = purchase_orders.filter(supplier_id__in=list(supplier_ids))
+    received = Q(received_on__isnull=False)
+    rows = purchase_order_deliveries(purchase_orders).order_by().values('supplier_id').annotate(
+        order_count=Count('pk'),
+        delivered_count=Count('pk', filter=received),
+        with_due_date_count=Count('pk', filter=received & Q(expected_delivery__isnull=False)),
+        on_time_count=Count('pk', filter=received & Q(received_on__lte=F('expected_delivery'))),
+        avg_lead=Avg(LEAD_TIME, filter=received),
+        max_lead=Max(LEAD_TIME, filter=received),
+        delivered_ordered_quantity=Sum('ordered_quantity', filter=received),
+        delivered_received_quantity=Sum('received_quantity', filter=received),
+        total_spend=Sum('total_amount'),
+        last_order_date=Max('order_date'),
+        last_delivery_date=Max('received_on'),
+    )
+    return {row['supplier_id']: row for row in rows}
+
+
+def _days(duration):
+    if duration is None:
+        return None
+    return Decimal(duration.total_seconds() / 86400).quantize(Decimal('0.1'))
+
+
+@transaction.atomic
+def rebuild_supplier_performance(supplier_ids=None):
+    """Recompute SupplierPerformance for the given suppliers (all by default). Returns the row count."""
+    figures = supplier_performance(supplier_ids)
+    if supplier_ids is None:
+        supplier_ids = Supplier.objects.values_list('pk', flat=True)
+
+    rows = []
+    for supplier_id in supplier_ids:
+        row = figures.get(supplier_id, {})
+        max_lead = _days(row.get('max_lead'))
+        rows.append(SupplierPerformance(
+            supplier_id=supplier_id,
+            order_count=row.get('order_count', 0),
+            delivered_count=row.get('delivered_count', 0),
+            on_time_count=row.get('on_time_count', 0),
+            with_due_date_count=row.get('with_due_date_count', 0),
+            avg_lead_days=_days(row.get('avg_lead')),
+            max_lead_days=int(max_lead) if max_lead is not None else None,
+            ordered_quantity=row.get('delivered_ordered_quantity') or 0,
+            received_quantity=row.get('delivered_received_quantity') or ZERO,
+            total_spend=row.get('total_spend') or ZERO,
+            last_order_date=row.get('last_order_date'),
+            last_delivery_date=row.get('last_delivery_date'),
+        ))
+    SupplierPerformance.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['supplier'],
+        update_fields=[
+            'order_count', 'delivered_count', 'on_time_count', 'with_due_date_count',
+            'avg_lead_days', 'max_lead_days', 'ordered_quantity', 'received_quantity',
+            'total_spend', 'last_order_date', 'last_delivery_date', 'updated_at',
+        ],
+        batch_size=1000,
+    )
+    return len(rows)
+
+
+def price_history(item_id=None, supplier_id=None, limit=None):
+    """
+    Purchase prices newest first, each with the previous price paid for the
+    same item (from any supplier) and the change in percent.
+    """
+    lines = PurchaseOrderItem.objects.exclude(purchase_order__status='Cancelled').annotate(
+        order_date=F('purchase_order__order_date'),
+        supplier_name=F('purchase_order__supplier__name'),
+        supplier_id=F('purchase_order__supplier_id'),
+        previous_price=Window(
+            Lag('unit_price'),
+            partition_by=[F('item_id')],
+            order_by=[F('purchase_order__order_date').asc(), F('pk').asc()],
+        ),
+    )
+    if item_id is not None:
+        lines = lines.filter(item_id=item_id)
+    if supplier_id is not None:
+        # Only the items this supplier sells, but every purchase of them
+        lines = lines.filter(item_id__in=PurchaseOrderItem.objects.filter(
+            purchase_order__supplier_id=supplier_id,
+        ).values('item_id'))
+    rows = lines.order_by('-purchase_order__order_date', '-pk').values(
+        'item_id', 'item__name', 'supplier_id', 'supplier_name', 'order_date',
+        'quantity', 'unit_price', 'previous_price', 'purchase_order__po_number',
+    )
+    history = []
+    for row in rows:
+        # Other suppliers' rows were only needed for previous_price
+        if supplier_id is not None and row['supplier_id'] != supplier_id:
+            continue
+        previous = row['previous_price']
+        row['change_pct'] = (
+            round(100 * (row['unit_price'] - previous) / previous, 1) if previous else None
+        )
+        history.append(row)
+        if limit and len(history) == limit:
+            break
+    return history
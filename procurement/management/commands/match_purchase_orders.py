@@ -0,0 +1,29 @@
+# procurement/management/commands/match_purchase_orders.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from procurement.matching import match_purchase_orders, open_purchase_orders
+from procurement.models import PurchaseOrder
+
+
+class Command(BaseCommand):
+    help = 'Three-way match open purchase orders against receipts and expenses (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Re-match every non-draft PO, including already matched ones')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['all']:
+            purchase_orders = PurchaseOrder.objects.exclude(status__in=['Draft', 'Cancelled'])
+        else:
+            purchase_orders = open_purchase_orders()
+        counts = match_purchase_orders(purchase_orders)
+        labels = dict(PurchaseOrder.MATCH_STATUS_CHOICES)
+        for status, count in sorted(counts.items()):
+            self.stdout.write(f"{labels.get(status, status)}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Matched {sum(counts.values())} purchase orders in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,17 @@
+# procurement/management/commands/rebuild_supplier_performance.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from procurement.analytics import rebuild_supplier_performance
+
+
+class Command(BaseCommand):
+    help = 'Recompute supplier lead time, on-time and fill rate summaries (run nightly)'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        suppliers = rebuild_supplier_performance()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt performance for {suppliers} suppliers in {time.monotonic() - started:.1f}s"
+        ))
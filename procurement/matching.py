@@ -0,0 +1,155 @@
+# cornelsimba/procurement/matching.py
+"""
+Three-way match: purchase order lines vs goods received vs expense booked.
+
+match_purchase_orders() evaluates a whole set of POs with three grouped
+queries (ordered quantity and value per PO and item, received quantity per
+PO and item from StockIn.purchase_order, expense total per PO), decides a
+status per PO in Python and writes them back with one bulk_update:
+
+- awaiting_receipt   nothing received yet
+- quantity_variance  an item's received quantity is off the ordered one by
+                     more than PROCUREMENT_MATCH_QTY_TOLERANCE (percent)
+- awaiting_expense   received within tolerance, no expense booked yet
+- price_variance     the expense differs from the received value at PO
+                     prices by more than PROCUREMENT_MATCH_PRICE_TOLERANCE
+                     (percent)
+- matched            all three agree
+
+The result is stored on PurchaseOrder (match_status, quantity_variance,
+amount_variance, match_notes, match_checked_at) and lists filter on the
+indexed match_status. Open POs (approved, ordered or delivered and not yet
+matched) are re-evaluated by `match_purchase_orders`; a PO is also matched
+again (rematch_purchase_orders(), matched or not) as soon as its goods are
+received or one of its expenses is booked, edited or moved to another PO.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from inventory.models import StockIn
+
+from .models import PurchaseOrder, PurchaseOrderItem
+
+QTY_TOLERANCE = Decimal(str(getattr(settings, 'PROCUREMENT_MATCH_QTY_TOLERANCE', 0)))
+PRICE_TOLERANCE = Decimal(str(getattr(settings, 'PROCUREMENT_MATCH_PRICE_TOLERANCE', 2)))
+
+OPEN_STATUSES = ('Approved', 'Ordered', 'Delivered')
+ZERO = Decimal('0')
+BATCH_SIZE = 1000
+
+
+def open_purchase_orders():
+    """POs still waiting on goods or an expense to match"""
+    return PurchaseOrder.objects.filter(status__in=OPEN_STATUSES).exclude(match_status='matched')
+
+
+def rematch_purchase_orders(*purchase_order_ids):
+    """Match these POs again after their receipts or expenses changed (None ids are skipped)"""
+    ids = {pk for pk in purchase_order_ids if pk}
+    if not ids:
+        return {}
+    return match_purchase_orders(PurchaseOrder.objects.filter(pk__in=ids))
+
+
+def _over(difference, base, tolerance_pct):
+    if not base:
+        return bool(difference)
+    return abs(difference) * 100 / base > tolerance_pct
+
+
+def evaluate(ordered, received, expense_total, item_names=None):
+    """
+    Match one PO. `ordered` is {item_id: (quantity, value)}, `received`
+    {item_id: quantity}, `expense_total` None when there is no expense.
+    Returns (status, quantity_variance, amount_variance, notes).
+    """
+    item_names = item_names or {}
+    notes = []
+    quantity_variance = ZERO
+    received_value = ZERO
+    quantity_ok = True
+    for item_id in set(ordered) | set(received):
+        quantity, value = ordered.get(item_id, (0, ZERO))
+        got = received.get(item_id, ZERO)
+        difference = got - quantity
+        quantity_variance += difference
+        if quantity:
+            received_value += value * got / quantity
+        if _over(difference, quantity, QTY_TOLERANCE):
+            quantity_ok = False
+            name = item_names.get(item_id, f"item #{item_id}")
+            notes.append(f"{name}: ordered {quantity}, received {got.normalize():f}")
+
+    if not received:
+        return 'awaiting_receipt', quantity_variance, ZERO, ''
+    if not quantity_ok:
+        return 'quantity_variance', quantity_variance, ZERO, '; '.join(notes)
+    if expense_total is None:
+        return 'awaiting_expense', quantity_variance, ZERO, ''
+
+    received_value = received_value.quantize(Decimal('0.01'))
+    amount_variance = expense_total - received_value
+    if _over(amount_variance, received_value, PRICE_TOLERANCE):
+        notes.append(f"expense Tsh {expense_total:,.2f} vs received value Tsh {received_value:,.2f}")
+        return 'price_variance', quantity_variance, amount_variance, '; '.join(notes)
+    return 'matched', quantity_variance, amount_variance, ''
+
+
+@transaction.atomic
+def match_purchase_orders(purchase_orders=None):
+    """
+    Match a queryset of POs (open_purchase_orders() by default) and store
+    the results. Returns {match_status: count}.
+    """
+    from finance.models import Expense
+
+    purchase_orders = open_purchase_orders() if purchase_orders is None else purchase_orders
+    pos = list(purchase_orders.only('pk', 'match_status'))
+    if not pos:
+        return {}
+    po_ids = [po.pk for po in pos]
+
+    ordered = defaultdict(dict)
+    item_names = {}
+    for row in PurchaseOrderItem.objects.filter(purchase_order_id__in=po_ids).order_by().values(
+        'purchase_order_id', 'item_id', 'item__name',
+    ).annotate(quantity=Sum('quantity'), value=Sum('total_price')):
+        ordered[row['purchase_order_id']][row['item_id']] = (row['quantity'], row['value'])
+        item_names[row['item_id']] = row['item__name']
+
+    received = defaultdict(dict)
+    for row in StockIn.objects.filter(purchase_order_id__in=po_ids).order_by().values(
+        'purchase_order_id', 'item_id',
+    ).annotate(quantity=Sum('quantity')):
+        received[row['purchase_order_id']][row['item_id']] = row['quantity']
+
+    expenses = dict(
+        Expense.objects.filter(purchase_order_id__in=po_ids).order_by().values(
+            'purchase_order_id',
+        ).annotate(total=Sum('amount')).values_list('purchase_order_id', 'total')
+    )
+
+    now = timezone.now()
+    counts = defaultdict(int)
+    for po in pos:
+        status, quantity_variance, amount_variance, notes = evaluate(
+            ordered.get(po.pk, {}), received.get(po.pk, {}), expenses.get(po.pk), item_names,
+        )
+        po.match_status = status
+        po.quantity_variance = quantity_variance
+        po.amount_variance = amount_variance
+        po.match_notes = notes
+        po.match_checked_at = now
+        counts[status] += 1
+
+    PurchaseOrder.objects.bulk_update(
+        pos,
+        ['match_status', 'quantity_variance', 'amount_variance', 'match_notes', 'match_checked_at'],
+        batch_size=BATCH_SIZE,
+    )
+    return dict(counts)
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 00:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0002_alter_purchaseorder_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierPerformance',
+            fields=[
+                ('supplier', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='performance', serialize=False, to='procurement.supplier')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('delivered_count', models.PositiveIntegerField(default=0)),
+                ('on_time_count', models.PositiveIntegerField(default=0)),
+                ('with_due_date_count', models.PositiveIntegerField(default=0)),
+                ('avg_lead_days', models.DecimalField(blank=True, decimal_places=1, max_digits=7, null=True)),
+                ('max_lead_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('ordered_quantity', models.PositiveIntegerField(default=0)),
+                ('received_quantity', models.DecimalField(decimal_places=3, default=0, max_digits=17)),
+                ('total_spend', models.DecimalField(decimal_places=2, default=0, max_digits=17)),
+                ('last_order_date', models.DateField(blank=True, null=True)),
+                ('last_delivery_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['avg_lead_days'], name='procurement_avg_lea_8e693b_idx'), models.Index(fields=['-total_spend'], name='procurement_total_s_e8295b_idx')],
+            },
+        ),
+    ]
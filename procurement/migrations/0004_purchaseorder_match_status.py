@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-19 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0003_supplierperformance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='amount_variance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=17),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='match_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='match_notes',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='match_status',
+            field=models.CharField(choices=[('unchecked', 'Not Checked'), ('awaiting_receipt', 'Awaiting Receipt'), ('awaiting_expense', 'Awaiting Expense'), ('matched', 'Matched'), ('quantity_variance', 'Quantity Variance'), ('price_variance', 'Price Variance')], default='unchecked', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='quantity_variance',
+            field=models.DecimalField(decimal_places=3, default=0, max_digits=15),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['match_status', '-order_date'], name='po_match_status_idx'),
+        ),
+    ]
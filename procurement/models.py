@@ -1,9 +1,10 @@
 from django.db import models
+from django.db.models import Q
 from inventory.models import Item
 from hr.models import Employee
 from django.core.validators import MinValueValidator
 from decimal import Decimal
-from datetime import datetime
+from core.sequences import daily_number
 
 class Supplier(models.Model):
     name = models.CharField(max_length=100)
@@ -24,7 +25,25 @@ class Supplier(models.Model):
         ordering = ['name']
 
 
+# Query form of PurchaseOrder.finance_ready, for filtering in the database
+FINANCE_READY = (
+    Q(department__gt='')
+    & (Q(cost_center__gt='') | Q(budget_code__gt=''))
+    & Q(total_amount__gt=0)
+    & Q(status__in=['Approved', 'Delivered'])
+)
+
+
 class PurchaseOrder(models.Model):
+    MATCH_STATUS_CHOICES = [
+        ('unchecked', 'Not Checked'),
+        ('awaiting_receipt', 'Awaiting Receipt'),
+        ('awaiting_expense', 'Awaiting Expense'),
+        ('matched', 'Matched'),
+        ('quantity_variance', 'Quantity Variance'),
+        ('price_variance', 'Price Variance'),
+    ]
+
     STATUS_CHOICES = [
         ('Draft', 'Draft'),
         ('Pending', 'Pending Approval'),
@@ -63,6 +82,13 @@ class PurchaseOrder(models.Model):
     expected_delivery = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Draft')
     notes = models.TextField(blank=True, null=True, default='')
+
+    # Three-way match against receipts and expenses (procurement/matching.py)
+    match_status = models.CharField(max_length=20, choices=MATCH_STATUS_CHOICES, default='unchecked')
+    quantity_variance = models.DecimalField(max_digits=15, decimal_places=3, default=0)
+    amount_variance = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    match_notes = models.TextField(blank=True, default='')
+    match_checked_at = models.DateTimeField(null=True, blank=True)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)  # Make nullable
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)  # Make nullable
@@ -70,23 +96,21 @@ class PurchaseOrder(models.Model):
     def save(self, *args, **kwargs):
         if not self.po_number:
             # Generate PO number: PO-YYYYMMDD-XXXX
-            date_part = datetime.now().strftime('%Y%m%d')
-            last_po = PurchaseOrder.objects.filter(po_number__contains=date_part).count()
-            self.po_number = f"PO-{date_part}-{last_po + 1:04d}"
+            self.po_number = daily_number('PO', PurchaseOrder, 'po_number')
         
         # Auto-populate department from requested_by employee
         if self.requested_by and not self.department:
             self.department = self.requested_by.department
         
+        # total_amount is maintained from the lines (procurement/totals.py);
+        # never write back a possibly stale in-memory value on a full save
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'total_amount' and field.attname not in deferred
+            ]
         super().save(*args, **kwargs)
-        
-        # Calculate total amount after saving
-        if self.pk:
-            total = sum(item.total_price for item in self.items.all())
-            if total != self.total_amount:
-                self.total_amount = total
-                # Save again to update total_amount
-                super().save(update_fields=['total_amount'])
 
     def __str__(self):
         po_num = self.po_number or f"PO-{self.id}"
@@ -104,6 +128,9 @@ class PurchaseOrder(models.Model):
     
     class Meta:
         ordering = ['-order_date']
+        indexes = [
+            models.Index(fields=['match_status', '-order_date'], name='po_match_status_idx'),
+        ]
 
 
 class PurchaseOrderItem(models.Model):
@@ -118,11 +145,70 @@ class PurchaseOrderItem(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)  # Remove editable=False for now
     
     def save(self, *args, **kwargs):
-        self.total_price = self.quantity * self.unit_price
+        from .totals import price_line, recalculate_total
+
+        price_line(self)
         super().save(*args, **kwargs)
+        recalculate_total(self.purchase_order)
+
+    def delete(self, *args, **kwargs):
+        from .totals import recalculate_total
+
+        purchase_order = self.purchase_order
+        result = super().delete(*args, **kwargs)
+        recalculate_total(purchase_order)
+        return result
     
     def __str__(self):
         return f"{self.item.name} - {self.quantity} x {self.unit_price}"
     
     class Meta:
-        ordering = ['item__name']
\ No newline at end of file
+        ordering = ['item__name']
+
+class SupplierPerformance(models.Model):
+    """
+    Nightly delivery and price summary per supplier (procurement/analytics.py),
+    so the supplier list reads one joined row instead of scanning every PO.
+    """
+    supplier = models.OneToOneField(
+        Supplier,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='performance'
+    )
+    order_count = models.PositiveIntegerField(default=0)
+    delivered_count = models.PositiveIntegerField(default=0)
+    on_time_count = models.PositiveIntegerField(default=0)
+    # Deliveries that had an expected date to be on time against
+    with_due_date_count = models.PositiveIntegerField(default=0)
+    avg_lead_days = models.DecimalField(max_digits=7, decimal_places=1, null=True, blank=True)
+    max_lead_days = models.PositiveIntegerField(null=True, blank=True)
+    ordered_quantity = models.PositiveIntegerField(default=0)
+    received_quantity = models.DecimalField(max_digits=17, decimal_places=3, default=0)
+    total_spend = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    last_order_date = models.DateField(null=True, blank=True)
+    last_delivery_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def on_time_rate(self):
+        """Percentage of dated deliveries received by the expected date"""
+        if not self.with_due_date_count:
+            return None
+        return round(100 * self.on_time_count / self.with_due_date_count, 1)
+
+    @property
+    def fill_rate(self):
+        """Percentage of the quantity ordered on delivered POs that was received"""
+        if not self.ordered_quantity:
+            return None
+        return round(100 * float(self.received_quantity) / self.ordered_quantity, 1)
+
+    def __str__(self):
+        return f"{self.supplier.name} performance"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['avg_lead_days']),
+            models.Index(fields=['-total_spend']),
+        ]
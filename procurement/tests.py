@@ -1,3 +1,30 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from inventory.models import Item
+
+from .models import PurchaseOrder, PurchaseOrderItem, Supplier
+
+
+class PurchaseOrderTotalTests(TestCase):
+    """total_amount is kept from the lines, not from the header"""
+
+    def test_saving_a_stale_header_keeps_the_total(self):
+        supplier = Supplier.objects.create(
+            name='Mill Supplies', contact_person='Asha', phone='0700000000',
+            email='mill@example.com', address='Dar es Salaam',
+        )
+        purchase_order = PurchaseOrder.objects.create(supplier=supplier)
+        stale = PurchaseOrder.objects.get(pk=purchase_order.pk)
+
+        PurchaseOrderItem.objects.create(
+            purchase_order=purchase_order, item=Item.objects.create(name='Maize'),
+            quantity=Decimal('4'), unit_price=Decimal('250'),
+        )
+        stale.notes = 'Deliver to the mill'
+        stale.save()
+
+        purchase_order.refresh_from_db()
+        self.assertEqual(purchase_order.total_amount, Decimal('1000.00'))
+        self.assertEqual(purchase_order.notes, 'Deliver to the mill')
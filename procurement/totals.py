@@ -0,0 +1,69 @@
+# cornelsimba/procurement/totals.py
+"""
+Purchase order totals.
+
+PurchaseOrder.total_amount is the sum of its lines' total_price. It is set
+by recalculate_total() with one UPDATE ... SET total_amount = (SELECT SUM)
+whenever lines change: PurchaseOrderItem.save()/delete() call it for
+single-line edits, and save_lines() writes a whole line set with one
+bulk_create, one bulk_update and one DELETE before updating the header
+once, so editing a large PO costs the same handful of queries as a small
+one. Saving the header itself never touches the total.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+LINE_FIELDS = ['item', 'quantity', 'unit_price', 'total_price']
+
+
+def price_line(line):
+    """Set total_price on a PurchaseOrderItem (no save)"""
+    line.total_price = Decimal(line.quantity or 0) * Decimal(str(line.unit_price or 0))
+    return line
+
+
+def recalculate_total(purchase_order):
+    """Recompute total_amount in the database (one UPDATE) and on the instance (one read)"""
+    from .models import PurchaseOrder, PurchaseOrderItem
+
+    lines = PurchaseOrderItem.objects.filter(purchase_order=OuterRef('pk')).order_by().values('purchase_order')
+    PurchaseOrder.objects.filter(pk=purchase_order.pk).update(
+        total_amount=Coalesce(
+            Subquery(lines.annotate(total=Sum('total_price')).values('total')[:1]),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+    )
+    purchase_order.total_amount = PurchaseOrder.objects.values_list('total_amount', flat=True).get(pk=purchase_order.pk)
+    return purchase_order.total_amount
+
+
+@transaction.atomic
+def save_lines(purchase_order, lines, deleted=(), batch_size=500):
+    """
+    Save a purchase order's edited line set and update its total once.
+
+    `lines` are PurchaseOrderItem instances (new ones without pk are
+    inserted, the rest updated); `deleted` are lines to remove. Formsets
+    give both: save(commit=False) and .deleted_objects.
+    """
+    from .models import PurchaseOrderItem
+
+    new, existing = [], []
+    for line in lines:
+        line.purchase_order = purchase_order
+        price_line(line)
+        (existing if line.pk else new).append(line)
+
+    if new:
+        PurchaseOrderItem.objects.bulk_create(new, batch_size=batch_size)
+    if existing:
+        PurchaseOrderItem.objects.bulk_update(existing, LINE_FIELDS, batch_size=batch_size)
+    deleted_ids = [line.pk for line in deleted if line.pk]
+    if deleted_ids:
+        PurchaseOrderItem.objects.filter(purchase_order=purchase_order, pk__in=deleted_ids).delete()
+
+    return recalculate_total(purchase_order)
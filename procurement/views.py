@@ -4,13 +4,16 @@ from django.contrib import messages
 from django.db import transaction
 from functools import wraps
 from datetime import datetime
-from .models import Supplier, PurchaseOrder, PurchaseOrderItem
+from .models import FINANCE_READY, Supplier, PurchaseOrder, PurchaseOrderItem, SupplierPerformance
 from .forms import SupplierForm, PurchaseOrderForm, PurchaseOrderItemFormSet
+from .totals import save_lines
+from .analytics import price_history
 from hr.models import Employee
-from inventory.models import StockIn, Item
+from inventory.models import Item
 from audit.utils import audit_log
+from core.bus import publish, dispatch_after_commit
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
+from django.db.models import Count, Q, Sum
 
 # Helper function to restrict access by group
 def group_required(group_name):
@@ -53,7 +56,8 @@ def procurement_dashboard(request):
 @login_required
 @group_required('Procurement')
 def supplier_list(request):
-    suppliers_list = Supplier.objects.all().order_by('name')
+    # Performance figures come from the nightly summary (procurement/analytics.py)
+    suppliers_list = Supplier.objects.select_related('performance').order_by('name')
     
     # Pagination
     paginator = Paginator(suppliers_list, 10)  # Show 10 suppliers per page
@@ -92,6 +96,8 @@ def supplier_detail(request, pk):
     context = {
         'supplier': supplier,
         'purchase_orders': purchase_orders,
+        'performance': SupplierPerformance.objects.filter(supplier=supplier).first(),
+        'price_history': price_history(supplier_id=supplier.pk, limit=20),
     }
     return render(request, 'procurement/supplier_detail.html', context)
 
@@ -163,6 +169,11 @@ def purchase_order_list(request):
     status_filter = request.GET.get('status')
     if status_filter:
         purchase_orders_list = purchase_orders_list.filter(status=status_filter)
+
+    # Filter by three-way match result (procurement/matching.py)
+    match_filter = request.GET.get('match')
+    if match_filter:
+        purchase_orders_list = purchase_orders_list.filter(match_status=match_filter)
     
     # Search functionality
     search_query = request.GET.get('search')
@@ -172,10 +183,12 @@ def purchase_order_list(request):
             Q(supplier__name__icontains=search_query)
         )
     
-    # Calculate stats
-    total_value = sum(po.total_amount for po in purchase_orders_list)
-    approved_count = purchase_orders_list.filter(status='Approved').count()
-    pending_count = purchase_orders_list.filter(status='Pending').count()
+    # Calculate stats in one query
+    stats = purchase_orders_list.aggregate(
+        total_value=Sum('total_amount'),
+        approved_count=Count('pk', filter=Q(status='Approved')),
+        pending_count=Count('pk', filter=Q(status='Pending')),
+    )
     
     # Pagination
     paginator = Paginator(purchase_orders_list, 20)
@@ -191,9 +204,10 @@ def purchase_order_list(request):
     return render(request, 'procurement/purchase_order_list.html', {
         'purchase_orders': purchase_orders,
         'status_choices': PurchaseOrder.STATUS_CHOICES,
-        'total_value': total_value,
-        'approved_count': approved_count,
-        'pending_count': pending_count,
+        'match_choices': PurchaseOrder.MATCH_STATUS_CHOICES,
+        'total_value': stats['total_value'] or 0,
+        'approved_count': stats['approved_count'],
+        'pending_count': stats['pending_count'],
     })
 
 @login_required
@@ -232,11 +246,8 @@ def purchase_order_create(request):
             
             purchase_order.save()
             
-            # Save formset
-            items = formset.save(commit=False)
-            for item in items:
-                item.purchase_order = purchase_order
-                item.save()
+            # Save the lines in bulk; the total is updated once
+            save_lines(purchase_order, formset.save(commit=False))
             
             # 🔴 AUDIT ADD - After this line
             audit_log(
@@ -278,7 +289,8 @@ def purchase_order_update(request, pk):
         
         if form.is_valid() and formset.is_valid():
             purchase_order = form.save()
-            formset.save()
+            lines = formset.save(commit=False)
+            save_lines(purchase_order, lines, formset.deleted_objects)
             
             # 🔴 AUDIT ADD - After this line
             audit_log(
@@ -349,22 +361,16 @@ def mark_delivered(request, order_id):
         messages.error(request, 'Only approved orders can be marked as delivered.')
         return redirect('procurement:dashboard')
     
-    # FIXED: Create stock entries for each item WITH PROPER LINK
-    for item in purchase_order.items.all():
-        StockIn.objects.create(
-            item=item.item,
-            quantity=item.quantity,
-            supplier=purchase_order.supplier.name,
-            reference=f"PO-{purchase_order.po_number}",
-            purchase_order=purchase_order,  # FIXED: Link to PO
-            source='Purchase',
-            status='approved',
-            received_by=request.user.get_full_name() or request.user.username
-        )
-    
     purchase_order.status = 'Delivered'
     purchase_order.save()
     
+    # Inventory receives the goods through the outbox (inventory/events.py)
+    event = publish('procurement.purchase_order.delivered', {
+        'purchase_order_id': purchase_order.id,
+        'user_id': request.user.id,
+    })
+    dispatch_after_commit(event)
+    
     # 🔴 AUDIT ADD - After this line
     audit_log(
         user=request.user,
@@ -376,18 +382,6 @@ def mark_delivered(request, order_id):
         request=request
     )
     
-    # 🔴 AUDIT ADD - For each stock in created
-    for item in purchase_order.items.all():
-        audit_log(
-            user=request.user,
-            action='CREATE',
-            module='INVENTORY',
-            object_type='StockIn',
-            object_id=item.id,
-            description=f'Stock In from PO {purchase_order.po_number}: {item.quantity} {item.item.unit_of_measure} of "{item.item.name}"',
-            request=request
-        )
-    
     messages.success(request, f'Purchase Order {purchase_order.po_number} marked as delivered and stock updated!')
     return redirect('procurement:dashboard')
 
@@ -436,9 +430,9 @@ def finance_purchase_orders(request):
     # Filter by finance status
     finance_status = request.GET.get('finance_status')
     if finance_status == 'ready':
-        delivered_pos = delivered_pos.filter(finance_ready=True)
+        delivered_pos = delivered_pos.filter(FINANCE_READY)
     elif finance_status == 'not_ready':
-        delivered_pos = delivered_pos.filter(finance_ready=False)
+        delivered_pos = delivered_pos.exclude(FINANCE_READY)
     
     # Filter by amount range
     min_amount = request.GET.get('min_amount')
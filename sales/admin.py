@@ -1,7 +1,10 @@
 # cornelsimba/sales/admin.py
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Customer, Sale, SaleItem, Payment, SaleReturn
+from .models import Customer, CustomerMetrics, Sale, SaleItem, Payment, SalesExport, SaleReturn
+from inventory.reservations import release_for_sales
+from .analytics import sync_sales_facts
+from .receivables import refresh_customer_balances
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
@@ -89,12 +92,21 @@ class SaleAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Status'
     
     def mark_as_completed(self, request, queryset):
+        sale_ids = list(queryset.values_list('pk', flat=True))
+        customer_ids = set(queryset.values_list('customer_id', flat=True))
         updated = queryset.update(status='COMPLETED')
+        sync_sales_facts(sale_ids)
+        refresh_customer_balances(customer_ids)
         self.message_user(request, f'{updated} sale(s) marked as completed.')
     mark_as_completed.short_description = "Mark selected sales as completed"
     
     def mark_as_cancelled(self, request, queryset):
+        sale_ids = list(queryset.values_list('pk', flat=True))
+        release_for_sales(sale_ids)
+        customer_ids = set(queryset.values_list('customer_id', flat=True))
         updated = queryset.update(status='CANCELLED')
+        sync_sales_facts(sale_ids)
+        refresh_customer_balances(customer_ids)
         self.message_user(request, f'{updated} sale(s) marked as cancelled.')
     mark_as_cancelled.short_description = "Mark selected sales as cancelled"
 
@@ -156,6 +168,35 @@ class PaymentAdmin(admin.ModelAdmin):
     payment_status_badge.short_description = 'Status'
 
 
+@admin.register(CustomerMetrics)
+class CustomerMetricsAdmin(admin.ModelAdmin):
+    list_display = ['customer', 'lifetime_revenue_display', 'sale_count', 'last_sale_date', 'outstanding_display', 'open_sales', 'updated_at']
+    search_fields = ['customer__name']
+    readonly_fields = [
+        'customer', 'lifetime_revenue', 'sale_count', 'last_sale_date',
+        'outstanding', 'open_sales', 'oldest_open_date', 'updated_at',
+    ]
+    ordering = ['-lifetime_revenue']
+    
+    def lifetime_revenue_display(self, obj):
+        return obj.lifetime_revenue_display
+    lifetime_revenue_display.short_description = 'Lifetime Revenue'
+    
+    def outstanding_display(self, obj):
+        return obj.outstanding_display
+    outstanding_display.short_description = 'Outstanding'
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(SalesExport)
+class SalesExportAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'export_format', 'row_count', 'status', 'requested_by', 'finished_at']
+    list_filter = ['export_format', 'status']
+    readonly_fields = ['export_format', 'filters', 'status', 'row_count', 'file', 'requested_by', 'created_at', 'finished_at']
+
+
 @admin.register(SaleReturn)
 class SaleReturnAdmin(admin.ModelAdmin):
     list_display = ['return_number', 'original_sale', 'reason', 'refund_amount_display', 'refund_status_badge', 'created_at']
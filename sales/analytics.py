@@ -0,0 +1,180 @@
+# cornelsimba/sales/analytics.py
+"""
+Pre-aggregated sales facts for the dashboard and sales report.
+
+SalesDailyFact holds one row per day x customer x sale type for whole sales
+(item is NULL: sale_count and net revenue) and one row per day x customer x
+item x sale type for sale lines (sale_count of sales containing the item,
+quantity and line revenue). Only COMPLETED sales are counted.
+
+sync_sales_facts() is called wherever a sale's status changes. It adds
+completed sales that are not yet counted and takes out counted sales that
+are no longer completed, so calling it twice is harmless. Sale.in_sales_facts
+records which sales are in. `rebuild_sales_facts` recomputes everything
+(nightly safety net, or after bulk data fixes). Both refresh the lifetime
+customer metrics they affect (sales/metrics.py).
+
+Report queries read a few hundred rows per month of data instead of scanning
+sales and lines, so they stay fast over years of history.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from core.cache import bump_versions
+
+from .metrics import refresh_lifetime_metrics
+from .models import Customer, Sale, SaleItem, SalesDailyFact
+
+ZERO = Decimal('0')
+
+
+def _sale_rows(sales):
+    return sales.order_by().values('sale_date', 'customer_id', 'sale_type').annotate(
+        n=Count('pk'), amount=Sum('net_amount'),
+    )
+
+
+def _line_rows(lines):
+    return lines.order_by().values(
+        'sale__sale_date', 'sale__customer_id', 'item_id', 'sale__sale_type',
+    ).annotate(
+        n=Count('sale_id', distinct=True), qty=Sum('quantity'), amount=Sum('total_price'),
+    )
+
+
+def _deltas(sale_ids):
+    """{(day, customer_id, item_id, sale_type): [count, quantity, revenue]} for the given sales"""
+    deltas = defaultdict(lambda: [0, ZERO, ZERO])
+    for row in _sale_rows(Sale.objects.filter(pk__in=sale_ids)):
+        key = (row['sale_date'], row['customer_id'], None, row['sale_type'])
+        deltas[key][0] += row['n']
+        deltas[key][2] += row['amount'] or ZERO
+    for row in _line_rows(SaleItem.objects.filter(sale_id__in=sale_ids)):
+        key = (row['sale__sale_date'], row['sale__customer_id'], row['item_id'], row['sale__sale_type'])
+        deltas[key][0] += row['n']
+        deltas[key][1] += row['qty'] or ZERO
+        deltas[key][2] += row['amount'] or ZERO
+    return deltas
+
+
+def _apply(deltas, sign):
+    for (day, customer_id, item_id, sale_type), (count, quantity, revenue) in deltas.items():
+        rows = SalesDailyFact.objects.filter(
+            day=day, customer_id=customer_id, item_id=item_id, sale_type=sale_type,
+        )
+        changes = {
+            'sale_count': F('sale_count') + sign * count,
+            'quantity': F('quantity') + sign * quantity,
+            'revenue': F('revenue') + sign * revenue,
+        }
+        if rows.update(**changes) or sign < 0:
+            continue
+        try:
+            with transaction.atomic():
+                SalesDailyFact.objects.create(
+                    day=day, customer_id=customer_id, item_id=item_id, sale_type=sale_type,
+                    sale_count=count, quantity=quantity, revenue=revenue,
+                )
+        except IntegrityError:
+            # Created concurrently; add to it instead
+            rows.update(**changes)
+
+
+@transaction.atomic
+def sync_sales_facts(sale_ids):
+    """Bring the facts in line with the current status of the given sales"""
+    sale_ids = list(sale_ids)
+    if not sale_ids:
+        return 0
+    pending = Sale.objects.select_for_update().filter(pk__in=sale_ids).filter(
+        Q(status='COMPLETED', in_sales_facts=False) | (Q(in_sales_facts=True) & ~Q(status='COMPLETED'))
+    )
+    rows = list(pending.values_list('pk', 'status', 'customer_id'))
+    add = [pk for pk, status, customer_id in rows if status == 'COMPLETED']
+    remove = [pk for pk, status, customer_id in rows if status != 'COMPLETED']
+
+    if add:
+        _apply(_deltas(add), 1)
+        Sale.objects.filter(pk__in=add).update(in_sales_facts=True)
+    if remove:
+        _apply(_deltas(remove), -1)
+        Sale.objects.filter(pk__in=remove).update(in_sales_facts=False)
+        SalesDailyFact.objects.filter(sale_count__lte=0).delete()
+    refresh_lifetime_metrics({customer_id for pk, status, customer_id in rows})
+    bump_versions(SalesDailyFact, Sale)
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_sales_facts():
+    """Recompute the whole fact table from completed sales. Returns the row count."""
+    SalesDailyFact.objects.all().delete()
+    completed = Sale.objects.filter(status='COMPLETED')
+    facts = [
+        SalesDailyFact(
+            day=row['sale_date'], customer_id=row['customer_id'], item_id=None, sale_type=row['sale_type'],
+            sale_count=row['n'], quantity=ZERO, revenue=row['amount'] or ZERO,
+        )
+        for row in _sale_rows(completed).iterator()
+    ]
+    facts += [
+        SalesDailyFact(
+            day=row['sale__sale_date'], customer_id=row['sale__customer_id'], item_id=row['item_id'],
+            sale_type=row['sale__sale_type'], sale_count=row['n'], quantity=row['qty'] or ZERO,
+            revenue=row['amount'] or ZERO,
+        )
+        for row in _line_rows(SaleItem.objects.filter(sale__status='COMPLETED')).iterator()
+    ]
+    SalesDailyFact.objects.bulk_create(facts, batch_size=1000)
+    Sale.objects.exclude(status='COMPLETED').filter(in_sales_facts=True).update(in_sales_facts=False)
+    completed.filter(in_sales_facts=False).update(in_sales_facts=True)
+    refresh_lifetime_metrics(Customer.objects.values_list('pk', flat=True))
+    bump_versions(SalesDailyFact, Sale)
+    return len(facts)
+
+
+# Report queries -------------------------------------------------------------
+
+def sale_facts(start_date=None, end_date=None):
+    """Whole-sale rows (item is NULL) in the date range"""
+    facts = SalesDailyFact.objects.filter(item__isnull=True)
+    if start_date:
+        facts = facts.filter(day__gte=start_date)
+    if end_date:
+        facts = facts.filter(day__lte=end_date)
+    return facts
+
+
+def line_facts(start_date=None, end_date=None):
+    """Per-item rows in the date range"""
+    facts = SalesDailyFact.objects.filter(item__isnull=False)
+    if start_date:
+        facts = facts.filter(day__gte=start_date)
+    if end_date:
+        facts = facts.filter(day__lte=end_date)
+    return facts
+
+
+def period_totals(periods):
+    """
+    Sale count and revenue for several open-ended periods in one query.
+
+    `periods` maps a name to a start date (None = all time); returns
+    {name: {'count': int, 'revenue': Decimal}}.
+    """
+    aggregates = {}
+    for name, start in periods.items():
+        condition = Q(day__gte=start) if start else None
+        aggregates[f'{name}_count'] = Sum('sale_count', filter=condition)
+        aggregates[f'{name}_revenue'] = Sum('revenue', filter=condition)
+    row = sale_facts().aggregate(**aggregates)
+    return {
+        name: {
+            'count': row[f'{name}_count'] or 0,
+            'revenue': row[f'{name}_revenue'] or ZERO,
+        }
+        for name in periods
+    }
@@ -0,0 +1,15 @@
+# cornelsimba/sales/events.py
+"""Sales handlers for events published by other modules (see core/bus.py)"""
+from core.bus import subscribe
+
+from .exports import run_export
+from .models import SalesExport
+
+
+@subscribe('sales.export.requested')
+def build_sales_export(event):
+    """Build a queued sales export (skipped if a replay finds it done)"""
+    export = SalesExport.objects.get(pk=event.payload['export_id'])
+    if export.status == 'done':
+        return
+    run_export(export)
@@ -0,0 +1,308 @@
+# cornelsimba/sales/exports.py
+"""
+Sales list exports (CSV, Excel, PDF).
+
+Rows are read with .values().iterator() in chunks, so memory does not grow
+with the number of sales:
+
+- CSV is streamed straight to the client.
+- Excel uses an openpyxl write-only workbook (rows are written, not kept).
+- PDF is drawn page by page on a canvas: each page gets its own fixed-width
+  table of PDF_ROWS_PER_PAGE rows, so ReportLab never lays out one huge table.
+
+Exports over SALES_EXPORT_MAX_INLINE_ROWS are not built in the request: the
+view records a SalesExport and publishes 'sales.export.requested'; the
+outbox worker (run_outbox) builds the file with run_export() and the user
+downloads it from the exports page. The files live under
+PRIVATE_MEDIA_ROOT (never served as media) and are removed with their rows
+by purge_expired_exports() after SALES_EXPORT_RETENTION_DAYS.
+"""
+import csv
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Count, Q, Sum
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Sale, SalesExport
+
+MAX_INLINE_ROWS = getattr(settings, 'SALES_EXPORT_MAX_INLINE_ROWS', 5000)
+RETENTION_DAYS = getattr(settings, 'SALES_EXPORT_RETENTION_DAYS', 7)
+CHUNK_SIZE = 2000
+PDF_ROWS_PER_PAGE = 24
+
+FILTER_PARAMS = ('status', 'customer', 'date_from', 'date_to')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+HEADERS = [
+    'Sale #',
+    'Date',
+    'Customer',
+    'Sale Type',
+    'Amount (Tsh)',
+    'Paid (Tsh)',
+    'Balance (Tsh)',
+    'Payment Status',
+    'Sale Status',
+    'Stock Out',
+]
+
+_FIELDS = (
+    'sale_number', 'sale_date', 'customer__name', 'sale_type', 'net_amount',
+    'amount_paid', 'balance_due', 'is_paid', 'status', 'inventory_stock_out__status',
+)
+_SALE_TYPES = dict(Sale.SALE_TYPES)
+_STATUSES = dict(Sale.STATUS_CHOICES)
+
+
+def export_filters(params):
+    """The sale list filters present in `params` (request.GET), as a plain dict"""
+    filters = {key: params.get(key) for key in FILTER_PARAMS if params.get(key)}
+    # The sales report names its range start_date / end_date
+    if 'date_from' not in filters and params.get('start_date'):
+        filters['date_from'] = params.get('start_date')
+    if 'date_to' not in filters and params.get('end_date'):
+        filters['date_to'] = params.get('end_date')
+    return filters
+
+
+def filtered_sales(filters):
+    """Sales matching the sale list filters, newest first"""
+    sales = Sale.objects.order_by('-created_at')
+    if filters.get('status'):
+        sales = sales.filter(status=filters['status'])
+    if filters.get('customer'):
+        sales = sales.filter(customer__id=filters['customer'])
+    if filters.get('date_from'):
+        sales = sales.filter(sale_date__gte=filters['date_from'])
+    if filters.get('date_to'):
+        sales = sales.filter(sale_date__lte=filters['date_to'])
+    return sales
+
+
+def _payment_status(row):
+    if row['is_paid']:
+        return "Fully Paid"
+    if row['amount_paid'] > 0:
+        return "Partial"
+    return "Unpaid"
+
+
+def _stock_out_status(row):
+    status = row['inventory_stock_out__status']
+    if not status:
+        return "Not Requested"
+    return status.title()
+
+
+def iter_rows(sales, formatted=True):
+    """One list per sale in HEADERS order, read in chunks"""
+    for row in sales.values(*_FIELDS).iterator(chunk_size=CHUNK_SIZE):
+        amounts = [row['net_amount'], row['amount_paid'], row['balance_due']]
+        if formatted:
+            amounts = [f"{amount:,.0f}" for amount in amounts]
+        yield [
+            row['sale_number'],
+            row['sale_date'].strftime('%Y-%m-%d') if row['sale_date'] else '',
+            row['customer__name'],
+            _SALE_TYPES.get(row['sale_type'], row['sale_type']),
+            *amounts,
+            _payment_status(row),
+            _STATUSES.get(row['status'], row['status']),
+            _stock_out_status(row),
+        ]
+
+
+def export_summary(sales):
+    """Totals for the export footer in one query"""
+    totals = sales.order_by().aggregate(
+        count=Count('pk'),
+        amount=Sum('net_amount'),
+        paid=Sum('amount_paid'),
+        balance=Sum('balance_due'),
+        completed=Count('pk', filter=Q(status='COMPLETED')),
+        pending_payments=Count('pk', filter=Q(is_paid=False, balance_due__gt=0)),
+    )
+    for key in ('amount', 'paid', 'balance'):
+        totals[key] = totals[key] or Decimal('0')
+    return totals
+
+
+def _filter_text(filters):
+    text = f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}"
+    if filters.get('status'):
+        text += f" | Status: {filters['status']}"
+    if filters.get('date_from') or filters.get('date_to'):
+        text += f" | Date Range: {filters.get('date_from', '...')} to {filters.get('date_to', '...')}"
+    return text
+
+
+# Writers ---------------------------------------------------------------------
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer streaming"""
+    def write(self, value):
+        return value
+
+
+def csv_lines(sales):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADERS)
+    for row in iter_rows(sales, formatted=False):
+        yield writer.writerow(row)
+
+
+def write_csv(sales, out, filters=None):
+    for line in csv_lines(sales):
+        out.write(line.encode('utf-8'))
+
+
+def write_xlsx(sales, out, filters=None):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sales')
+    sheet.append(HEADERS)
+    for row in iter_rows(sales, formatted=False):
+        sheet.append(row)
+    workbook.save(out)
+
+
+def write_pdf(sales, out, filters=None):
+    """Draw the sales list one page-sized table at a time"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.pdfgen import canvas
+    from reportlab.platypus import Paragraph, Table, TableStyle
+
+    page_width, page_height = landscape(letter)
+    margin = 36
+    col_widths = [80, 60, 130, 70, 70, 60, 70, 60, 70, 50]
+    row_height = 18
+    styles = getSampleStyleSheet()
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4F81BD')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F2F2F2')]),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.gray),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ALIGN', (4, 1), (6, -1), 'RIGHT'),
+    ])
+
+    pdf = canvas.Canvas(out, pagesize=(page_width, page_height))
+    page = 0
+
+    def draw_page(rows):
+        nonlocal page
+        page += 1
+        top = page_height - margin
+        if page == 1:
+            for text, style in (("SALES REPORT", 'Title'), (_filter_text(filters or {}), 'Normal')):
+                paragraph = Paragraph(text, styles[style])
+                width, height = paragraph.wrapOn(pdf, page_width - 2 * margin, page_height)
+                paragraph.drawOn(pdf, margin, top - height)
+                top -= height + 6
+        table = Table([HEADERS] + rows, colWidths=col_widths, rowHeights=row_height)
+        table.setStyle(table_style)
+        width, height = table.wrapOn(pdf, page_width - 2 * margin, top - margin)
+        table.drawOn(pdf, margin, top - height)
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(page_width - margin, margin / 2, f"Page {page}")
+        pdf.showPage()
+
+    # The first page loses a few rows to the title
+    page_rows = PDF_ROWS_PER_PAGE - 4
+    chunk = []
+    for row in iter_rows(sales):
+        row[2] = (row[2] or '')[:28]
+        chunk.append(row)
+        if len(chunk) == page_rows:
+            draw_page(chunk)
+            chunk = []
+            page_rows = PDF_ROWS_PER_PAGE
+    if chunk or page == 0:
+        draw_page(chunk)
+
+    totals = export_summary(sales)
+    summary = Table([
+        ['Total Sales:', str(totals['count'])],
+        ['Total Amount (Tsh):', f"{totals['amount']:,.0f}"],
+        ['Total Paid (Tsh):', f"{totals['paid']:,.0f}"],
+        ['Total Balance Due (Tsh):', f"{totals['balance']:,.0f}"],
+        ['Completed Sales:', str(totals['completed'])],
+        ['Pending Payments:', str(totals['pending_payments'])],
+    ], colWidths=[200, 100])
+    summary.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.gray),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D9E1F2')),
+    ]))
+    width, height = summary.wrapOn(pdf, page_width - 2 * margin, page_height)
+    summary.drawOn(pdf, margin, page_height - margin - height)
+    pdf.showPage()
+    pdf.save()
+
+
+WRITERS = {'csv': write_csv, 'xlsx': write_xlsx, 'pdf': write_pdf}
+
+
+# Responses and background jobs ----------------------------------------------
+
+def export_filename(export_format):
+    return f"sales_report_{timezone.now().strftime('%Y%m%d_%H%M')}.{export_format}"
+
+
+def export_response(export_format, filters):
+    """Build the export in the request (caller checks the size first)"""
+    sales = filtered_sales(filters)
+    filename = export_filename(export_format)
+    if export_format == 'csv':
+        response = StreamingHttpResponse(csv_lines(sales), content_type=CONTENT_TYPES['csv'])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    # Spill to disk past a few MB instead of holding the file in memory
+    out = tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024)
+    WRITERS[export_format](sales, out, filters)
+    out.seek(0)
+    return FileResponse(out, as_attachment=True, filename=filename, content_type=CONTENT_TYPES[export_format])
+
+
+def run_export(export):
+    """Build the file of a queued SalesExport and attach it"""
+    sales = filtered_sales(export.filters)
+    with tempfile.TemporaryFile() as out:
+        WRITERS[export.export_format](sales, out, export.filters)
+        out.seek(0)
+        export.file.save(export_filename(export.export_format), File(out), save=False)
+    export.status = 'done'
+    export.finished_at = timezone.now()
+    export.save(update_fields=['file', 'status', 'finished_at'])
+    return export
+
+
+def purge_expired_exports(days=None):
+    """Delete queued exports older than `days` (default RETENTION_DAYS) and their files"""
+    cutoff = timezone.now() - timedelta(days=RETENTION_DAYS if days is None else days)
+    purged = 0
+    for export in SalesExport.objects.filter(created_at__lt=cutoff).iterator():
+        if export.file:
+            export.file.delete(save=False)
+        export.delete()
+        purged += 1
+    return purged
@@ -3,6 +3,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from .models import Customer, Sale, SaleItem, Payment
 from inventory.models import Item
+from inventory.forms import ItemLookupSelect
 
 class CustomerForm(forms.ModelForm):
     class Meta:
@@ -56,7 +57,7 @@ class SaleItemForm(forms.ModelForm):
         fields = ['item', 'quantity', 'unit_price', 'tax_rate']
         
         widgets = {
-            'item': forms.Select(attrs={'class': 'form-control sale-item-select'}),
+            'item': ItemLookupSelect(attrs={'class': 'form-control sale-item-select'}, in_stock=True),
             'quantity': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.001', 'min': '0.001'}),
             'unit_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0.01'}),
             'tax_rate': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0'}),
@@ -77,9 +78,9 @@ class SaleItemForm(forms.ModelForm):
         
         if item and quantity:
             # Check stock availability
-            if quantity > item.quantity:
+            if quantity > item.available_quantity:
                 raise ValidationError({
-                    'quantity': f'Insufficient stock! Available: {item.quantity} {item.unit_of_measure}'
+                    'quantity': f'Insufficient stock! Available: {item.available_quantity} {item.unit_of_measure}'
                 })
         
         return cleaned_data
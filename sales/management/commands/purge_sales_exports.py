@@ -0,0 +1,16 @@
+# sales/management/commands/purge_sales_exports.py
+from django.core.management.base import BaseCommand
+
+from sales.exports import RETENTION_DAYS, purge_expired_exports
+
+
+class Command(BaseCommand):
+    help = 'Delete queued sales exports (rows and files) older than the retention period (run daily from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=RETENTION_DAYS,
+                            help=f'Keep exports younger than this many days (default {RETENTION_DAYS})')
+
+    def handle(self, *args, **options):
+        purged = purge_expired_exports(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} sales exports"))
@@ -0,0 +1,12 @@
+# sales/management/commands/rebuild_customer_metrics.py
+from django.core.management.base import BaseCommand
+
+from sales.metrics import rebuild_customer_metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute every customer\'s lifetime metrics and open balance (safety net after data fixes)'
+
+    def handle(self, *args, **options):
+        customers = rebuild_customer_metrics()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt metrics for {customers} customers"))
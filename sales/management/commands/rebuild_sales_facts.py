@@ -0,0 +1,12 @@
+# sales/management/commands/rebuild_sales_facts.py
+from django.core.management.base import BaseCommand
+
+from sales.analytics import rebuild_sales_facts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the sales daily fact table from completed sales (run nightly)'
+
+    def handle(self, *args, **options):
+        rows = rebuild_sales_facts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt sales facts: {rows} rows"))
@@ -0,0 +1,100 @@
+# cornelsimba/sales/metrics.py
+"""
+Customer 360 metrics.
+
+CustomerMetrics holds one row per customer: lifetime revenue, sale count
+and last sale date of completed sales, plus the open balance kept by
+sales/receivables.py. Lists read it with one join (with_metrics()) and can
+sort on any of it, instead of aggregating sales for every customer shown.
+
+The lifetime part is refreshed by sync_sales_facts() for the customers
+whose sales entered or left the completed state; it is recomputed from
+the customer's whole-sale facts (a few rows per active day), so repeated
+calls are harmless. `rebuild_customer_metrics` recomputes everything.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, IntegerField, Max, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Customer, CustomerMetrics, SalesDailyFact
+
+ZERO = Decimal('0')
+
+# ?sort= values accepted by the customer list
+CUSTOMER_SORTS = {
+    'name': 'name',
+    'revenue': 'lifetime_revenue',
+    'sales': 'sale_count',
+    'last_sale': 'last_sale_date',
+    'balance': 'outstanding',
+    'credit_limit': 'credit_limit',
+}
+
+
+def refresh_lifetime_metrics(customer_ids):
+    """Recompute the completed-sales part of CustomerMetrics for the given customers"""
+    customer_ids = {pk for pk in customer_ids if pk}
+    if not customer_ids:
+        return 0
+
+    rows = {
+        row['customer_id']: row
+        for row in SalesDailyFact.objects.filter(
+            item__isnull=True, customer_id__in=customer_ids,
+        ).order_by().values('customer_id').annotate(
+            revenue=Sum('revenue'), n=Sum('sale_count'), last=Max('day'),
+        )
+    }
+    metrics = []
+    for customer_id in customer_ids:
+        row = rows.get(customer_id, {})
+        metrics.append(CustomerMetrics(
+            customer_id=customer_id,
+            lifetime_revenue=row.get('revenue') or ZERO,
+            sale_count=row.get('n') or 0,
+            last_sale_date=row.get('last'),
+        ))
+    CustomerMetrics.objects.bulk_create(
+        metrics,
+        update_conflicts=True,
+        unique_fields=['customer'],
+        update_fields=['lifetime_revenue', 'sale_count', 'last_sale_date', 'updated_at'],
+    )
+    return len(metrics)
+
+
+@transaction.atomic
+def rebuild_customer_metrics(batch_size=1000):
+    """Recompute lifetime figures and balances for every customer. Returns the number of customers."""
+    from .receivables import refresh_customer_balances
+
+    customer_ids = list(Customer.objects.values_list('pk', flat=True))
+    for i in range(0, len(customer_ids), batch_size):
+        batch = customer_ids[i:i + batch_size]
+        refresh_lifetime_metrics(batch)
+        refresh_customer_balances(batch)
+    return len(customer_ids)
+
+
+def with_metrics(customers):
+    """Annotate a Customer queryset with its metrics (zero for customers without a row)"""
+    money = DecimalField(max_digits=17, decimal_places=2)
+    return customers.annotate(
+        lifetime_revenue=Coalesce(F('metrics__lifetime_revenue'), Value(ZERO), output_field=money),
+        sale_count=Coalesce(F('metrics__sale_count'), Value(0), output_field=IntegerField()),
+        last_sale_date=F('metrics__last_sale_date'),
+        outstanding=Coalesce(F('metrics__outstanding'), Value(ZERO), output_field=money),
+    )
+
+
+def order_customers(customers, sort):
+    """Order an annotated customer queryset by a CUSTOMER_SORTS key ('-' prefix for descending)"""
+    descending = sort.startswith('-')
+    field = CUSTOMER_SORTS.get(sort.lstrip('-'))
+    if field is None:
+        return customers.order_by('name')
+    if descending:
+        return customers.order_by(F(field).desc(nulls_last=True), 'name')
+    return customers.order_by(F(field).asc(nulls_last=True), 'name')
@@ -0,0 +1,72 @@
+# Generated by Django 6.0 on 2026-10-19 00:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_facts(apps, schema_editor):
+    """Count the sales that are already completed"""
+    Sale = apps.get_model('sales', 'Sale')
+    SaleItem = apps.get_model('sales', 'SaleItem')
+    SalesDailyFact = apps.get_model('sales', 'SalesDailyFact')
+
+    completed = Sale.objects.filter(status='COMPLETED')
+    facts = [
+        SalesDailyFact(
+            day=row['sale_date'], customer_id=row['customer_id'], sale_type=row['sale_type'],
+            sale_count=row['n'], revenue=row['amount'] or 0,
+        )
+        for row in completed.order_by().values('sale_date', 'customer_id', 'sale_type').annotate(
+            n=Count('pk'), amount=Sum('net_amount'),
+        )
+    ]
+    facts += [
+        SalesDailyFact(
+            day=row['sale__sale_date'], customer_id=row['sale__customer_id'], item_id=row['item_id'],
+            sale_type=row['sale__sale_type'], sale_count=row['n'], quantity=row['qty'] or 0,
+            revenue=row['amount'] or 0,
+        )
+        for row in SaleItem.objects.filter(sale__status='COMPLETED').order_by().values(
+            'sale__sale_date', 'sale__customer_id', 'item_id', 'sale__sale_type',
+        ).annotate(n=Count('sale_id', distinct=True), qty=Sum('quantity'), amount=Sum('total_price'))
+    ]
+    SalesDailyFact.objects.bulk_create(facts, batch_size=1000)
+    completed.update(in_sales_facts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0018_stockoutline'),
+        ('sales', '0006_alter_sale_options_remove_sale_currency_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='in_sales_facts',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='SalesDailyFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sale_type', models.CharField(choices=[('CASH', 'Cash Sale'), ('CREDIT', 'Credit Sale'), ('CONSIGNMENT', 'Consignment'), ('RETURN', 'Return Sale')], max_length=20)),
+                ('sale_count', models.IntegerField(default=0)),
+                ('quantity', models.DecimalField(decimal_places=3, default=0, max_digits=15)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Amount in Tsh', max_digits=17)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_facts', to='sales.customer')),
+                ('item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sales_daily_facts', to='inventory.item')),
+            ],
+            options={
+                'verbose_name': 'Sales Daily Fact',
+                'verbose_name_plural': 'Sales Daily Facts',
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['day', 'item'], name='sales_sales_day_276e35_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('item__isnull', False)), fields=('day', 'customer', 'item', 'sale_type'), name='unique_sales_fact_line'), models.UniqueConstraint(condition=models.Q(('item__isnull', True)), fields=('day', 'customer', 'sale_type'), name='unique_sales_fact_sale')],
+            },
+        ),
+        migrations.RunPython(build_facts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0 on 2026-10-19 00:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def build_balances(apps, schema_editor):
+    """Balances of the sales that are already owed"""
+    Sale = apps.get_model('sales', 'Sale')
+    CustomerBalance = apps.get_model('sales', 'CustomerBalance')
+
+    rows = Sale.objects.filter(
+        status__in=['APPROVED', 'STOCK_OUT_PENDING', 'COMPLETED'], balance_due__gt=0,
+    ).order_by().values('customer_id').annotate(
+        total=Sum('balance_due'), n=Count('pk'), oldest=Min('sale_date'),
+    )
+    CustomerBalance.objects.bulk_create([
+        CustomerBalance(
+            customer_id=row['customer_id'], outstanding=row['total'],
+            open_sales=row['n'], oldest_open_date=row['oldest'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0007_salesdailyfact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerBalance',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance', serialize=False, to='sales.customer')),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, help_text='Amount in Tsh', max_digits=17)),
+                ('open_sales', models.IntegerField(default=0)),
+                ('oldest_open_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Customer Balance',
+                'verbose_name_plural': 'Customer Balances',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(condition=models.Q(('balance_due__gt', 0)), fields=['customer', 'sale_date'], name='sale_open_balance_idx'),
+        ),
+        migrations.RunPython(build_balances, migrations.RunPython.noop),
+    ]
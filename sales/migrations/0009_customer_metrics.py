@@ -0,0 +1,75 @@
+# Generated by Django 6.0 on 2026-10-19 00:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max, Sum
+
+
+def fill_lifetime_metrics(apps, schema_editor):
+    """Lifetime figures from the whole-sale facts"""
+    CustomerMetrics = apps.get_model('sales', 'CustomerMetrics')
+    SalesDailyFact = apps.get_model('sales', 'SalesDailyFact')
+
+    rows = SalesDailyFact.objects.filter(item__isnull=True).order_by().values('customer_id').annotate(
+        revenue=Sum('revenue'), n=Sum('sale_count'), last=Max('day'),
+    )
+    for row in rows:
+        updated = CustomerMetrics.objects.filter(customer_id=row['customer_id']).update(
+            lifetime_revenue=row['revenue'] or 0, sale_count=row['n'] or 0, last_sale_date=row['last'],
+        )
+        if not updated:
+            CustomerMetrics.objects.create(
+                customer_id=row['customer_id'], lifetime_revenue=row['revenue'] or 0,
+                sale_count=row['n'] or 0, last_sale_date=row['last'],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_customerbalance'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='CustomerBalance',
+            new_name='CustomerMetrics',
+        ),
+        migrations.AlterModelOptions(
+            name='customermetrics',
+            options={'verbose_name': 'Customer Metrics', 'verbose_name_plural': 'Customer Metrics'},
+        ),
+        migrations.AlterField(
+            model_name='customermetrics',
+            name='customer',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrics', serialize=False, to='sales.customer'),
+        ),
+        migrations.AddField(
+            model_name='customermetrics',
+            name='lifetime_revenue',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Amount in Tsh', max_digits=17),
+        ),
+        migrations.AddField(
+            model_name='customermetrics',
+            name='sale_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customermetrics',
+            name='last_sale_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customermetrics',
+            index=models.Index(fields=['lifetime_revenue'], name='sales_custo_lifetim_d1c80d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customermetrics',
+            index=models.Index(fields=['outstanding'], name='sales_custo_outstan_9d7142_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customermetrics',
+            index=models.Index(fields=['last_sale_date'], name='sales_custo_last_sa_a08570_idx'),
+        ),
+        migrations.RunPython(fill_lifetime_metrics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 00:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0009_customer_metrics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export_format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel'), ('pdf', 'PDF')], max_length=10)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Ready')], default='pending', max_length=20)),
+                ('row_count', models.IntegerField(default=0)),
+                ('file', models.FileField(blank=True, upload_to='exports/sales/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales_exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sales Export',
+                'verbose_name_plural': 'Sales Exports',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
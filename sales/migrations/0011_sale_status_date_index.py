@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0010_salesexport'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['status', 'sale_date'], name='sales_sale_status_7f16d7_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 01:01
+
+import sales.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0011_sale_status_date_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='salesexport',
+            name='file',
+            field=models.FileField(blank=True, storage=sales.models.private_export_storage, upload_to=sales.models.sales_export_path),
+        ),
+        migrations.AddIndex(
+            model_name='salesexport',
+            index=models.Index(fields=['created_at'], name='sales_sales_created_b12b6a_idx'),
+        ),
+    ]
@@ -1,12 +1,18 @@
 # cornelsimba/sales/models.py - COMPLETELY FIXED & ROUNDING-PROOF VERSION
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from inventory.models import Item
+from core.sequences import daily_number
+from .totals import price_line, recalculate, sale_changed
 from decimal import Decimal, ROUND_HALF_UP
-from django.db.models import Sum
+from django.db import transaction
 import logging
 
 logger = logging.getLogger(__name__)
@@ -117,6 +123,9 @@ class Sale(models.Model):
     stock_out_request_date = models.DateTimeField(null=True, blank=True)
     stock_out_processed_date = models.DateTimeField(null=True, blank=True)
     
+    # Counted in SalesDailyFact (see sales/analytics.py)
+    in_sales_facts = models.BooleanField(default=False, editable=False)
+    
     # Approval and tracking
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_sales')
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_sales')
@@ -140,6 +149,13 @@ class Sale(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['customer']),
+            models.Index(fields=['status', 'sale_date']),
+            # Open receivables only (see sales/receivables.py)
+            models.Index(
+                fields=['customer', 'sale_date'],
+                condition=models.Q(balance_due__gt=0),
+                name='sale_open_balance_idx',
+            ),
         ]
 
     def clean(self):
@@ -158,9 +174,7 @@ class Sale(models.Model):
         """Save method with proper indentation"""
         # Generate sale number if new
         if not self.sale_number:
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            self.sale_number = f"SALE-{timestamp}"
+            self.sale_number = daily_number('SALE', Sale, 'sale_number')
 
         # Force Decimal values with ROUND_HALF_UP
         self.net_amount = Decimal(str(self.net_amount or 0)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
@@ -178,34 +192,8 @@ class Sale(models.Model):
         super().save(*args, **kwargs)
     
     def calculate_totals(self):
-        """Calculate totals from sale items"""
-        try:
-            items = self.items.all()
-            
-            total_amount = Decimal('0')
-            tax_amount = Decimal('0')
-            
-            for item in items:
-                total_amount += item.total_price or Decimal('0')
-                tax_amount += item.tax_amount or Decimal('0')
-            
-            self.total_amount = total_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            self.tax_amount = tax_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            self.discount_amount = Decimal(str(self.discount_amount or 0)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            self.net_amount = (self.total_amount + self.tax_amount - self.discount_amount).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            self.amount_paid = Decimal(str(self.amount_paid or 0)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            self.balance_due = (self.net_amount - self.amount_paid).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            self.is_paid = self.balance_due <= Decimal('0.0049')
-
-            # Save only the calculated fields
-            self.save(update_fields=[
-                'total_amount', 'tax_amount', 'discount_amount', 'net_amount', 
-                'balance_due', 'is_paid', 'updated_at'
-            ])
-            
-        except Exception as e:
-            # If we can't access items (e.g., sale not saved yet), do nothing
-            pass
+        """Calculate totals from sale items and payments (see sales/totals.py)"""
+        return recalculate(self)
     
     def calculate_totals_from_values(self, total_amount, tax_amount):
         """Calculate totals from provided values (used when sale doesn't have PK yet)"""
@@ -233,7 +221,8 @@ class Sale(models.Model):
         Create a PENDING stock out request (does NOT deduct stock)
         Inventory team must approve it first
         """
-        from inventory.models import StockOut
+        from inventory.models import StockOut, StockOutLine
+        from inventory.reservations import reserve_for_sale
         
         # Check if already requested
         if self.inventory_stock_out:
@@ -247,21 +236,35 @@ class Sale(models.Model):
         if not is_available:
             raise ValidationError(f"Cannot request stock out: {message}")
         
-        # Create stock out record with PENDING status
-        first_item = self.items.first()
-        stock_out = StockOut.objects.create(
-            item=first_item.item,
-            quantity=first_item.quantity,
-            issued_to=self.customer.name,
-            purpose='SALE',
-            reference=self.sale_number,
-            notes=f"Sale request #{self.sale_number} - Total: Tsh {self.net_amount:,.2f}",
-            status='pending',  # PENDING - not approved yet
-            created_by=user,
-            issued_by=user.get_full_name() or user.username,
-            sale_reference=self.sale_number,
-            linked_sale=self
-        )
+        # Create stock out record with PENDING status (one line per sale item)
+        # and hold the stock for it
+        sale_items = list(self.items.all())
+        first_item = sale_items[0]
+        with transaction.atomic():
+            stock_out = StockOut.objects.create(
+                item=first_item.item,
+                quantity=first_item.quantity,
+                issued_to=self.customer.name,
+                purpose='SALE',
+                reference=self.sale_number,
+                notes=f"Sale request #{self.sale_number} - Total: Tsh {self.net_amount:,.2f}",
+                status='pending',  # PENDING - not approved yet
+                created_by=user,
+                issued_by=user.get_full_name() or user.username,
+                sale_reference=self.sale_number,
+                linked_sale=self
+            )
+            StockOutLine.objects.bulk_create([
+                StockOutLine(
+                    stock_out=stock_out,
+                    item_id=sale_item.item_id,
+                    quantity=sale_item.quantity,
+                    sale_item=sale_item,
+                )
+                for sale_item in sale_items
+            ])
+            # Raises ValidationError if another request took the stock first
+            reserve_for_sale(self, user=user, stock_out=stock_out)
         
         # Update sale status and tracking
         self.inventory_stock_out = stock_out
@@ -281,16 +284,11 @@ class Sale(models.Model):
         Check if there's enough stock for this sale
         Returns: (bool, str) - (is_available, message)
         """
-        stock_issues = []
-        
-        for sale_item in self.items.all():
-            if sale_item.quantity > sale_item.item.quantity:
-                stock_issues.append(
-                    f"{sale_item.item.name}: Need {sale_item.quantity}, Available {sale_item.item.quantity}"
-                )
+        from inventory.availability import check_sales_availability, shortfall_message
         
-        if stock_issues:
-            return False, "Insufficient stock: " + "; ".join(stock_issues)
+        result = check_sales_availability([self.pk])[self.pk]
+        if not result['is_available']:
+            return False, shortfall_message(result['shortfalls'])
         return True, "Stock available for all items"
     
     def mark_as_approved(self, user):
@@ -302,6 +300,10 @@ class Sale(models.Model):
         self.approved_by = user
         self.save(update_fields=['status', 'approved_by', 'updated_at'])
         
+        # The sale is now owed by the customer
+        from .receivables import refresh_customer_balances
+        refresh_customer_balances([self.customer_id])
+        
         return self
     
     def mark_as_completed(self, user):
@@ -313,6 +315,9 @@ class Sale(models.Model):
         self.stock_out_processed_date = timezone.now()
         self.save(update_fields=['status', 'stock_out_processed_date', 'updated_at'])
         
+        from .analytics import sync_sales_facts
+        sync_sales_facts([self.pk])
+        
         # ✅ ADD THIS: Create income record in finance
         try:
             from finance.models import Income
@@ -423,35 +428,56 @@ class SaleItem(models.Model):
         
         # Check stock availability if item exists and not editing
         if self.pk is None and hasattr(self, 'item'):
-            if self.quantity > self.item.quantity:
+            if self.quantity > self.item.available_quantity:
                 raise ValidationError(
-                    f"Insufficient stock. Available: {self.item.quantity}, Requested: {self.quantity}"
+                    f"Insufficient stock. Available: {self.item.available_quantity}, Requested: {self.quantity}"
                 )
     
+    PRICING_FIELDS = ('quantity', 'unit_price', 'tax_rate')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_pricing()
+        return instance
+    
+    def remember_pricing(self):
+        """Snapshot priced fields so save() can tell whether totals moved"""
+        self._saved_pricing = tuple(self.__dict__.get(field) for field in self.PRICING_FIELDS)
+    
+    def pricing_changed(self):
+        return getattr(self, '_saved_pricing', None) != tuple(
+            self.__dict__.get(field) for field in self.PRICING_FIELDS
+        )
+    
     def save(self, *args, **kwargs):
         """Save method for sale item"""
-        # Convert to Decimal with proper rounding
-        qty = Decimal(str(self.quantity))
-        price = Decimal(str(self.unit_price)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        rate = Decimal(str(self.tax_rate or 0)) / Decimal('100')
-
-        self.total_price = (qty * price).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        self.tax_amount = (self.total_price * rate).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        update_fields = kwargs.get('update_fields')
+        repriced = update_fields is None or bool(set(update_fields) & set(self.PRICING_FIELDS))
+        changed = repriced and (self._state.adding or self.pricing_changed())
+        
+        if repriced:
+            price_line(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'total_price', 'tax_amount'}
 
         # If this is a new item and sale already has approved stock out, mark as stocked out
-        if self.sale and self.sale.has_approved_stock_out:
+        if self._state.adding and self.sale and self.sale.has_approved_stock_out:
             self.is_stocked_out = True
             self.stock_out_date = timezone.now()
         
         super().save(*args, **kwargs)
         
-        # Update sale totals if sale exists
-        if self.sale and self.sale.pk:
-            try:
-                self.sale.calculate_totals()
-            except Exception:
-                # If calculation fails, don't break the save
-                pass
+        # Update sale totals only when the line's price actually moved
+        if changed:
+            self.remember_pricing()
+            sale_changed(self.sale)
+    
+    def delete(self, *args, **kwargs):
+        sale = self.sale
+        result = super().delete(*args, **kwargs)
+        sale_changed(sale)
+        return result
     
     @property
     def total_price_display(self):
@@ -533,6 +559,12 @@ class Payment(models.Model):
                 f'Payment amount cannot exceed balance due (Tsh {self.sale.balance_due:,.2f})'
             )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_state = (instance.__dict__.get('amount'), instance.__dict__.get('payment_status'))
+        return instance
+    
     def save(self, *args, **kwargs):
         """Save method for payment"""
         # Ensure amount is positive and properly rounded
@@ -540,29 +572,20 @@ class Payment(models.Model):
             self.amount = abs(self.amount)
         
         self.amount = Decimal(str(self.amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        changed = self._state.adding or getattr(self, '_saved_state', None) != (self.amount, self.payment_status)
 
         super().save(*args, **kwargs)
 
-        # Update sale payment totals
+        # Update sale payment totals only when this payment's amount or status moved
+        if changed:
+            self._saved_state = (self.amount, self.payment_status)
+            sale_changed(self.sale)
+    
+    def delete(self, *args, **kwargs):
         sale = self.sale
-        total_paid = sale.payments.filter(
-            payment_status='COMPLETED'
-        ).aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
-        
-        total_paid = total_paid.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-        sale.amount_paid = total_paid
-        sale.balance_due = (sale.net_amount - total_paid).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        sale.is_paid = sale.balance_due <= Decimal('0.0049')
-
-        sale.save(update_fields=[
-            'amount_paid',
-            'balance_due',
-            'is_paid',
-            'updated_at'
-        ])
+        result = super().delete(*args, **kwargs)
+        sale_changed(sale)
+        return result
 
     @property
     def amount_display(self):
@@ -570,6 +593,131 @@ class Payment(models.Model):
         return f"Tsh {self.amount:,.2f}"
 
 
+
+class SalesDailyFact(models.Model):
+    """
+    Completed sales pre-aggregated per day, customer, item and sale type.
+    
+    Rows with no item are whole sales (count and net revenue); rows with an
+    item are sale lines (sales containing it, quantity, line revenue).
+    Maintained by sales/analytics.py.
+    """
+    day = models.DateField()
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='daily_facts')
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, null=True, blank=True, related_name='sales_daily_facts')
+    sale_type = models.CharField(max_length=20, choices=Sale.SALE_TYPES)
+    
+    sale_count = models.IntegerField(default=0)
+    quantity = models.DecimalField(max_digits=15, decimal_places=3, default=0)
+    revenue = models.DecimalField(max_digits=17, decimal_places=2, default=0, help_text="Amount in Tsh")
+    
+    class Meta:
+        ordering = ['day']
+        verbose_name = 'Sales Daily Fact'
+        verbose_name_plural = 'Sales Daily Facts'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'customer', 'item', 'sale_type'],
+                condition=models.Q(item__isnull=False),
+                name='unique_sales_fact_line',
+            ),
+            models.UniqueConstraint(
+                fields=['day', 'customer', 'sale_type'],
+                condition=models.Q(item__isnull=True),
+                name='unique_sales_fact_sale',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'item']),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.customer_id} {self.item_id or '-'} {self.sale_type}: {self.revenue}"
+
+class CustomerMetrics(models.Model):
+    """
+    Denormalized per-customer figures for lists, sorting and the credit check.
+    
+    Lifetime figures (completed sales) are maintained by sales/metrics.py
+    from the daily facts, the open balance by sales/receivables.py.
+    """
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, primary_key=True, related_name='metrics')
+    
+    # Completed sales
+    lifetime_revenue = models.DecimalField(max_digits=17, decimal_places=2, default=0, help_text="Amount in Tsh")
+    sale_count = models.IntegerField(default=0)
+    last_sale_date = models.DateField(null=True, blank=True)
+    
+    # Receivables
+    outstanding = models.DecimalField(max_digits=17, decimal_places=2, default=0, help_text="Amount in Tsh")
+    open_sales = models.IntegerField(default=0)
+    oldest_open_date = models.DateField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Customer Metrics'
+        verbose_name_plural = 'Customer Metrics'
+        indexes = [
+            models.Index(fields=['lifetime_revenue']),
+            models.Index(fields=['outstanding']),
+            models.Index(fields=['last_sale_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.customer_id}: Tsh {self.lifetime_revenue:,.2f} / Tsh {self.outstanding:,.2f} due"
+    
+    @property
+    def outstanding_display(self):
+        return f"Tsh {self.outstanding:,.2f}"
+    
+    @property
+    def lifetime_revenue_display(self):
+        return f"Tsh {self.lifetime_revenue:,.2f}"
+
+def private_export_storage():
+    """Outside MEDIA_ROOT and without a URL: files are only served by sales:export_download"""
+    return FileSystemStorage(location=settings.PRIVATE_MEDIA_ROOT, base_url=None)
+
+
+def sales_export_path(instance, filename):
+    # Unguessable directory, readable file name for the download
+    return f"exports/sales/{uuid.uuid4().hex}/{filename}"
+
+
+class SalesExport(models.Model):
+    """A sales list export too large to build in the request (see sales/exports.py)"""
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+        ('pdf', 'PDF'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Ready'),
+    ]
+    
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    row_count = models.IntegerField(default=0)
+    file = models.FileField(upload_to=sales_export_path, storage=private_export_storage, blank=True)
+    
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='sales_exports')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Sales Export'
+        verbose_name_plural = 'Sales Exports'
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_export_format_display()} export of {self.row_count} sales ({self.get_status_display()})"
+
 class SaleReturn(models.Model):
     """Handle returns and refunds"""
     RETURN_REASONS = [
@@ -615,9 +763,7 @@ class SaleReturn(models.Model):
     def save(self, *args, **kwargs):
         """Save method for sale return"""
         if not self.return_number:
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            self.return_number = f"RET-{timestamp}"
+            self.return_number = daily_number('RET', SaleReturn, 'return_number')
         
         # Round refund amount
         self.refund_amount = Decimal(str(self.refund_amount or 0)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
@@ -0,0 +1,151 @@
+# cornelsimba/sales/receivables.py
+"""
+Accounts receivable.
+
+A sale is owed once it is approved (APPROVED, STOCK_OUT_PENDING or COMPLETED)
+and still has a balance due. aging_by_customer() buckets those balances by
+age of the sale (0-30, 31-60, 61-90 and 90+ days) with one grouped query;
+the partial index on (customer, sale_date) WHERE balance_due > 0 keeps it to
+the open sales only, however much paid history there is.
+
+CustomerMetrics keeps each customer's outstanding total so check_credit()
+reads one row instead of summing open sales. refresh_customer_balances() is
+called whenever a balance or a status moves (sale totals recalculated after
+a payment, approval, cancellation); it recomputes the given customers from
+their open sales, so it is safe to call more than needed.
+`rebuild_customer_metrics` recomputes every customer.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from .models import CustomerMetrics, Sale
+
+ZERO = Decimal('0')
+RECEIVABLE_STATUSES = ('APPROVED', 'STOCK_OUT_PENDING', 'COMPLETED')
+
+# (key, label, from days, to days)
+AGING_BUCKETS = [
+    ('current', '0-30 days', 0, 30),
+    ('days_31_60', '31-60 days', 31, 60),
+    ('days_61_90', '61-90 days', 61, 90),
+    ('over_90', '90+ days', 91, None),
+]
+
+
+def open_receivables():
+    """Sales the customer still owes money on"""
+    return Sale.objects.filter(status__in=RECEIVABLE_STATUSES, balance_due__gt=0)
+
+
+def _bucket_filter(as_of, start, end):
+    condition = Q()
+    if start:
+        condition &= Q(sale_date__lte=as_of - timedelta(days=start))
+    if end is not None:
+        condition &= Q(sale_date__gte=as_of - timedelta(days=end))
+    return condition
+
+
+def aging_by_customer(as_of=None, customer_ids=None):
+    """
+    Outstanding balance per customer split into age buckets, largest first.
+
+    Returns a list of dicts with customer_id, customer_name, credit_limit,
+    open_sales, oldest_sale_date, total and one key per AGING_BUCKETS entry.
+    """
+    as_of = as_of or timezone.localdate()
+    sales = open_receivables()
+    if customer_ids is not None:
+        sales = sales.filter(customer_id__in=list(customer_ids))
+
+    buckets = {
+        key: Sum('balance_due', filter=_bucket_filter(as_of, start, end))
+        for key, label, start, end in AGING_BUCKETS
+    }
+    rows = sales.order_by().values(
+        'customer_id', 'customer__name', 'customer__credit_limit',
+    ).annotate(
+        open_sales=Count('pk'),
+        oldest_sale_date=Min('sale_date'),
+        total=Sum('balance_due'),
+        **buckets,
+    ).order_by('-total')
+
+    aging = []
+    for row in rows:
+        entry = {
+            'customer_id': row['customer_id'],
+            'customer_name': row['customer__name'],
+            'credit_limit': row['customer__credit_limit'],
+            'open_sales': row['open_sales'],
+            'oldest_sale_date': row['oldest_sale_date'],
+            'total': row['total'] or ZERO,
+        }
+        for key, label, start, end in AGING_BUCKETS:
+            entry[key] = row[key] or ZERO
+        aging.append(entry)
+    return aging
+
+
+def aging_totals(aging):
+    """Column totals for the rows returned by aging_by_customer()"""
+    keys = ['total'] + [key for key, label, start, end in AGING_BUCKETS]
+    totals = {key: sum((row[key] for row in aging), ZERO) for key in keys}
+    totals['open_sales'] = sum(row['open_sales'] for row in aging)
+    return totals
+
+
+def refresh_customer_balances(customer_ids):
+    """Recompute the balance part of CustomerMetrics for the given customers from their open sales"""
+    customer_ids = {pk for pk in customer_ids if pk}
+    if not customer_ids:
+        return 0
+
+    rows = {
+        row['customer_id']: row
+        for row in open_receivables().filter(customer_id__in=customer_ids).order_by().values(
+            'customer_id',
+        ).annotate(
+            total=Sum('balance_due'), n=Count('pk'), oldest=Min('sale_date'),
+        )
+    }
+    balances = []
+    for customer_id in customer_ids:
+        row = rows.get(customer_id, {})
+        balances.append(CustomerMetrics(
+            customer_id=customer_id,
+            outstanding=row.get('total') or ZERO,
+            open_sales=row.get('n', 0),
+            oldest_open_date=row.get('oldest'),
+        ))
+    CustomerMetrics.objects.bulk_create(
+        balances,
+        update_conflicts=True,
+        unique_fields=['customer'],
+        update_fields=['outstanding', 'open_sales', 'oldest_open_date', 'updated_at'],
+    )
+    return len(balances)
+
+
+def check_credit(customer, amount):
+    """
+    Raise ValidationError if `amount` more would take `customer` over their
+    credit limit. A credit limit of 0 means no limit.
+
+    Call inside the transaction that creates the debt: the balance row is
+    locked so two sales for the same customer cannot both squeeze under it.
+    """
+    if not customer.credit_limit or customer.credit_limit <= 0:
+        return
+    balance = CustomerMetrics.objects.select_for_update().filter(customer=customer).first()
+    outstanding = balance.outstanding if balance else ZERO
+    if outstanding + Decimal(str(amount or 0)) > customer.credit_limit:
+        available = max(customer.credit_limit - outstanding, ZERO)
+        raise ValidationError(
+            f'{customer.name} would exceed their credit limit of Tsh {customer.credit_limit:,.2f} '
+            f'(outstanding Tsh {outstanding:,.2f}, available Tsh {available:,.2f}).'
+        )
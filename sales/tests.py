@@ -1,3 +1,51 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from inventory.models import Item
+
+from .models import Customer, Sale
+
+
+class SaleCreateTests(TestCase):
+    """Creating a sale through the sale form"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('sales_admin', 'sales@example.com', 'password')
+        cls.customer = Customer.objects.create(name='Duka La Mama', credit_limit=Decimal('1000'))
+        cls.item = Item.objects.create(name='Flour', quantity=Decimal('100.000'), selling_price=Decimal('500'))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post_sale(self, quantity):
+        return self.client.post(reverse('sales:sale_create'), {
+            'customer': self.customer.pk,
+            'sale_type': 'CREDIT',
+            'discount_amount': '0',
+            'items-TOTAL_FORMS': '1',
+            'items-INITIAL_FORMS': '0',
+            'items-MIN_NUM_FORMS': '1',
+            'items-MAX_NUM_FORMS': '1000',
+            'items-0-item': self.item.pk,
+            'items-0-quantity': quantity,
+            'items-0-unit_price': '500',
+            'items-0-tax_rate': '0',
+        })
+
+    def test_sale_over_credit_limit_is_shown_as_a_new_sale(self):
+        response = self.post_sale('10')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Sale.objects.exists())
+        self.assertIsNone(response.context['sale'])
+        self.assertEqual(response.context['title'], 'Create New Sale')
+        self.assertIsNone(response.context['sale_form'].instance.pk)
 
-# Create your tests here.
+        # Resubmitting within the limit creates the sale
+        response = self.post_sale('1')
+        sale = Sale.objects.get()
+        self.assertRedirects(response, reverse('sales:sale_detail', args=[sale.pk]))
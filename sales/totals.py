@@ -0,0 +1,147 @@
+# cornelsimba/sales/totals.py
+"""
+Sale totals.
+
+recalculate() reads the item and payment sums for a sale in one query (two
+correlated subqueries) and writes the derived fields with one UPDATE, only
+when something moved. Rounding happens once, on the sums.
+
+SaleItem and Payment call sale_changed() from save()/delete() only when a
+priced field (quantity, unit price, tax rate / amount, status) actually
+changed. Inside `with deferred_totals():` those calls just mark the sale
+dirty and every dirty sale is recalculated once when the block exits, so
+saving a sale with hundreds of lines costs one totals update instead of one
+per line. bulk_create_items() prices lines in Python and inserts them with
+a single bulk_create.
+
+A totals change on an approved sale also refreshes the customer's
+receivable balance (sales/receivables.py).
+"""
+import threading
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+CENT = Decimal('0.01')
+PAID_TOLERANCE = Decimal('0.0049')
+
+_state = threading.local()
+
+
+def _money(value):
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def price_line(sale_item):
+    """Set total_price and tax_amount on a SaleItem (no save)"""
+    price = _money(sale_item.unit_price)
+    rate = Decimal(str(sale_item.tax_rate or 0)) / Decimal('100')
+    sale_item.total_price = (Decimal(str(sale_item.quantity)) * price).quantize(CENT, rounding=ROUND_HALF_UP)
+    sale_item.tax_amount = (sale_item.total_price * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+    return sale_item
+
+
+def _sum_subquery(queryset, field):
+    money = DecimalField(max_digits=15, decimal_places=2)
+    return Coalesce(
+        Subquery(queryset.order_by().values('sale').annotate(total=Sum(field)).values('total')[:1]),
+        Value(Decimal('0')),
+        output_field=money,
+    )
+
+
+def recalculate(sale):
+    """Recompute a sale's totals from its items and completed payments"""
+    from .models import Payment, Sale, SaleItem
+
+    if not sale.pk:
+        return sale
+    items = SaleItem.objects.filter(sale=OuterRef('pk'))
+    payments = Payment.objects.filter(sale=OuterRef('pk'), payment_status='COMPLETED')
+    row = Sale.objects.filter(pk=sale.pk).values_list(
+        _sum_subquery(items, 'total_price'),
+        _sum_subquery(items, 'tax_amount'),
+        _sum_subquery(payments, 'amount'),
+        'discount_amount',
+    ).first()
+    if row is None:
+        return sale
+
+    total_amount, tax_amount, amount_paid, discount_amount = (_money(value) for value in row)
+    net_amount = total_amount + tax_amount - discount_amount
+    balance_due = net_amount - amount_paid
+    values = {
+        'total_amount': total_amount,
+        'tax_amount': tax_amount,
+        'discount_amount': discount_amount,
+        'net_amount': net_amount,
+        'amount_paid': amount_paid,
+        'balance_due': balance_due,
+        'is_paid': balance_due <= PAID_TOLERANCE,
+    }
+
+    if any(getattr(sale, field) != value for field, value in values.items()):
+        values['updated_at'] = timezone.now()
+        Sale.objects.filter(pk=sale.pk).update(**values)
+        for field, value in values.items():
+            setattr(sale, field, value)
+
+        from .receivables import RECEIVABLE_STATUSES, refresh_customer_balances
+        if sale.status in RECEIVABLE_STATUSES:
+            refresh_customer_balances([sale.customer_id])
+    return sale
+
+
+def sale_changed(sale):
+    """Items or payments of `sale` changed: recalculate now, or once at the end of deferred_totals()"""
+    dirty = getattr(_state, 'dirty', None)
+    if dirty is None:
+        recalculate(sale)
+    else:
+        dirty.setdefault(sale.pk, sale)
+
+
+@contextmanager
+def deferred_totals(*sales):
+    """
+    Batch totals updates for the block. Pass the sale instances you hold so
+    they are the ones updated in memory.
+    """
+    if getattr(_state, 'dirty', None) is not None:
+        # Already deferring: the outermost block recalculates
+        for sale in sales:
+            if sale.pk:
+                _state.dirty[sale.pk] = sale
+        yield
+        return
+
+    _state.dirty = {sale.pk: sale for sale in sales if sale.pk}
+    try:
+        yield
+        dirty = _state.dirty
+    finally:
+        _state.dirty = None
+    for sale in dirty.values():
+        recalculate(sale)
+
+
+def bulk_create_items(sale, sale_items, batch_size=500):
+    """Price and insert many SaleItems with one bulk_create and one totals update"""
+    from .models import SaleItem
+
+    stocked_out = sale.has_approved_stock_out
+    now = timezone.now()
+    for sale_item in sale_items:
+        sale_item.sale = sale
+        price_line(sale_item)
+        if stocked_out:
+            sale_item.is_stocked_out = True
+            sale_item.stock_out_date = now
+    created = SaleItem.objects.bulk_create(sale_items, batch_size=batch_size)
+    for sale_item in created:
+        sale_item.remember_pricing()
+    sale_changed(sale)
+    return created
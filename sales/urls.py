@@ -38,7 +38,11 @@ urlpatterns = [
     # ================= REPORTS =================
     path('reports/', views.sales_report, name='sales_report'),
     path('reports/sale-items/', views.sale_items_report, name='sale_items_report'),
+    path('receivables/aging/', views.receivables_aging, name='receivables_aging'),
     path('download-pdf/', views.download_sales_pdf, name='download_sales_pdf'),
+    path('export/', views.export_sales, name='export_sales'),
+    path('exports/', views.export_list, name='export_list'),
+    path('exports/<int:pk>/download/', views.export_download, name='export_download'),
 
     # ================= STOCK OUT =================
     path('stock-outs/pending/', views.pending_stock_outs, name='pending_stock_outs'),
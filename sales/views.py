@@ -1,9 +1,10 @@
 # cornelsimba/sales/views.py - FULLY UPDATED AND CORRECTED VERSION
+from django.template.response import TemplateResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
-from django.db.models import Sum, Count, Q, Avg
+from django.db.models import Sum, Q, F
 from django.utils import timezone
 from datetime import datetime, timedelta
 from functools import wraps
@@ -11,19 +12,21 @@ from decimal import Decimal
 from django.core.exceptions import ValidationError
 import json
 
-from .models import Customer, Sale, SaleItem, Payment
+from .models import Customer, Sale, SaleItem, Payment, SalesExport
+from core.bus import publish
+from core.cache import cached_report
+from core.sequences import daily_number
+from .totals import bulk_create_items, deferred_totals
+from .analytics import sync_sales_facts, sale_facts, line_facts, period_totals
+from .metrics import CUSTOMER_SORTS, order_customers, with_metrics
+from .exports import CONTENT_TYPES, MAX_INLINE_ROWS, export_filters, export_response, filtered_sales
+from .receivables import AGING_BUCKETS, aging_by_customer, aging_totals, check_credit, refresh_customer_balances
 from .forms import CustomerForm, SaleForm, SaleItemFormSet, PaymentForm
 from inventory.models import Item
+from inventory.reservations import release_for_sales
 from audit.utils import audit_log
 
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-
-from reportlab.lib import colors
+from django.http import FileResponse
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -57,31 +60,14 @@ def sales_dashboard(request):
     start_of_month = today.replace(day=1)
     one_week_ago = today - timedelta(days=7)
     
-    # Sales statistics
-    total_sales = Sale.objects.filter(status='COMPLETED').count()
-    monthly_sales = Sale.objects.filter(
-        status='COMPLETED',
-        sale_date__gte=start_of_month
-    ).count()
-    weekly_sales = Sale.objects.filter(
-        status='COMPLETED',
-        sale_date__gte=one_week_ago
-    ).count()
-    
-    # Revenue statistics - IN TSH
-    total_revenue = Sale.objects.filter(status='COMPLETED').aggregate(
-        total=Sum('net_amount')
-    )['total'] or Decimal('0')
-    
-    monthly_revenue = Sale.objects.filter(
-        status='COMPLETED',
-        sale_date__gte=start_of_month
-    ).aggregate(total=Sum('net_amount'))['total'] or Decimal('0')
-    
-    weekly_revenue = Sale.objects.filter(
-        status='COMPLETED',
-        sale_date__gte=one_week_ago
-    ).aggregate(total=Sum('net_amount'))['total'] or Decimal('0')
+    # Sales statistics and revenue - IN TSH, from the daily facts in one query
+    totals = period_totals({'total': None, 'monthly': start_of_month, 'weekly': one_week_ago})
+    total_sales = totals['total']['count']
+    monthly_sales = totals['monthly']['count']
+    weekly_sales = totals['weekly']['count']
+    total_revenue = totals['total']['revenue']
+    monthly_revenue = totals['monthly']['revenue']
+    weekly_revenue = totals['weekly']['revenue']
     
     # Stock out status counts
     pending_stock_out = Sale.objects.filter(
@@ -98,11 +84,11 @@ def sales_dashboard(request):
     recent_sales = Sale.objects.select_related('customer').order_by('-created_at')[:10]
     
     # Top customers
-    top_customers = Sale.objects.filter(status='COMPLETED').values(
+    top_customers = sale_facts().values(
         'customer__name'
     ).annotate(
-        total_sales=Count('id'),
-        total_amount=Sum('net_amount')
+        total_sales=Sum('sale_count'),
+        total_amount=Sum('revenue')
     ).order_by('-total_amount')[:5]
     
     # Sales requiring attention
@@ -134,8 +120,8 @@ def sales_dashboard(request):
 @login_required
 @group_required('Sales')
 def customer_list(request):
-    """List all customers"""
-    customers = Customer.objects.filter(is_active=True).order_by('name')
+    """List all customers with their lifetime metrics (one query, sortable)"""
+    customers = with_metrics(Customer.objects.filter(is_active=True))
     
     search_query = request.GET.get('search')
     if search_query:
@@ -146,8 +132,12 @@ def customer_list(request):
             Q(email__icontains=search_query)
         )
     
+    sort = request.GET.get('sort', 'name')
+    customers = order_customers(customers, sort)
+    
     context = {
         'customers': customers,
+        'sort': sort if sort.lstrip('-') in CUSTOMER_SORTS else 'name',
     }
     return render(request, 'sales/customer_list.html', context)
 
@@ -158,15 +148,14 @@ def customer_detail(request, pk):
     customer = get_object_or_404(Customer, pk=pk)
     
     sales = customer.sales.all().order_by('-created_at')[:20]
-    total_sales = customer.sales.filter(status='COMPLETED').count()
-    total_revenue = customer.sales.filter(status='COMPLETED').aggregate(
-        total=Sum('net_amount')
-    )['total'] or Decimal('0')
     
-    # Pending payments
-    pending_payments = Decimal('0')
-    for sale in customer.sales.filter(status='COMPLETED', is_paid=False):
-        pending_payments += sale.balance_due
+    # Lifetime figures and open balance from the metrics row
+    metrics = with_metrics(Customer.objects.filter(pk=customer.pk)).values(
+        'sale_count', 'lifetime_revenue', 'last_sale_date', 'outstanding',
+    ).get()
+    total_sales = metrics['sale_count']
+    total_revenue = metrics['lifetime_revenue']
+    pending_payments = metrics['outstanding']
     
     # Prepare messages for JSON
     django_messages = []
@@ -182,6 +171,7 @@ def customer_detail(request, pk):
         'total_sales': total_sales,
         'total_revenue': total_revenue,
         'pending_payments': pending_payments,
+        'last_sale_date': metrics['last_sale_date'],
         'django_messages_json': json.dumps(django_messages),
     }
     return render(request, 'sales/customer_detail.html', context)
@@ -349,47 +339,28 @@ def sale_create(request, pk=None):
                     
                     # Generate sale number if new
                     if not sale.sale_number:
-                        from datetime import datetime
-                        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-                        sale.sale_number = f"SALE-{timestamp}"
+                        sale.sale_number = daily_number('SALE', Sale, 'sale_number')
                     
                     # Save sale to get PK
                     sale.save()
                     
-                    # Process sale items
+                    # Process sale items: new lines in one bulk insert, one totals update at the end
                     items = item_formset.save(commit=False)
-                    
-                    total_amount = Decimal('0')
-                    tax_amount = Decimal('0')
-                    
-                    for item in items:
-                        item.sale = sale
-                        item.save()  # Model calculates totals with proper rounding
+                    with deferred_totals(sale):
+                        for item in items:
+                            if item.pk:
+                                item.sale = sale
+                                item.save()  # Model prices the line with proper rounding
                         
-                        total_amount += item.total_price
-                        tax_amount += item.tax_amount
-                    
-                    # Delete removed items
-                    for form in item_formset.deleted_forms:
-                        if form.instance.pk:
-                            form.instance.delete()
-                    
-                    # ✅ FIXED: Use Decimal fields directly - NO RECONVERSION
-                    # These are already Decimal objects from the model
-                    total_amount = Decimal(total_amount).quantize(Decimal('0.01'))
-                    tax_amount = Decimal(tax_amount).quantize(Decimal('0.01'))
-                    discount_amount = sale.discount_amount.quantize(Decimal('0.01'))
-                    
-                    # ✅ FIXED: Single calculation with proper types
-                    sale.total_amount = total_amount
-                    sale.tax_amount = tax_amount
-                    sale.discount_amount = discount_amount
-                    
-                    # ✅ FIXED: Calculate net amount once, properly
-                    sale.net_amount = (total_amount + tax_amount - discount_amount).quantize(Decimal('0.01'))
-                    sale.balance_due = sale.net_amount  # For new sales, balance = net amount
+                        # Delete removed items
+                        for form in item_formset.deleted_forms:
+                            if form.instance.pk:
+                                form.instance.delete()
+                        
+                        bulk_create_items(sale, [item for item in items if not item.pk])
                     
-                    sale.save()
+                    # Credit check against what the customer already owes (rolls the sale back)
+                    check_credit(sale.customer, sale.balance_due)
                     
                     # Audit log
                     if pk:  # Editing
@@ -417,8 +388,17 @@ def sale_create(request, pk=None):
                     
                     return redirect('sales:sale_detail', pk=sale.pk)
                     
+            except ValidationError as e:
+                messages.error(request, ' '.join(e.messages))
             except Exception as e:
                 messages.error(request, f'Error saving sale: {str(e)}')
+            
+            # Rolled back: a new sale must not come back as an edit of a sale that was never saved
+            if not pk:
+                sale_form.instance.pk = None
+                sale_form.instance.sale_number = ''
+                sale_form.instance._state.adding = True
+                sale = None
         else:
             messages.error(request, 'Please fix the errors below.')
     else:
@@ -455,33 +435,17 @@ def sale_edit(request, pk):
                     sale.save()
                     
                     items = item_formset.save(commit=False)
-                    
-                    total_amount = Decimal('0')
-                    tax_amount = Decimal('0')
-                    
-                    for item in items:
-                        item.sale = sale
-                        item.save()
+                    with deferred_totals(sale):
+                        for item in items:
+                            if item.pk:
+                                item.sale = sale
+                                item.save()
                         
-                        total_amount += item.total_price
-                        tax_amount += item.tax_amount
-                    
-                    for form in item_formset.deleted_forms:
-                        if form.instance.pk:
-                            form.instance.delete()
-                    
-                    # ✅ FIXED: Proper calculation without reconversion
-                    total_amount = Decimal(total_amount).quantize(Decimal('0.01'))
-                    tax_amount = Decimal(tax_amount).quantize(Decimal('0.01'))
-                    discount_amount = sale.discount_amount.quantize(Decimal('0.01'))
-                    
-                    sale.total_amount = total_amount
-                    sale.tax_amount = tax_amount
-                    sale.discount_amount = discount_amount
-                    sale.net_amount = (total_amount + tax_amount - discount_amount).quantize(Decimal('0.01'))
-                    sale.balance_due = sale.net_amount
-                    
-                    sale.save()
+                        for form in item_formset.deleted_forms:
+                            if form.instance.pk:
+                                form.instance.delete()
+                        
+                        bulk_create_items(sale, [item for item in items if not item.pk])
                     
                     audit_log(
                         user=request.user,
@@ -563,6 +527,7 @@ def sale_approve(request, pk):
         return redirect('sales:sale_detail', pk=sale.pk)
     
     try:
+        check_credit(sale.customer, sale.balance_due)
         sale.mark_as_approved(request.user)
         sale.refresh_from_db()
 
@@ -580,6 +545,8 @@ def sale_approve(request, pk):
         messages.success(request, f'Sale {sale.sale_number} approved successfully!')
         messages.info(request, 'Now you can request stock out from inventory.')
         
+    except ValidationError as e:
+        messages.error(request, ' '.join(e.messages))
     except Exception as e:
         messages.error(request, f'Error approving sale: {str(e)}')
     
@@ -677,13 +644,16 @@ def sale_cancel(request, pk):
     
     if request.method == 'POST':
         try:
-            # If sale has pending stock out, delete it
+            # If sale has pending stock out, delete it and release the stock it held
             if sale.inventory_stock_out and sale.inventory_stock_out.status == 'pending':
                 sale.inventory_stock_out.delete()
+            release_for_sales([sale.pk])
             
             # Update sale status
             sale.status = 'CANCELLED'
             sale.save(update_fields=['status', 'updated_at'])
+            sync_sales_facts([sale.pk])
+            refresh_customer_balances([sale.customer_id])
             
             # 🔴 AUDIT ADD - After this line
             audit_log(
@@ -768,6 +738,7 @@ def sale_add_payment(request, pk):
     return render(request, 'sales/payment_form.html', context)
 
 @login_required
+@cached_report('sales.SalesDailyFact', 'sales.Sale', 'inventory.StockOut')
 def sales_report(request):
     """Sales reports and analytics - Clean production version"""
     from datetime import datetime, timedelta
@@ -795,34 +766,26 @@ def sales_report(request):
     # Get quick period if provided
     quick_period = request.GET.get('period', '')
     
-    # Date range sales
-    date_range_sales = Sale.objects.filter(
-        status='COMPLETED',
-        sale_date__gte=start_date,
-        sale_date__lte=end_date
-    ).select_related('customer')
+    # Served from the pre-aggregated daily facts (see sales/analytics.py)
+    date_range_sales = sale_facts(start_date, end_date)
     
     # Daily sales summary
-    daily_summary = date_range_sales.values('sale_date').annotate(
-        total_sales=Count('id'),
-        total_amount=Sum('net_amount')
+    daily_summary = date_range_sales.values(sale_date=F('day')).annotate(
+        total_sales=Sum('sale_count'),
+        total_amount=Sum('revenue')
     ).annotate(
-        avg_amount=Sum('net_amount') / Count('id')
+        avg_amount=Sum('revenue') / Sum('sale_count')
     ).order_by('sale_date')
     
     # Product sales
-    product_sales = SaleItem.objects.filter(
-        sale__status='COMPLETED',
-        sale__sale_date__gte=start_date,
-        sale__sale_date__lte=end_date
-    ).values(
+    product_sales = line_facts(start_date, end_date).values(
         'item__name', 
         'item__sku'
     ).annotate(
         total_quantity=Sum('quantity'),
-        total_amount=Sum('total_price')
+        total_amount=Sum('revenue')
     ).annotate(
-        avg_price=Sum('total_price') / Sum('quantity')
+        avg_price=Sum('revenue') / Sum('quantity')
     ).order_by('-total_amount')
     
     # Customer summary
@@ -830,25 +793,24 @@ def sales_report(request):
         'customer__name', 
         'customer__id'
     ).annotate(
-        total_sales=Count('id'),
-        total_amount=Sum('net_amount')
+        total_sales=Sum('sale_count'),
+        total_amount=Sum('revenue')
     ).order_by('-total_amount')
     
     # Summary statistics
     summary_stats = date_range_sales.aggregate(
-        total_sales=Count('id'),
-        total_revenue=Sum('net_amount'),
-        avg_sale_value=Avg('net_amount')
+        total_sales=Sum('sale_count'),
+        total_revenue=Sum('revenue'),
     )
     
     total_sales = summary_stats['total_sales'] or 0
     total_revenue = summary_stats['total_revenue'] or Decimal('0')
-    avg_sale_value = summary_stats['avg_sale_value'] or Decimal('0')
+    avg_sale_value = total_revenue / total_sales if total_sales else Decimal('0')
     
     # Sales by type
     sales_by_type = date_range_sales.values('sale_type').annotate(
-        count=Count('id'),
-        amount=Sum('net_amount')
+        count=Sum('sale_count'),
+        amount=Sum('revenue')
     ).order_by('-amount')
     
     # Stock out statistics
@@ -900,7 +862,39 @@ def sales_report(request):
         'sales_by_type_json': json.dumps(sales_by_type_data, cls=DecimalEncoder),
     }
     
-    return render(request, 'sales/report.html', context)
+    return TemplateResponse(request, 'sales/report.html', context)
+
+@login_required
+@group_required('Sales')
+def receivables_aging(request):
+    """Outstanding balances per customer by age"""
+    as_of = timezone.now().date()
+    as_of_param = request.GET.get('as_of')
+    if as_of_param:
+        try:
+            as_of = datetime.strptime(as_of_param, '%Y-%m-%d').date()
+        except ValueError:
+            messages.error(request, 'Invalid date, showing aging as of today.')
+    
+    # One grouped query over open sales
+    aging = aging_by_customer(as_of=as_of)
+    totals = aging_totals(aging)
+    for row in aging + [totals]:
+        row['bucket_values'] = [row[key] for key, label, start, end in AGING_BUCKETS]
+    
+    over_limit = [
+        row for row in aging
+        if row['credit_limit'] and row['credit_limit'] > 0 and row['total'] > row['credit_limit']
+    ]
+    
+    context = {
+        'aging': aging,
+        'totals': totals,
+        'bucket_labels': [label for key, label, start, end in AGING_BUCKETS],
+        'over_limit_count': len(over_limit),
+        'as_of': as_of,
+    }
+    return render(request, 'sales/receivables_aging.html', context)
 
 @login_required
 @group_required('Sales')
@@ -1039,163 +1033,72 @@ def sale_items_report(request):
 @login_required
 @group_required('Sales')
 def download_sales_pdf(request):
-    """Download sales list as PDF with proper table"""
-    sales = Sale.objects.select_related('customer').order_by('-created_at')
-    
-    # Apply same filters as sale_list
-    status_filter = request.GET.get('status')
-    if status_filter:
-        sales = sales.filter(status=status_filter)
-    
-    customer_filter = request.GET.get('customer')
-    if customer_filter:
-        sales = sales.filter(customer__id=customer_filter)
-    
-    date_from = request.GET.get('date_from')
-    date_to = request.GET.get('date_to')
-    if date_from:
-        sales = sales.filter(sale_date__gte=date_from)
-    if date_to:
-        sales = sales.filter(sale_date__lte=date_to)
-    
-    # Create PDF response
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="sales_report.pdf"'
-    
-    # Create PDF document with landscape orientation
-    doc = SimpleDocTemplate(response, pagesize=landscape(letter))
-    elements = []
-    
-    # Title
-    styles = getSampleStyleSheet()
-    title = Paragraph("SALES REPORT", styles['Title'])
-    elements.append(title)
-    
-    # Filter info
-    filter_text = f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}"
-    if status_filter:
-        filter_text += f" | Status: {status_filter}"
-    if date_from and date_to:
-        filter_text += f" | Date Range: {date_from} to {date_to}"
-    
-    subtitle = Paragraph(filter_text, styles['Normal'])
-    elements.append(subtitle)
-    elements.append(Paragraph("<br/><br/>", styles['Normal']))
-    
-    # Prepare table data with ALL fields
-    data = []
-    
-    # Table headers with ALL columns
-    headers = [
-        'Sale #', 
-        'Date', 
-        'Customer', 
-        'Sale Type',
-        'Amount (Tsh)', 
-        'Paid (Tsh)', 
-        'Balance (Tsh)', 
-        'Payment Status',
-        'Sale Status',
-        'Stock Out'
-    ]
-    data.append(headers)
-    
-    # Add sales data
-    for sale in sales:
-        # Determine payment status
-        if sale.is_paid:
-            payment_status = "Fully Paid"
-        elif sale.amount_paid > 0:
-            payment_status = "Partial"
-        else:
-            payment_status = "Unpaid"
-        
-        # Stock out status
-        if sale.inventory_stock_out:
-            if sale.inventory_stock_out.status == 'approved':
-                stock_out = "Approved"
-            elif sale.inventory_stock_out.status == 'pending':
-                stock_out = "Pending"
-            else:
-                stock_out = sale.inventory_stock_out.status.title()
-        else:
-            stock_out = "Not Requested"
-        
-        row = [
-            sale.sale_number,
-            sale.sale_date.strftime('%Y-%m-%d') if sale.sale_date else '',
-            sale.customer.name,
-            sale.get_sale_type_display(),
-            f"{sale.net_amount:,.0f}",
-            f"{sale.amount_paid:,.0f}",
-            f"{sale.balance_due:,.0f}",
-            payment_status,
-            sale.get_status_display(),
-            stock_out
-        ]
-        data.append(row)
-    
-    # Create table with proper styling
-    table = Table(data)
-    
-    # Style the table
-    style = TableStyle([
-        # Header style
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4F81BD')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        
-        # Alternating row colors
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F2F2F2')]),
-        
-        # Grid lines
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.gray),
-        ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        
-        # Number columns alignment
-        ('ALIGN', (4, 1), (6, -1), 'RIGHT'),  # Amount columns
-    ])
-    
-    table.setStyle(style)
-    elements.append(table)
-    
-    # Add summary section
-    elements.append(Paragraph("<br/><br/>", styles['Normal']))
-    
-    # Calculate totals
-    total_sales = sales.count()
-    total_amount = sum(sale.net_amount for sale in sales) if sales else Decimal('0')
-    total_paid = sum(sale.amount_paid for sale in sales) if sales else Decimal('0')
-    total_balance = sum(sale.balance_due for sale in sales) if sales else Decimal('0')
-    
-    summary_data = [
-        ['Total Sales:', str(total_sales)],
-        ['Total Amount (Tsh):', f"{total_amount:,.0f}"],
-        ['Total Paid (Tsh):', f"{total_paid:,.0f}"],
-        ['Total Balance Due (Tsh):', f"{total_balance:,.0f}"],
-        ['Completed Sales:', str(sales.filter(status='COMPLETED').count())],
-        ['Pending Payments:', str(sales.filter(is_paid=False, balance_due__gt=0).count())]
-    ]
-    
-    summary_table = Table(summary_data, colWidths=[200, 100])
-    summary_style = TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.gray),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D9E1F2')),
-    ])
-    summary_table.setStyle(summary_style)
-    elements.append(summary_table)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    return response
\ No newline at end of file
+    """Download the filtered sales list as PDF"""
+    return _export_sales(request, 'pdf')
+
+@login_required
+@group_required('Sales')
+def export_sales(request):
+    """Download the filtered sales list as CSV, Excel or PDF (?format=csv|xlsx|pdf)"""
+    export_format = request.GET.get('format', 'csv')
+    if export_format == 'xls':
+        export_format = 'xlsx'
+    if export_format not in CONTENT_TYPES:
+        messages.error(request, f'Unknown export format: {export_format}')
+        return redirect('sales:sale_list')
+    return _export_sales(request, export_format)
+
+def _export_sales(request, export_format):
+    filters = export_filters(request.GET)
+    row_count = filtered_sales(filters).count()
+    
+    if row_count <= MAX_INLINE_ROWS:
+        return export_response(export_format, filters)
+    
+    # Too big for the request: build it in the outbox worker
+    with transaction.atomic():
+        export = SalesExport.objects.create(
+            export_format=export_format,
+            filters=filters,
+            row_count=row_count,
+            requested_by=request.user,
+        )
+        publish('sales.export.requested', {'export_id': export.pk})
+    
+    audit_log(
+        user=request.user,
+        action='EXPORT',
+        module='SALES',
+        object_type='SalesExport',
+        object_id=export.id,
+        description=f'Queued {export.get_export_format_display()} export of {row_count} sales',
+        request=request
+    )
+    messages.info(
+        request,
+        f'{row_count:,} sales is too large to download directly. '
+        f'The export is being prepared and will appear here when ready.'
+    )
+    return redirect('sales:export_list')
+
+@login_required
+@group_required('Sales')
+def export_list(request):
+    """The current user's queued exports"""
+    exports = SalesExport.objects.filter(requested_by=request.user)[:20]
+    return render(request, 'sales/export_list.html', {'exports': exports})
+
+@login_required
+@group_required('Sales')
+def export_download(request, pk):
+    """Download a finished queued export"""
+    export = get_object_or_404(SalesExport, pk=pk, requested_by=request.user)
+    if export.status != 'done' or not export.file:
+        messages.warning(request, 'This export is not ready yet.')
+        return redirect('sales:export_list')
+    return FileResponse(
+        export.file.open('rb'),
+        as_attachment=True,
+        filename=export.file.name.rsplit('/', 1)[-1],
+        content_type=CONTENT_TYPES[export.export_format],
+    )